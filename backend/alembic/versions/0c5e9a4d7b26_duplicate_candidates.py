@@ -0,0 +1,46 @@
+"""duplicate candidates for customers and owners
+
+Revision ID: 0c5e9a4d7b26
+Revises: f3c7a2e9d814
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c5e9a4d7b26'
+down_revision = 'f3c7a2e9d814'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'duplicate_candidates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(20), nullable=False),
+        sa.Column('primary_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('resolved_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('entity_type', 'primary_id', 'duplicate_id', name='uq_duplicate_candidates_pair'),
+    )
+    op.create_index('ix_duplicate_candidates_id', 'duplicate_candidates', ['id'])
+    op.create_index(
+        'ix_duplicate_candidates_entity_status_score',
+        'duplicate_candidates',
+        ['entity_type', 'status', 'score'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_duplicate_candidates_entity_status_score', table_name='duplicate_candidates')
+    op.drop_index('ix_duplicate_candidates_id', table_name='duplicate_candidates')
+    op.drop_table('duplicate_candidates')
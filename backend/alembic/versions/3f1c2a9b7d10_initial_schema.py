@@ -0,0 +1,260 @@
+"""initial schema
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def upgrade():
+    # 既存環境では app.main の create_all でテーブルが作成済みのため、
+    # 存在しないテーブルのみ作成する
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('email', sa.String(255), nullable=False),
+            sa.Column('password_hash', sa.String(255), nullable=False),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('role', sa.String(20), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('last_login', sa.DateTime(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    if 'documents' not in existing:
+        op.create_table(
+            'documents',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('file_name', sa.String(255), nullable=False),
+            sa.Column('file_path', sa.String(255), nullable=False),
+            sa.Column('document_type', sa.String(50), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('upload_date', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.Column('uploaded_by', sa.Integer(), sa.ForeignKey('users.id')),
+            sa.Column('processed_at', sa.DateTime(), nullable=True),
+            sa.Column('processing_status', sa.String(20)),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_documents_id', 'documents', ['id'])
+
+    if 'extracted_data' not in existing:
+        op.create_table(
+            'extracted_data',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('document_id', sa.Integer(), sa.ForeignKey('documents.id')),
+            sa.Column('customer_name', sa.String(100), nullable=False),
+            sa.Column('postal_code', sa.String(8), nullable=True),
+            sa.Column('prefecture', sa.String(20), nullable=False),
+            sa.Column('current_address', sa.String(255), nullable=False),
+            sa.Column('inheritance_address', sa.String(255), nullable=False),
+            sa.Column('phone_number', sa.String(20), nullable=True),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('extracted_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.Column('extracted_by', sa.Integer(), sa.ForeignKey('users.id')),
+            *_timestamps(),
+        )
+        op.create_index('ix_extracted_data_id', 'extracted_data', ['id'])
+
+    if 'properties' not in existing:
+        op.create_table(
+            'properties',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('property_address', sa.String(255), nullable=False),
+            sa.Column('registry_office', sa.String(100), nullable=False),
+            sa.Column('registration_date', sa.Date(), nullable=True),
+            sa.Column('property_type', sa.String(50), nullable=False),
+            sa.Column('status', sa.String(20)),
+            *_timestamps(),
+        )
+        op.create_index('ix_properties_id', 'properties', ['id'])
+        op.create_index('ix_properties_property_address', 'properties', ['property_address'])
+        op.create_index('ix_properties_registry_office', 'properties', ['registry_office'])
+
+    if 'owners' not in existing:
+        op.create_table(
+            'owners',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('address', sa.String(255), nullable=False),
+            sa.Column('postal_code', sa.String(8), nullable=True),
+            sa.Column('phone_number', sa.String(20), nullable=True),
+            sa.Column('email', sa.String(255), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_owners_id', 'owners', ['id'])
+        op.create_index('ix_owners_name', 'owners', ['name'])
+
+    if 'ownerships' not in existing:
+        op.create_table(
+            'ownerships',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('property_id', sa.Integer(), sa.ForeignKey('properties.id')),
+            sa.Column('owner_id', sa.Integer(), sa.ForeignKey('owners.id')),
+            sa.Column('transfer_type', sa.String(50), nullable=True),
+            sa.Column('transfer_date', sa.Date(), nullable=True),
+            sa.Column('transfer_reason', sa.String(100), nullable=True),
+            sa.Column('ownership_percentage', sa.Integer()),
+            *_timestamps(),
+        )
+        op.create_index('ix_ownerships_id', 'ownerships', ['id'])
+        op.create_index('ix_ownerships_property_id', 'ownerships', ['property_id'])
+        op.create_index('ix_ownerships_owner_id', 'ownerships', ['owner_id'])
+
+    if 'customers' not in existing:
+        op.create_table(
+            'customers',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('phone_number', sa.String(20), nullable=True),
+            sa.Column('email', sa.String(255), nullable=True),
+            sa.Column('address', sa.String(255), nullable=False),
+            sa.Column('postal_code', sa.String(8), nullable=True),
+            sa.Column('property_address', sa.String(255), nullable=False),
+            sa.Column('property_type', sa.String(50), nullable=True),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('assigned_to', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('last_contact_date', sa.Date(), nullable=True),
+            sa.Column('next_contact_date', sa.Date(), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('source', sa.String(50), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_customers_id', 'customers', ['id'])
+        op.create_index('ix_customers_name', 'customers', ['name'])
+
+    if 'customer_activities' not in existing:
+        op.create_table(
+            'customer_activities',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('customer_id', sa.Integer(), sa.ForeignKey('customers.id')),
+            sa.Column('activity_date', sa.Date(), nullable=False),
+            sa.Column('activity_type', sa.String(20), nullable=False),
+            sa.Column('description', sa.Text(), nullable=False),
+            sa.Column('result', sa.Text(), nullable=True),
+            sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id')),
+            *_timestamps(),
+        )
+        op.create_index('ix_customer_activities_id', 'customer_activities', ['id'])
+        op.create_index('ix_customer_activities_customer_id', 'customer_activities', ['customer_id'])
+
+    if 'registry_requests' not in existing:
+        op.create_table(
+            'registry_requests',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('property_id', sa.Integer(), sa.ForeignKey('properties.id')),
+            sa.Column('customer_id', sa.Integer(), sa.ForeignKey('customers.id')),
+            sa.Column('request_type', sa.String(50), nullable=False),
+            sa.Column('request_date', sa.Date(), nullable=False),
+            sa.Column('received_date', sa.Date(), nullable=True),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('requested_by', sa.Integer(), sa.ForeignKey('users.id')),
+            sa.Column('cost', sa.Integer()),
+            sa.Column('notes', sa.Text(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_registry_requests_id', 'registry_requests', ['id'])
+        op.create_index('ix_registry_requests_property_id', 'registry_requests', ['property_id'])
+        op.create_index('ix_registry_requests_customer_id', 'registry_requests', ['customer_id'])
+
+    if 'invoices' not in existing:
+        op.create_table(
+            'invoices',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('invoice_number', sa.String(50), nullable=False, unique=True),
+            sa.Column('client_name', sa.String(100), nullable=False),
+            sa.Column('amount', sa.Integer(), nullable=False),
+            sa.Column('issue_date', sa.Date(), nullable=False),
+            sa.Column('due_date', sa.Date(), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('payment_method', sa.String(50), nullable=True),
+            sa.Column('payment_date', sa.Date(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_invoices_id', 'invoices', ['id'])
+        op.create_index('ix_invoices_client_name', 'invoices', ['client_name'])
+
+    if 'invoice_items' not in existing:
+        op.create_table(
+            'invoice_items',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('invoice_id', sa.Integer(), sa.ForeignKey('invoices.id')),
+            sa.Column('registry_request_id', sa.Integer(), sa.ForeignKey('registry_requests.id'), nullable=True),
+            sa.Column('amount', sa.Integer(), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_invoice_items_id', 'invoice_items', ['id'])
+        op.create_index('ix_invoice_items_invoice_id', 'invoice_items', ['invoice_id'])
+
+    if 'error_reports' not in existing:
+        op.create_table(
+            'error_reports',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('error_type', sa.String(50), nullable=False),
+            sa.Column('error_message', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('document_id', sa.Integer(), sa.ForeignKey('documents.id'), nullable=True),
+            sa.Column('reported_by', sa.Integer(), sa.ForeignKey('users.id')),
+            sa.Column('reported_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.Column('resolved_at', sa.DateTime(), nullable=True),
+            sa.Column('resolved_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+            sa.Column('resolution_notes', sa.Text(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_error_reports_id', 'error_reports', ['id'])
+
+    if 'postal_codes' not in existing:
+        op.create_table(
+            'postal_codes',
+            sa.Column('postal_code', sa.String(8), primary_key=True),
+            sa.Column('prefecture', sa.String(10), nullable=False),
+            sa.Column('city', sa.String(50), nullable=False),
+            sa.Column('town', sa.String(100), nullable=False),
+            sa.Column('prefecture_kana', sa.String(20), nullable=True),
+            sa.Column('city_kana', sa.String(100), nullable=True),
+            sa.Column('town_kana', sa.String(100), nullable=True),
+        )
+
+    if 'tasks' not in existing:
+        op.create_table(
+            'tasks',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('task_id', sa.String(36), nullable=False, unique=True),
+            sa.Column('task_type', sa.String(50), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('result', sa.Text(), nullable=True),
+            sa.Column('start_time', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+            sa.Column('end_time', sa.DateTime(), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index('ix_tasks_id', 'tasks', ['id'])
+
+
+def downgrade():
+    # upgrade() は既存のテーブルをそのまま使うため、どのテーブルをこのリビジョンで
+    # 作成したかは分からない。create_all で作られたテーブルを消さないよう何もしない
+    pass
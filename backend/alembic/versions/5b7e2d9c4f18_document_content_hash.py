@@ -0,0 +1,38 @@
+"""content hash on documents and document link on tasks
+
+Revision ID: 5b7e2d9c4f18
+Revises: e2b5f8a1c934
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2d9c4f18'
+down_revision = 'e2b5f8a1c934'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(64), nullable=True))
+        batch_op.create_index('ix_documents_content_hash', ['content_hash'])
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('document_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_tasks_document_id_documents', 'documents', ['document_id'], ['id'])
+        batch_op.create_index('ix_tasks_document_id', ['document_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_index('ix_tasks_document_id')
+        batch_op.drop_constraint('fk_tasks_document_id_documents', type_='foreignkey')
+        batch_op.drop_column('document_id')
+
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_index('ix_documents_content_hash')
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,259 @@
+"""rewrite address keys to the canonical address form
+
+Revision ID: 6e1d3b8f2a94
+Revises: d4a8b1f6c372
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1d3b8f2a94'
+down_revision = 'd4a8b1f6c372'
+branch_labels = None
+depends_on = None
+
+
+# 以下はこのリビジョン時点の app.utils.helpers.normalize_text と
+# app.services.address.normalize_address と同じ処理
+_DASHES = re.compile(r"[‐‑‒–—―−－ｰ]")
+_WHITESPACE = re.compile(r"\s+")
+_KANJI_DIGITS = {
+    "〇": 0, "零": 0, "一": 1, "二": 2, "三": 3, "四": 4,
+    "五": 5, "六": 6, "七": 7, "八": 8, "九": 9,
+}
+_KANJI_UNITS = {"十": 10, "百": 100, "千": 1000}
+_KANJI_NUMERAL = re.compile(r"[〇零一二三四五六七八九十百千万]+")
+_BLOCK_END = r"(?:[-‐‑‒–—―−]|外[\d〇一二三四五六七八九十]|\s|$)"
+_NUMBER_FOLLOWERS = re.compile(
+    r"丁目|地割|筆|" + _BLOCK_END
+    + r"|(?:番地?|号)(?:[\d〇一二三四五六七八九十]|の|" + _BLOCK_END + ")"
+)
+_ADDITIONAL_LOTS = re.compile(r"外\d+(?:筆)?$")
+_OAZA = re.compile(r"大字|(?<=[市区町村])字")
+_CHOME = re.compile(r"(\d+)丁目")
+_BANCHI = re.compile(r"(\d+)(?:番地の?|番の?|号の?|の)(?=\d)")
+_TRAILING_BANCHI = re.compile(r"(\d+)(?:番地|番|号)(?![町丁])")
+_LONG_VOWEL_DASH = re.compile(r"(?<=\d)ー(?=\d)")
+_HYPHENS = re.compile(r"-{2,}")
+
+
+def normalize_text(value):
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKC", str(value))
+    text = _DASHES.sub("-", text)
+    return _WHITESPACE.sub("", text)
+
+
+def _kanji_to_number(text):
+    if not any(char in _KANJI_UNITS or char == "万" for char in text):
+        return int("".join(str(_KANJI_DIGITS[char]) for char in text))
+    total = 0
+    section = 0
+    digit = None
+    for char in text:
+        if char in _KANJI_DIGITS:
+            digit = _KANJI_DIGITS[char]
+        elif char in _KANJI_UNITS:
+            section += (1 if digit is None else digit) * _KANJI_UNITS[char]
+            digit = None
+        elif char == "万":
+            total += (section + (digit or 0) or 1) * 10000
+            section = 0
+            digit = None
+    return total + section + (digit or 0)
+
+
+def normalize_address(value):
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKC", str(value))
+    text = _KANJI_NUMERAL.sub(
+        lambda match: (
+            str(_kanji_to_number(match.group(0)))
+            if _NUMBER_FOLLOWERS.match(text, match.end()) else match.group(0)
+        ),
+        text,
+    )
+    text = _LONG_VOWEL_DASH.sub("-", normalize_text(text))
+    text = _ADDITIONAL_LOTS.sub("", text)
+    text = _OAZA.sub("", text)
+    text = _CHOME.sub(r"\1-", text)
+    text = _BANCHI.sub(r"\1-", text)
+    text = _TRAILING_BANCHI.sub(r"\1", text)
+    return _HYPHENS.sub("-", text).rstrip("-")
+
+
+def _groups(rows, key):
+    """
+    key が同じ行の id を id 順にまとめ、{key: [残す id, 統合する id...]} を返す。
+    """
+    groups = defaultdict(list)
+    for row in sorted(rows, key=lambda row: row.id):
+        groups[key(row)].append(row.id)
+    return groups
+
+
+def _repoint_ownerships(bind, column, other_column, keep_id, duplicate_id):
+    params = {"keep_id": keep_id, "duplicate_id": duplicate_id}
+    # 統合先に既にある所有関係は (property_id, owner_id) の一意制約に反するため削除する
+    bind.execute(sa.text(
+        f"DELETE FROM ownerships WHERE {column} = :duplicate_id AND {other_column} IN ("
+        f"SELECT {other_column} FROM ownerships WHERE {column} = :keep_id)"
+    ), params)
+    bind.execute(sa.text(
+        f"UPDATE ownerships SET {column} = :keep_id WHERE {column} = :duplicate_id"
+    ), params)
+
+
+def _rewrite(bind, table, key_column, values):
+    """
+    {id: {列: 新しい値}} で table を更新する。書き換え前の値が他の行の新しい値と
+    一時的に重なって一意制約に反しないよう、先に key_column を行ごとに一意な仮の値にする。
+    """
+    if not values:
+        return
+    bind.execute(
+        sa.text(f"UPDATE {table} SET {key_column} = :placeholder WHERE id = :row_id"),
+        [{"row_id": row_id, "placeholder": f"~{revision}:{row_id}"} for row_id in values],
+    )
+    columns = next(iter(values.values())).keys()
+    assignments = ", ".join(f"{column} = :{column}" for column in columns)
+    bind.execute(
+        sa.text(f"UPDATE {table} SET {assignments} WHERE id = :row_id"),
+        [{"row_id": row_id, **row_values} for row_id, row_values in values.items()],
+    )
+
+
+def _canonicalize_properties(bind):
+    """
+    所在地を正規形に書き換え、(所在地, 登記所) が重なる物件を最小の id に統合する。
+    """
+    rows = [
+        row for row in bind.execute(sa.text(
+            "SELECT id, property_address, registry_office FROM properties"
+        )).fetchall()
+        if normalize_address(row.property_address)
+    ]
+    groups = _groups(rows, lambda row: (normalize_address(row.property_address), row.registry_office))
+    for keep_id, *duplicate_ids in groups.values():
+        for duplicate_id in duplicate_ids:
+            _repoint_ownerships(bind, "property_id", "owner_id", keep_id, duplicate_id)
+            bind.execute(sa.text(
+                "UPDATE registry_requests SET property_id = :keep_id WHERE property_id = :duplicate_id"
+            ), {"keep_id": keep_id, "duplicate_id": duplicate_id})
+            bind.execute(sa.text("DELETE FROM properties WHERE id = :duplicate_id"), {"duplicate_id": duplicate_id})
+
+    kept = {ids[0] for ids in groups.values()}
+    _rewrite(bind, "properties", "property_address", {
+        row.id: {"property_address": normalize_address(row.property_address)}
+        for row in rows
+        if row.id in kept and normalize_address(row.property_address) != row.property_address
+    })
+
+
+def _canonicalize_owners(bind):
+    """
+    normalized_name・normalized_address を作り直し、(normalized_name, normalized_address) が重なる
+    所有者を最小の id に統合する（所有関係を付け替え、空の連絡先を補う）。
+    """
+    rows = bind.execute(sa.text(
+        "SELECT id, name, address, normalized_name, normalized_address FROM owners"
+    )).fetchall()
+    groups = _groups(rows, lambda row: (normalize_text(row.name), normalize_address(row.address)))
+    for keep_id, *duplicate_ids in groups.values():
+        for duplicate_id in duplicate_ids:
+            params = {"keep_id": keep_id, "duplicate_id": duplicate_id}
+            _repoint_ownerships(bind, "owner_id", "property_id", keep_id, duplicate_id)
+            for column in ("postal_code", "phone_number", "email"):
+                bind.execute(sa.text(
+                    f"UPDATE owners SET {column} = (SELECT {column} FROM owners WHERE id = :duplicate_id) "
+                    f"WHERE id = :keep_id AND ({column} IS NULL OR {column} = '')"
+                ), params)
+            # 削除した所有者を含む未対応の重複候補は次回の検出で作り直す
+            bind.execute(sa.text(
+                "DELETE FROM duplicate_candidates WHERE entity_type = 'owner' AND status = 'pending' "
+                "AND (primary_id = :duplicate_id OR duplicate_id = :duplicate_id)"
+            ), params)
+            bind.execute(sa.text("DELETE FROM owners WHERE id = :duplicate_id"), params)
+
+    kept = {ids[0] for ids in groups.values()}
+    _rewrite(bind, "owners", "normalized_address", {
+        row.id: {"normalized_name": normalize_text(row.name), "normalized_address": normalize_address(row.address)}
+        for row in rows
+        if row.id in kept
+        and (normalize_text(row.name), normalize_address(row.address)) != (row.normalized_name, row.normalized_address)
+    })
+
+
+def _canonicalize_customers(bind):
+    # 顧客の重複判定用の列は一意ではないため、統合せず書き換えるだけにする
+    rows = bind.execute(sa.text(
+        "SELECT id, address, property_address, normalized_address, normalized_property_address FROM customers"
+    )).fetchall()
+    changed = [
+        {
+            "row_id": row.id,
+            "normalized_address": normalize_address(row.address),
+            "normalized_property_address": normalize_address(row.property_address),
+        }
+        for row in rows
+        if (normalize_address(row.address), normalize_address(row.property_address))
+        != (row.normalized_address, row.normalized_property_address)
+    ]
+    if changed:
+        bind.execute(sa.text(
+            "UPDATE customers SET normalized_address = :normalized_address, "
+            "normalized_property_address = :normalized_property_address WHERE id = :row_id"
+        ), changed)
+
+
+def _canonicalize_extracted_data(bind):
+    """
+    inheritance_address（物件の所在地）を正規形に書き換え、
+    (document_id, customer_name, current_address, inheritance_address) が重なる行は最小の id を残す。
+    """
+    rows = [
+        row for row in bind.execute(sa.text(
+            "SELECT id, document_id, customer_name, current_address, inheritance_address FROM extracted_data"
+        )).fetchall()
+        if normalize_address(row.inheritance_address)
+    ]
+    # document_id が NULL の行は一意制約で重複とみなされないため統合しない
+    groups = _groups(rows, lambda row: (
+        row.document_id if row.document_id is not None else ("row", row.id),
+        row.customer_name, row.current_address, normalize_address(row.inheritance_address),
+    ))
+    duplicate_ids = [row_id for ids in groups.values() for row_id in ids[1:]]
+    for start in range(0, len(duplicate_ids), 1000):
+        bind.execute(
+            sa.text("DELETE FROM extracted_data WHERE id IN :ids").bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": duplicate_ids[start:start + 1000]},
+        )
+
+    kept = {ids[0] for ids in groups.values()}
+    _rewrite(bind, "extracted_data", "inheritance_address", {
+        row.id: {"inheritance_address": normalize_address(row.inheritance_address)}
+        for row in rows
+        if row.id in kept and normalize_address(row.inheritance_address) != row.inheritance_address
+    })
+
+
+def upgrade():
+    bind = op.get_bind()
+    _canonicalize_properties(bind)
+    _canonicalize_owners(bind)
+    _canonicalize_customers(bind)
+    _canonicalize_extracted_data(bind)
+
+
+def downgrade():
+    # 正規化前の表記は残っていないため、書き換えた値と統合した行は元に戻さない
+    pass
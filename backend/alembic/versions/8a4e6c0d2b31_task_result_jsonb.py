@@ -0,0 +1,87 @@
+"""store tasks.result as JSONB
+
+Revision ID: 8a4e6c0d2b31
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import ast
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6c0d2b31'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+def _parse_legacy_result(raw):
+    """
+    旧形式 (str(dict) による Python repr) の result を dict に変換する。
+    """
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        pass
+    try:
+        value = ast.literal_eval(raw)
+        if isinstance(value, dict):
+            return value
+    except (ValueError, SyntaxError):
+        pass
+    return {"raw_result": raw}
+
+
+def upgrade():
+    bind = op.get_bind()
+    json_type = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+    op.add_column('tasks', sa.Column('result_json', json_type, nullable=True))
+
+    tasks = sa.table(
+        'tasks',
+        sa.column('id', sa.Integer()),
+        sa.column('result', sa.Text()),
+        sa.column('result_json', json_type),
+    )
+    rows = bind.execute(sa.select(tasks.c.id, tasks.c.result).where(tasks.c.result.isnot(None))).fetchall()
+    for row in rows:
+        bind.execute(
+            tasks.update()
+            .where(tasks.c.id == row.id)
+            .values(result_json=_parse_legacy_result(row.result))
+        )
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('result')
+        batch_op.alter_column('result_json', new_column_name='result')
+
+    if bind.dialect.name == 'postgresql':
+        op.create_index(
+            'ix_tasks_result_pdf_count', 'tasks',
+            [sa.text("((result ->> 'pdf_count')::integer)")],
+        )
+        op.create_index(
+            'ix_tasks_result_owner_count', 'tasks',
+            [sa.text("((result ->> 'owner_count')::integer)")],
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_tasks_result_owner_count', table_name='tasks')
+        op.drop_index('ix_tasks_result_pdf_count', table_name='tasks')
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.alter_column(
+            'result',
+            type_=sa.Text(),
+            postgresql_using='result::text',
+        )
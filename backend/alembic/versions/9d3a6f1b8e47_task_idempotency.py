@@ -0,0 +1,39 @@
+"""idempotency key and in-flight uniqueness for tasks
+
+Revision ID: 9d3a6f1b8e47
+Revises: 5b7e2d9c4f18
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3a6f1b8e47'
+down_revision = '5b7e2d9c4f18'
+branch_labels = None
+depends_on = None
+
+IN_FLIGHT = "status IN ('queued', 'processing')"
+
+
+def upgrade():
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(255), nullable=True))
+        batch_op.create_unique_constraint('uq_tasks_idempotency_key', ['idempotency_key'])
+
+    op.create_index(
+        'uq_tasks_document_in_flight', 'tasks', ['document_id'],
+        unique=True,
+        postgresql_where=sa.text(IN_FLIGHT),
+        sqlite_where=sa.text(IN_FLIGHT),
+    )
+
+
+def downgrade():
+    op.drop_index('uq_tasks_document_in_flight', table_name='tasks')
+
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_constraint('uq_tasks_idempotency_key', type_='unique')
+        batch_op.drop_column('idempotency_key')
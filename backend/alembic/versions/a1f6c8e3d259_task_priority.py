@@ -0,0 +1,25 @@
+"""priority on tasks
+
+Revision ID: a1f6c8e3d259
+Revises: 9d3a6f1b8e47
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1f6c8e3d259'
+down_revision = '9d3a6f1b8e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('priority', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('priority')
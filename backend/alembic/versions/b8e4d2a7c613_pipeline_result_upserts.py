@@ -0,0 +1,98 @@
+"""unique keys for upserting pipeline results
+
+Revision ID: b8e4d2a7c613
+Revises: a1f6c8e3d259
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e4d2a7c613'
+down_revision = 'a1f6c8e3d259'
+branch_labels = None
+depends_on = None
+
+
+def _merge_duplicate_properties(bind):
+    """
+    (property_address, registry_office) が重複する物件を最小の id に統合する。
+    """
+    duplicates = bind.execute(sa.text(
+        "SELECT property_address, registry_office, MIN(id) AS keep_id FROM properties "
+        "GROUP BY property_address, registry_office HAVING COUNT(*) > 1"
+    )).fetchall()
+    for row in duplicates:
+        params = {"address": row.property_address, "office": row.registry_office, "keep_id": row.keep_id}
+        duplicate_ids = (
+            "SELECT id FROM properties WHERE property_address = :address "
+            "AND registry_office = :office AND id <> :keep_id"
+        )
+        for table in ("ownerships", "registry_requests"):
+            bind.execute(sa.text(
+                f"UPDATE {table} SET property_id = :keep_id WHERE property_id IN ({duplicate_ids})"
+            ), params)
+        bind.execute(sa.text(f"DELETE FROM properties WHERE id IN ({duplicate_ids})"), params)
+
+
+def _delete_duplicate_ownerships(bind):
+    bind.execute(sa.text(
+        "DELETE FROM ownerships WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM ownerships GROUP BY property_id, owner_id) AS keep"
+        ")"
+    ))
+
+
+def _delete_duplicate_extracted_data(bind):
+    bind.execute(sa.text(
+        "DELETE FROM extracted_data WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM extracted_data "
+        "GROUP BY document_id, customer_name, current_address, inheritance_address) AS keep"
+        ")"
+    ))
+
+
+def upgrade():
+    bind = op.get_bind()
+    _merge_duplicate_properties(bind)
+    _delete_duplicate_ownerships(bind)
+    _delete_duplicate_extracted_data(bind)
+
+    with op.batch_alter_table('owners') as batch_op:
+        batch_op.add_column(sa.Column('normalized_name', sa.String(100), nullable=True))
+        batch_op.add_column(sa.Column('normalized_address', sa.String(255), nullable=True))
+        batch_op.create_unique_constraint(
+            'uq_owners_normalized_name_address', ['normalized_name', 'normalized_address']
+        )
+
+    with op.batch_alter_table('properties') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_properties_address_office', ['property_address', 'registry_office']
+        )
+
+    with op.batch_alter_table('ownerships') as batch_op:
+        batch_op.create_unique_constraint('uq_ownerships_property_owner', ['property_id', 'owner_id'])
+
+    with op.batch_alter_table('extracted_data') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_extracted_data_document_owner_property',
+            ['document_id', 'customer_name', 'current_address', 'inheritance_address'],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('extracted_data') as batch_op:
+        batch_op.drop_constraint('uq_extracted_data_document_owner_property', type_='unique')
+
+    with op.batch_alter_table('ownerships') as batch_op:
+        batch_op.drop_constraint('uq_ownerships_property_owner', type_='unique')
+
+    with op.batch_alter_table('properties') as batch_op:
+        batch_op.drop_constraint('uq_properties_address_office', type_='unique')
+
+    with op.batch_alter_table('owners') as batch_op:
+        batch_op.drop_constraint('uq_owners_normalized_name_address', type_='unique')
+        batch_op.drop_column('normalized_address')
+        batch_op.drop_column('normalized_name')
@@ -0,0 +1,51 @@
+"""indexes for dashboard and list endpoint queries
+
+Revision ID: c7d91e3f5a62
+Revises: 8a4e6c0d2b31
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d91e3f5a62'
+down_revision = '8a4e6c0d2b31'
+branch_labels = None
+depends_on = None
+
+# tasks.task_id は UNIQUE 制約により既にインデックスが存在するため追加しない
+INDEXES = [
+    ('ix_documents_upload_date', 'documents', ['upload_date'], {}),
+    ('ix_documents_status_upload_date', 'documents', ['status', 'upload_date'], {}),
+    ('ix_tasks_start_time', 'tasks', ['start_time'], {}),
+    ('ix_tasks_status_start_time', 'tasks', ['status', 'start_time'], {}),
+    ('ix_customers_status', 'customers', ['status'], {}),
+    ('ix_customers_next_contact_date', 'customers', ['next_contact_date'], {}),
+    ('ix_customer_activities_customer_id_activity_date', 'customer_activities', ['customer_id', 'activity_date'], {}),
+    ('ix_error_reports_open', 'error_reports', ['reported_at'], {
+        'postgresql_where': sa.text("status = 'open'"),
+        'sqlite_where': sa.text("status = 'open'"),
+    }),
+]
+
+
+def upgrade():
+    # PostgreSQL では書き込みを止めないよう CONCURRENTLY で作成する
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+        # (customer_id, activity_date) の複合インデックスで代替できるため削除
+        op.drop_index('ix_customer_activities_customer_id', table_name='customer_activities')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_customer_activities_customer_id', 'customer_activities', ['customer_id'],
+            postgresql_concurrently=True,
+        )
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""trigram indexes for cross-entity search
+
+Revision ID: d4a8b1f6c372
+Revises: 0c5e9a4d7b26
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8b1f6c372'
+down_revision = '0c5e9a4d7b26'
+branch_labels = None
+depends_on = None
+
+# pg_trgm の GIN インデックスは PostgreSQL でのみ作成する（SQLite は LIKE で検索する）
+INDEXES = [
+    ('ix_customers_name_trgm', 'customers', 'name'),
+    ('ix_customers_address_trgm', 'customers', 'address'),
+    ('ix_customers_property_address_trgm', 'customers', 'property_address'),
+    ('ix_owners_name_trgm', 'owners', 'name'),
+    ('ix_owners_address_trgm', 'owners', 'address'),
+    ('ix_properties_property_address_trgm', 'properties', 'property_address'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # 書き込みを止めないよう CONCURRENTLY で作成する
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.create_index(
+                name, table, [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # pg_trgm 拡張は他で使われている可能性があるため残す
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
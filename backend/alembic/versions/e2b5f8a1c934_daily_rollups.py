@@ -0,0 +1,47 @@
+"""daily rollup tables for time-series reports
+
+Revision ID: e2b5f8a1c934
+Revises: c7d91e3f5a62
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b5f8a1c934'
+down_revision = 'c7d91e3f5a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'daily_rollups',
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('metric', sa.String(50), primary_key=True),
+        sa.Column('dimension', sa.String(50), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    # 初回のレポート参照時に全期間を集計する
+    op.create_table(
+        'rollup_state',
+        sa.Column('name', sa.String(50), primary_key=True),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    )
+
+    # 前回集計以降に変更された行を探すためのインデックス
+    op.create_index('ix_documents_updated_at', 'documents', ['updated_at'])
+    op.create_index('ix_tasks_updated_at', 'tasks', ['updated_at'])
+    op.create_index('ix_registry_requests_updated_at', 'registry_requests', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_registry_requests_updated_at', table_name='registry_requests')
+    op.drop_index('ix_tasks_updated_at', table_name='tasks')
+    op.drop_index('ix_documents_updated_at', table_name='documents')
+    op.drop_table('rollup_state')
+    op.drop_table('daily_rollups')
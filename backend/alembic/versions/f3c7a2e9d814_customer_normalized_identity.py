@@ -0,0 +1,79 @@
+"""normalized identity columns for customer deduplication
+
+Revision ID: f3c7a2e9d814
+Revises: b8e4d2a7c613
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c7a2e9d814'
+down_revision = 'b8e4d2a7c613'
+branch_labels = None
+depends_on = None
+
+
+def normalize_text(value):
+    # このリビジョン時点の app.services.persistence.normalize_text と同じ処理
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKC", str(value))
+    text = re.sub(r"[‐‑‒–—―−－ｰ]", "-", text)
+    return re.sub(r"\s+", "", text)
+
+
+def _backfill(bind):
+    customers = sa.table(
+        'customers',
+        sa.column('id', sa.Integer),
+        sa.column('name', sa.String),
+        sa.column('address', sa.String),
+        sa.column('property_address', sa.String),
+        sa.column('normalized_name', sa.String),
+        sa.column('normalized_address', sa.String),
+        sa.column('normalized_property_address', sa.String),
+    )
+    rows = bind.execute(sa.select(
+        customers.c.id, customers.c.name, customers.c.address, customers.c.property_address
+    )).fetchall()
+    if not rows:
+        return
+    bind.execute(
+        customers.update().where(customers.c.id == sa.bindparam('customer_id')),
+        [
+            {
+                'customer_id': row.id,
+                'normalized_name': normalize_text(row.name),
+                'normalized_address': normalize_text(row.address),
+                'normalized_property_address': normalize_text(row.property_address),
+            }
+            for row in rows
+        ],
+    )
+
+
+def upgrade():
+    with op.batch_alter_table('customers') as batch_op:
+        batch_op.add_column(sa.Column('normalized_name', sa.String(100), nullable=True))
+        batch_op.add_column(sa.Column('normalized_address', sa.String(255), nullable=True))
+        batch_op.add_column(sa.Column('normalized_property_address', sa.String(255), nullable=True))
+        batch_op.create_index(
+            'ix_customers_normalized_identity',
+            ['normalized_name', 'normalized_address', 'normalized_property_address'],
+        )
+
+    _backfill(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('customers') as batch_op:
+        batch_op.drop_index('ix_customers_normalized_identity')
+        batch_op.drop_column('normalized_property_address')
+        batch_op.drop_column('normalized_address')
+        batch_op.drop_column('normalized_name')
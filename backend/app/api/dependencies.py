@@ -3,12 +3,13 @@ from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.core.security import get_current_active_user, get_current_admin_user
+from app.schemas.auth import UserPrincipal
 from app.db import models
 
 def get_document(
     document_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     document = db.query(models.Document).filter(models.Document.id == document_id).first()
     if not document:
@@ -21,7 +22,7 @@ def get_document(
 def get_task(
     task_id: str,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     task = db.query(models.Task).filter(models.Task.task_id == task_id).first()
     if not task:
@@ -0,0 +1,33 @@
+# app/api/exports.py
+'''
+エクスポート用のクエリを CSV / XLSX のレスポンスにする。
+'''
+
+import os
+
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from app.services.exports import MEDIA_TYPES, export_filename, iter_csv, write_xlsx
+
+
+def export_response(db: Session, query: Select, export_format: str, filename_prefix: str):
+    """
+    CSV はチャンクごとにストリーミングし、XLSX は一時ファイルを返した後に削除します。
+    """
+    filename = export_filename(filename_prefix, export_format)
+    if export_format == "xlsx":
+        path = write_xlsx(db, query, filename_prefix)
+        return FileResponse(
+            path,
+            media_type=MEDIA_TYPES["xlsx"],
+            filename=filename,
+            background=BackgroundTask(os.remove, path),
+        )
+    return StreamingResponse(
+        iter_csv(db, query),
+        media_type=MEDIA_TYPES["csv"],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -2,45 +2,79 @@
 from datetime import timedelta
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.security import verify_password, create_access_token, get_password_hash, get_current_active_user
+from app.core.security import (
+    create_access_token,
+    get_current_active_user,
+    get_password_hash_async,
+    verify_and_update_password,
+)
 from app.db.database import get_db
 from app.db import models
-from app.schemas.auth import Token, User, UserCreate, UserUpdate
+from app.schemas.auth import Token, User, UserCreate, UserUpdate, UserPrincipal
 
 router = APIRouter()
 
+def _get_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def _record_login(db: Session, user: models.User, new_password_hash):
+    # Update last login (bcrypt のコストが変わっていれば再ハッシュした値に置き換える)
+    user.last_login = datetime.utcnow()
+    if new_password_hash is not None:
+        user.password_hash = new_password_hash
+    db.commit()
+
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    """
+    bcrypt の検証は専用の Executor、DB アクセスはスレッドプールで実行します。
+    """
+    user = await run_in_threadpool(_get_user_by_email, db, form_data.username)
+    valid, new_password_hash = await verify_and_update_password(
+        form_data.password, user.password_hash if user else None
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    email = user.email
+    await run_in_threadpool(_record_login, db, user, new_password_hash)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": email}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
+def _create_user(db: Session, user_in: UserCreate, hashed_password: str) -> models.User:
+    db_user = models.User(
+        email=user_in.email,
+        password_hash=hashed_password,
+        name=user_in.name,
+        role=user_in.role,
+        status=user_in.status
+    )
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
 @router.post("/register", response_model=User)
-def register_user(
+async def register_user(
     user_in: UserCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     # Only admin can register new users
     if current_user.role != "admin":
@@ -50,7 +84,7 @@ def register_user(
         )
     
     # Check if user already exists
-    db_user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    db_user = await run_in_threadpool(_get_user_by_email, db, user_in.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,37 +92,49 @@ def register_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_in.password)
-    db_user = models.User(
-        email=user_in.email,
-        password_hash=hashed_password,
-        name=user_in.name,
-        role=user_in.role,
-        status=user_in.status
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    hashed_password = await get_password_hash_async(user_in.password)
+    return await run_in_threadpool(_create_user, db, user_in, hashed_password)
 
-@router.get("/me", response_model=User)
-def read_users_me(current_user: models.User = Depends(get_current_active_user)):
-    return current_user
+def _load_user(db: Session, principal: UserPrincipal) -> models.User:
+    # 認証はキャッシュ済みのスナップショットで行うため、全項目が必要な場合のみ DB から読み込む
+    user = db.get(models.User, principal.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
 
-@router.put("/me", response_model=User)
-def update_user_me(
-    user_in: UserUpdate,
+@router.get("/me", response_model=User)
+def read_users_me(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
-    # Update user
+    return _load_user(db, current_user)
+
+def _update_user(db: Session, principal: UserPrincipal, user_in: UserUpdate, hashed_password) -> models.User:
+    user = _load_user(db, principal)
+
+    # Update user (認証キャッシュはコミット時に破棄される)
     if user_in.email is not None:
-        current_user.email = user_in.email
+        user.email = user_in.email
     if user_in.name is not None:
-        current_user.name = user_in.name
-    if user_in.password is not None:
-        current_user.password_hash = get_password_hash(user_in.password)
+        user.name = user_in.name
+    if hashed_password is not None:
+        user.password_hash = hashed_password
     
     db.commit()
-    db.refresh(current_user)
-    return current_user
\ No newline at end of file
+    db.refresh(user)
+    return user
+
+@router.put("/me", response_model=User)
+async def update_user_me(
+    user_in: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    hashed_password = None
+    if user_in.password is not None:
+        hashed_password = await get_password_hash_async(user_in.password)
+    return await run_in_threadpool(_update_user, db, current_user, user_in, hashed_password)
@@ -1,12 +1,34 @@
 # app/api/routes/customers.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, status, Query, Response, UploadFile
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 
+from app.api.exports import export_response
 from app.db.database import get_db
 from app.db import models
-from app.schemas.customers import Customer, CustomerCreate, CustomerUpdate, CustomerActivity, CustomerActivityCreate
+from app.db.pagination import InvalidCursorError
+from app.db.repositories.customers import customer_repository
+from app.schemas.customers import (
+    Customer,
+    CustomerActivity,
+    CustomerActivityCreate,
+    CustomerBatchCreate,
+    CustomerCreate,
+    CustomerImportReport,
+    CustomerUpdate,
+)
 from app.core.security import get_current_active_user
+from app.schemas.auth import UserPrincipal
+from app.services.customer_import import (
+    PIPELINE_SOURCE,
+    import_customers,
+    read_task_output,
+    records_from_frame,
+)
+from app.services.dashboard import invalidate_dashboard_cache
+from app.services.persistence import normalized_customer_fields
+from app.services.exports import customer_export_query
 
 router = APIRouter()
 
@@ -14,7 +36,7 @@ router = APIRouter()
 def create_customer(
     customer_in: CustomerCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     db_customer = models.Customer(
         name=customer_in.name,
@@ -29,28 +51,121 @@ def create_customer(
         last_contact_date=customer_in.last_contact_date,
         next_contact_date=customer_in.next_contact_date,
         notes=customer_in.notes,
-        source=customer_in.source
+        source=customer_in.source,
+        **normalized_customer_fields(customer_in.name, customer_in.address, customer_in.property_address)
     )
     db.add(db_customer)
     db.commit()
     db.refresh(db_customer)
     return db_customer
 
+@router.post("/batch", response_model=CustomerImportReport)
+def create_customers_batch(
+    batch_in: CustomerBatchCreate,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    顧客をまとめて登録し、行ごとの結果（created / duplicate / invalid）を返します。
+    正規化した氏名・住所・物件所在地が同じ顧客は登録しません。
+    """
+    report = import_customers(db, batch_in.customers, dry_run=dry_run)
+    db.commit()
+    invalidate_dashboard_cache()
+    return report
+
+@router.post("/import", response_model=CustomerImportReport)
+def import_customers_from_source(
+    task_id: Optional[str] = Form(None),
+    file: Optional[UploadFile] = File(None),
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    タスクの最終出力（task_id）またはアップロードした CSV（file）から顧客を一括登録します。
+    """
+    if (task_id is None) == (file is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Specify either task_id or file"
+        )
+
+    if task_id is not None:
+        task = db.query(models.Task).filter(models.Task.task_id == task_id).first()
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task with ID {task_id} not found"
+            )
+        try:
+            frame = read_task_output(task)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        records = records_from_frame(frame, source=PIPELINE_SOURCE)
+    else:
+        import pandas as pd
+
+        try:
+            frame = pd.read_csv(file.file, dtype=str, encoding="utf-8-sig")
+        except (ValueError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid CSV: {e}")
+        records = records_from_frame(frame)
+
+    report = import_customers(db, records, dry_run=dry_run)
+    db.commit()
+    invalidate_dashboard_cache()
+    return report
+
 @router.get("/", response_model=List[Customer])
 def read_customers(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    assigned_to: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
-    customers = db.query(models.Customer).offset(skip).limit(limit).all()
+    """
+    登録の新しい順に返します。
+    次ページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定してください。
+    """
+    try:
+        customers, next_cursor = customer_repository.get_page(
+            db, cursor=cursor, limit=limit, status=status_filter, assigned_to=assigned_to
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return customers
 
+@router.get("/export")
+def export_customers(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    assigned_to: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    顧客を CSV または XLSX でエクスポートします。
+    date_from / date_to は登録日（両端を含む）で絞り込みます。
+    """
+    query = customer_export_query(
+        status=status_filter, assigned_to=assigned_to, date_from=date_from, date_to=date_to
+    )
+    return export_response(db, query, export_format, "customers")
+
 @router.get("/{customer_id}", response_model=Customer)
 def read_customer(
     customer_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
     if not customer:
@@ -65,7 +180,7 @@ def update_customer(
     customer_id: int,
     customer_in: CustomerUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
     if not customer:
@@ -77,6 +192,8 @@ def update_customer(
     # Update customer
     for key, value in customer_in.dict(exclude_unset=True).items():
         setattr(customer, key, value)
+    for key, value in normalized_customer_fields(customer.name, customer.address, customer.property_address).items():
+        setattr(customer, key, value)
     
     db.commit()
     db.refresh(customer)
@@ -86,7 +203,7 @@ def update_customer(
 def delete_customer(
     customer_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
     if not customer:
@@ -104,7 +221,7 @@ def create_customer_activity(
     customer_id: int,
     activity_in: CustomerActivityCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
     if not customer:
@@ -134,10 +251,12 @@ def create_customer_activity(
 @router.get("/{customer_id}/activities", response_model=List[CustomerActivity])
 def read_customer_activities(
     customer_id: int,
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    activity_type: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
     if not customer:
@@ -146,8 +265,12 @@ def read_customer_activities(
             detail=f"Customer with ID {customer_id} not found"
         )
     
-    activities = db.query(models.CustomerActivity).filter(
-        models.CustomerActivity.customer_id == customer_id
-    ).offset(skip).limit(limit).all()
-    
+    try:
+        activities, next_cursor = customer_repository.get_activities_page(
+            db, customer_id, cursor=cursor, limit=limit, activity_type=activity_type
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return activities
\ No newline at end of file
@@ -1,21 +1,30 @@
 # app/api/routes/documents.py
 import os
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, BackgroundTasks, Query, Response, Header
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from pathlib import Path
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, timedelta
 
-from app.db.database import get_db
+from app.core.config import settings
+from app.db.database import db_now, get_db
 from app.db import models
+from app.db.pagination import InvalidCursorError
+from app.db.repositories.documents import document_repository
+from app.db.repositories.tasks import task_repository
 from app.schemas.documents import Document, DocumentCreate, DocumentUpdate, ProcessingResult
 from app.schemas.tasks import Task, TaskCreate, TaskStatus
 from app.core.security import get_current_active_user
+from app.schemas.auth import UserPrincipal
 from app.api.dependencies import get_document, get_task
-from app.services.pdf_processing import run_pipeline
+from app.api.uploads import save_upload
+from app.api.routes.tasks import build_task_status
+from app.services.progress import ProgressReporter, TaskCancelled
+from app.services.scheduling import pipeline_scheduler
 
-from app.db.database import SessionLocal
+from app.db.database import WorkerSessionLocal
 
 router = APIRouter()
 
@@ -24,23 +33,26 @@ async def upload_document(
     document_type: str = Form(...),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     output_dir = os.getenv("OUTPUT_DIR", "./output")
-    Path(output_dir).mkdir(exist_ok=True)
     
-    # ① ファイル保存
-    file_path = os.path.join(output_dir, file.filename)
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    # ① ファイル保存（チャンク単位でストリーミングし、内容のハッシュをファイル名にする）
+    upload = await save_upload(file, output_dir, content_addressed=True)
+    
+    # 同じ内容の台帳がアップロード済みであれば既存の文書を返す
+    existing = document_repository.get_by_content_hash(db, upload.sha256, document_type)
+    if existing:
+        return existing
     
     # ② Document レコード作成(status は pending などに)
     db_document = models.Document(
         file_name=file.filename,
-        file_path=file_path,
+        file_path=upload.path,
         document_type=document_type,
         uploaded_by=current_user.id,
-        status="pending"
+        status="pending",
+        content_hash=upload.sha256
     )
     db.add(db_document)
     db.commit()
@@ -51,12 +63,26 @@ async def upload_document(
 
 @router.get("/", response_model=List[Document])
 def read_documents(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    document_type: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
-    documents = db.query(models.Document).offset(skip).limit(limit).all()
+    """
+    アップロード日時の新しい順に返します。
+    次ページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定してください。
+    """
+    try:
+        documents, next_cursor = document_repository.get_page(
+            db, cursor=cursor, limit=limit, status=status_filter, document_type=document_type
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return documents
 
 @router.get("/{document_id}", response_model=Document)
@@ -99,18 +125,42 @@ def delete_document(
 @router.post("/{document_id}/process", response_model=TaskStatus)
 def process_document(
     background_tasks: BackgroundTasks,
+    force: bool = False,
+    priority: int = Query(0, ge=-10, le=10),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     document: models.Document = Depends(get_document),
     db: Session = Depends(get_db)
 ):
+    """
+    文書の処理をキューに登録します。
+    同じ Idempotency-Key の再送や、実行中のタスクがある文書への要求には既存のタスクを返します。
+    処理済みの文書は前回のタスクの結果をそのまま返します。再処理する場合は force=true を指定してください。
+    priority が大きいタスクほど先に実行されます（例: 急ぎの 1 筆の照会は 10）。
+    """
+    existing_task = _find_existing_task(db, document.id, idempotency_key, force)
+    if existing_task:
+        return build_task_status(existing_task)
+    
     # Create task record
     task_id = str(uuid.uuid4())
     db_task = models.Task(
         task_id=task_id,
         task_type="pdf_processing",
-        status="queued"
+        status="queued",
+        priority=priority,
+        document_id=document.id,
+        idempotency_key=idempotency_key
     )
     db.add(db_task)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 別のリクエスト（別ワーカーを含む）が先にタスクを登録した
+        db.rollback()
+        existing_task = _find_existing_task(db, document.id, idempotency_key, force)
+        if existing_task is None:
+            raise
+        return build_task_status(existing_task)
     
     # Start background task
     background_tasks.add_task(
@@ -125,13 +175,65 @@ def process_document(
         message="Document processing has been queued"
     )
 
+def _find_existing_task(db: Session, document_id: int, idempotency_key: Optional[str], force: bool):
+    """
+    新しいタスクを作らずに返すべき既存のタスクを探します。
+    """
+    if idempotency_key:
+        task = task_repository.get_by_idempotency_key(db, idempotency_key)
+        if task:
+            if task.document_id != document_id:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key is already used for another document"
+                )
+            return task
+    
+    task = task_repository.get_in_flight_for_document(db, document_id)
+    if task and not _is_stale(db, task):
+        return task
+    if task:
+        # ワーカーの異常終了などで更新が止まったタスクは失敗扱いにする
+        task.status = "failed"
+        task.error_message = "Task timed out"
+        task.end_time = datetime.utcnow()
+        db.commit()
+    
+    if not force:
+        return task_repository.get_latest_completed_for_document(db, document_id)
+    return None
+
+def _is_stale(db: Session, task: models.Task) -> bool:
+    # updated_at と同じ DB の時計で比較する（実行中は ProgressReporter の heartbeat で更新される）
+    return db_now(db) - task.updated_at > timedelta(seconds=settings.TASK_IN_FLIGHT_TIMEOUT_SECONDS)
+
+
+def _touch_task(task_id: str) -> None:
+    """
+    実行中のタスクの updated_at を更新します。
+    パイプラインのセッションとは別のセッションを使い、処理途中の変更はコミットしません。
+    """
+    db = WorkerSessionLocal()
+    try:
+        db.query(models.Task).filter(
+            models.Task.task_id == task_id, models.Task.status.in_(("queued", "processing"))
+        ).update({"updated_at": func.now()}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
 
 def process_document_task(document_id: int, task_id: str):
     """
     バックグラウンドで呼ばれる関数。
     自前で DB セッションを切り、OCR→CSV→DB 更新を行います。
+    同時実行数を超える場合は優先度順に待機し、キャンセル要求があれば途中で停止します。
     """
-    db = SessionLocal()
+    # OCR・OpenAI などの重い依存はパイプラインを実行するときだけ読み込む
+    from app.services.pdf_processing import run_pipeline
+
+    db = WorkerSessionLocal()
+    reporter = ProgressReporter(task_id, heartbeat=lambda: _touch_task(task_id))
     try:
         # 1) Document が存在するか確認
         document = db.query(models.Document).filter(models.Document.id == document_id).first()
@@ -141,16 +243,34 @@ def process_document_task(document_id: int, task_id: str):
                 task.status = "failed"
                 task.error_message = f"Document with ID {document_id} not found"
                 db.commit()
+            reporter.finish("failed", f"Document with ID {document_id} not found")
             return
 
-        # 2) Task ステータスを「processing」に更新
         task = db.query(models.Task).filter(models.Task.task_id == task_id).first()
-        if task:
-            task.status = "processing"
+        priority = task.priority if task else 0
+        db.commit()  # 待機中にトランザクションを保持しない
+
+        with pipeline_scheduler.slot(priority, reporter.is_cancel_requested):
+            # 2) Task ステータスを「processing」に更新（待機中にキャンセルされていれば何もしない）
+            started = (
+                db.query(models.Task)
+                .filter(models.Task.task_id == task_id, models.Task.status == "queued")
+                .update({"status": "processing"}, synchronize_session=False)
+            )
             db.commit()
+            if task and not started:
+                return
 
-        # 3) 実際のパイプライン処理（OCR など）
-        result = run_pipeline(document.file_path, task_id)
+            # 3) 実際のパイプライン処理（OCR など）
+            result = run_pipeline(
+                document.file_path,
+                task_id,
+                on_progress=reporter,
+                db=db,
+                document_id=document.id,
+                extracted_by=document.uploaded_by,
+            )
+            reporter.raise_if_cancelled()
 
         # 4) Document のステータス更新
         document.processing_status = "completed"
@@ -158,15 +278,28 @@ def process_document_task(document_id: int, task_id: str):
         document.processed_at = datetime.utcnow()
         db.commit()
 
-        # 5) Task のステータス更新
-        if task:
-            task.status = "completed"
-            task.result = str(result)
-            task.end_time = datetime.utcnow()
+        # 5) Task のステータス更新（直前にキャンセルされたタスクは上書きしない）
+        db.query(models.Task).filter(
+            models.Task.task_id == task_id, models.Task.status == "processing"
+        ).update(
+            {"status": "completed", "result": result, "end_time": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+        reporter.finish("completed")
+
+    except TaskCancelled:
+        # キャンセル時は Task 側のステータスはキャンセル API が更新済み
+        db.rollback()
+        doc = db.query(models.Document).filter(models.Document.id == document_id).first()
+        if doc:
+            doc.processing_status = "cancelled"
             db.commit()
+        reporter.finish("cancelled")
 
     except Exception as e:
         # 失敗時のハンドリング
+        db.rollback()
         # Document 側
         doc = db.query(models.Document).filter(models.Document.id == document_id).first()
         if doc:
@@ -181,8 +314,10 @@ def process_document_task(document_id: int, task_id: str):
             task.error_message = str(e)
             task.end_time = datetime.utcnow()
             db.commit()
+        reporter.finish("failed", str(e))
 
     finally:
+        reporter.broker.clear_cancel(task_id)
         # 最後に必ずセッションを閉じる
         db.close()
 
@@ -190,17 +325,4 @@ def process_document_task(document_id: int, task_id: str):
 def get_task_status(
     task: models.Task = Depends(get_task)
 ):
-    result = None
-    if task.result:
-        try:
-            import json
-            result = json.loads(task.result.replace("'", "\""))
-        except:
-            result = {"raw_result": task.result}
-    
-    return TaskStatus(
-        task_id=task.task_id,
-        status=task.status,
-        message=f"Task is {task.status}",
-        result=result
-    )
\ No newline at end of file
+    return build_task_status(task)
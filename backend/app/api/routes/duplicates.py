@@ -0,0 +1,160 @@
+# app/api/routes/duplicates.py
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+import uuid
+
+from app.db.database import get_db, WorkerSessionLocal
+from app.db import models
+from app.db.pagination import InvalidCursorError, paginate
+from app.schemas.duplicates import DuplicateCandidate, DuplicateCandidateDetail, DuplicateRecord
+from app.schemas.tasks import TaskStatus
+from app.core.security import get_current_active_user
+from app.schemas.auth import UserPrincipal
+from app.services.dedupe import DUPLICATE_THRESHOLD, merge_candidate, scan_duplicates
+
+router = APIRouter()
+
+ENTITY_PATTERN = "^(customer|owner)$"
+
+def _get_candidate(db: Session, candidate_id: int) -> models.DuplicateCandidate:
+    candidate = db.get(models.DuplicateCandidate, candidate_id)
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Duplicate candidate with ID {candidate_id} not found"
+        )
+    if candidate.status != "pending":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Duplicate candidate is already {candidate.status}"
+        )
+    return candidate
+
+@router.post("/scan", response_model=TaskStatus)
+def start_duplicate_scan(
+    background_tasks: BackgroundTasks,
+    entity_type: str = Query(..., pattern=ENTITY_PATTERN),
+    threshold: float = Query(DUPLICATE_THRESHOLD, gt=0, le=1),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    重複候補の検出をバックグラウンドで開始します。
+    完了すると未対応の候補が入れ替わり、タスクの result に件数が入ります。
+    """
+    task_id = str(uuid.uuid4())
+    db.add(models.Task(task_id=task_id, task_type=f"dedupe_{entity_type}", status="queued"))
+    db.commit()
+
+    background_tasks.add_task(scan_duplicates_task, entity_type, threshold, task_id)
+    return TaskStatus(task_id=task_id, status="queued", message="Duplicate scan has been queued")
+
+def scan_duplicates_task(entity_type: str, threshold: float, task_id: str):
+    """
+    バックグラウンドで呼ばれる関数。自前で DB セッションを切って検出を実行します。
+    """
+    db = WorkerSessionLocal()
+    try:
+        db.query(models.Task).filter(models.Task.task_id == task_id).update(
+            {"status": "processing"}, synchronize_session=False
+        )
+        db.commit()
+
+        result = scan_duplicates(db, entity_type, threshold)
+        db.query(models.Task).filter(models.Task.task_id == task_id).update(
+            {"status": "completed", "result": result, "end_time": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        db.query(models.Task).filter(models.Task.task_id == task_id).update(
+            {"status": "failed", "error_message": str(e), "end_time": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+@router.get("/", response_model=List[DuplicateCandidateDetail])
+def read_duplicate_candidates(
+    response: Response,
+    entity_type: str = Query(..., pattern=ENTITY_PATTERN),
+    status_filter: str = Query("pending", alias="status"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    スコアの高い順に重複候補を、比較対象の 2 件と合わせて返します。
+    次ページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定してください。
+    """
+    query = db.query(models.DuplicateCandidate).filter(
+        models.DuplicateCandidate.entity_type == entity_type,
+        models.DuplicateCandidate.status == status_filter,
+    )
+    try:
+        candidates, next_cursor = paginate(
+            query, [models.DuplicateCandidate.score, models.DuplicateCandidate.id], cursor, limit
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    # 比較対象はまとめて 1 回で取得する
+    model = models.Customer if entity_type == "customer" else models.Owner
+    ids = {candidate.primary_id for candidate in candidates} | {candidate.duplicate_id for candidate in candidates}
+    records = {
+        record.id: DuplicateRecord.model_validate(record, from_attributes=True)
+        for record in db.query(model).filter(model.id.in_(ids))
+    } if ids else {}
+
+    return [
+        DuplicateCandidateDetail(
+            **DuplicateCandidate.model_validate(candidate, from_attributes=True).dict(),
+            primary=records.get(candidate.primary_id),
+            duplicate=records.get(candidate.duplicate_id),
+        )
+        for candidate in candidates
+    ]
+
+@router.post("/{candidate_id}/merge", response_model=DuplicateCandidate)
+def merge_duplicate(
+    candidate_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    重複側の活動履歴・登記請求（所有者の場合は所有関係）を残す側に付け替え、重複側を削除します。
+    残す側が未入力の項目は重複側の値で補います。
+    """
+    candidate = _get_candidate(db, candidate_id)
+    try:
+        merge_candidate(db, candidate, current_user.id)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    db.commit()
+    db.refresh(candidate)
+    return candidate
+
+@router.post("/{candidate_id}/dismiss", response_model=DuplicateCandidate)
+def dismiss_duplicate(
+    candidate_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    重複ではないとして候補を却下します。却下した組は次回以降の検出でも候補にしません。
+    """
+    candidate = _get_candidate(db, candidate_id)
+    candidate.status = "dismissed"
+    candidate.resolved_by = current_user.id
+    candidate.resolved_at = datetime.utcnow()
+    db.commit()
+    db.refresh(candidate)
+    return candidate
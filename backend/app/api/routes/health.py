@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db, pool_metrics
+from app.services.health import check_readiness
+
+router = APIRouter()
+
+@router.get("/health/live")
+def live():
+    """
+    プロセスが応答できるかを返します（DB などの依存先は確認しません）。
+    """
+    return {"status": "ok"}
+
+@router.get("/health/ready")
+@router.get("/ready", include_in_schema=False)
+def ready(db: Session = Depends(get_db)):
+    """
+    DB・Redis・起動時のウォームアップを確認し、リクエストを受け入れられる場合は 200、
+    受け入れられない場合は 503 と依存先ごとの状態を返します。
+    """
+    is_ready, checks = check_readiness(db)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if is_ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ok" if is_ready else "unavailable", "checks": checks},
+    )
+
+@router.get("/health/db-pool")
+def db_pool():
+    """
+    API 用・バックグラウンド処理用の接続プールの使用状況（使用中の接続数・飽和度）と、
+    接続の取り出しにかかった待ち時間・タイムアウトの回数を返します。
+    """
+    return pool_metrics()
@@ -1,12 +1,15 @@
 # app/api/routes/owners.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.db.database import get_db
 from app.db import models
+from app.db.pagination import InvalidCursorError
+from app.db.repositories.owners import owner_repository
 from app.schemas.owners import Owner, OwnerCreate, OwnerUpdate
 from app.core.security import get_current_active_user
+from app.schemas.auth import UserPrincipal
 
 router = APIRouter()
 
@@ -14,7 +17,7 @@ router = APIRouter()
 def create_owner(
     owner_in: OwnerCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     db_owner = models.Owner(
         name=owner_in.name,
@@ -30,19 +33,32 @@ def create_owner(
 
 @router.get("/", response_model=List[Owner])
 def read_owners(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    postal_code: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
-    owners = db.query(models.Owner).offset(skip).limit(limit).all()
+    """
+    登録の新しい順に返します。
+    次ページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定してください。
+    """
+    try:
+        owners, next_cursor = owner_repository.get_page(
+            db, cursor=cursor, limit=limit, postal_code=postal_code
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return owners
 
 @router.get("/{owner_id}", response_model=Owner)
 def read_owner(
     owner_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     owner = db.query(models.Owner).filter(models.Owner.id == owner_id).first()
     if not owner:
@@ -57,7 +73,7 @@ def update_owner(
     owner_id: int,
     owner_in: OwnerUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     owner = db.query(models.Owner).filter(models.Owner.id == owner_id).first()
     if not owner:
@@ -86,7 +102,7 @@ def update_owner(
 def delete_owner(
     owner_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     owner = db.query(models.Owner).filter(models.Owner.id == owner_id).first()
     if not owner:
@@ -2,12 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 
-from app.db.database import get_db
+from app.db.database import get_db, WorkerSessionLocal
 from app.db import models
+from app.db.repositories.documents import document_repository
 from app.core.security import get_current_active_user
-from app.services.extract_info import get_cleaned_addresses, extract_registry_office
-from app.services.auto_mode import run_auto_mode
-from app.utils.helpers import ensure_dir, is_valid_pdf
+from app.schemas.auth import UserPrincipal
+from app.services.persistence import persist_properties
+from app.utils.helpers import is_valid_pdf
+from app.api.uploads import save_upload
 import os
 
 router = APIRouter()
@@ -16,7 +18,7 @@ router = APIRouter()
 async def extract_addresses(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     PDFファイルから住所リストを抽出します。
@@ -28,14 +30,13 @@ async def extract_addresses(
         )
     
     # 一時ファイルとして保存
-    output_dir = ensure_dir(os.getenv("OUTPUT_DIR", "./output"))
-    temp_file_path = os.path.join(output_dir, file.filename)
-    
-    with open(temp_file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    upload = await save_upload(file, os.getenv("OUTPUT_DIR", "./output"))
+    temp_file_path = upload.path
     
     try:
-        # 住所リストを抽出
+        # 住所リストを抽出（OCR・OpenAI の依存はここで読み込む）
+        from app.services.extract_info import get_cleaned_addresses
+
         addresses = get_cleaned_addresses(temp_file_path)
         return addresses
     except Exception as e:
@@ -51,11 +52,13 @@ async def extract_addresses(
 async def download_registry_pdfs(
     background_tasks: BackgroundTasks,  # BackgroundTasksを先に配置
     file: UploadFile = File(...),
+    force: bool = False,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
     """
     PDFファイルから住所を抽出し、登記情報PDFをダウンロードします。
+    同じ内容の台帳が処理中・処理済みであれば、force=true を指定しない限り既存の文書を返します。
     """
     if not is_valid_pdf(file.filename):
         raise HTTPException(
@@ -63,19 +66,25 @@ async def download_registry_pdfs(
             detail="PDFファイルのみアップロード可能です"
         )
     
-    # ファイルを保存
-    output_dir = ensure_dir(os.getenv("OUTPUT_DIR", "./output"))
-    file_path = os.path.join(output_dir, file.filename)
+    # ファイルを保存（内容のハッシュをファイル名にする）
+    upload = await save_upload(file, os.getenv("OUTPUT_DIR", "./output"), content_addressed=True)
+    file_path = upload.path
     
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    existing = document_repository.get_by_content_hash(db, upload.sha256, "registry_ledger")
+    if existing and existing.processing_status != "failed" and not force:
+        return {
+            "message": "同じ内容の台帳は既にダウンロード済みまたはダウンロード中です",
+            "document_id": existing.id,
+            "status": existing.processing_status
+        }
     
     # ドキュメントレコードを作成
     db_document = models.Document(
         file_name=file.filename,
         file_path=file_path,
         document_type="registry_ledger",
-        uploaded_by=current_user.id
+        uploaded_by=current_user.id,
+        content_hash=upload.sha256
     )
     db.add(db_document)
     db.commit()
@@ -85,8 +94,7 @@ async def download_registry_pdfs(
     background_tasks.add_task(
         download_registry_pdfs_task,
         file_path,
-        db_document.id,
-        db
+        db_document.id
     )
     
     return {
@@ -95,41 +103,43 @@ async def download_registry_pdfs(
         "status": "processing"
     }
 
-def download_registry_pdfs_task(file_path: str, document_id: int, db: Session):
+def download_registry_pdfs_task(file_path: str, document_id: int):
     """
     バックグラウンドタスクとして登記情報PDFをダウンロードします。
+    ダウンロードしたPDFの物件は、ダウンローダーのマニフェスト（住所・登記所名）から
+    1 つの文でまとめて登録します。
+    ダウンロードは長時間かかるため、リクエストのセッションではなくバックグラウンド処理用の
+    プールから接続を取ります。
     """
-    document = db.query(models.Document).filter(models.Document.id == document_id).first()
-    if not document:
-        return
-    
+    db = WorkerSessionLocal()
     try:
-        # 登記情報PDFをダウンロード
-        pdf_paths = run_auto_mode(file_path)
-        
-        # ドキュメントステータスを更新
-        document.processing_status = "completed"
-        document.status = "processed"
-        db.commit()
-        
-        # 各PDFに対応するプロパティレコードを作成
-        for pdf_path in pdf_paths:
-            # PDFからテキストを抽出して登記所名を取得
-            with open(pdf_path, 'rb') as f:
-                registry_office = extract_registry_office(pdf_path)
-            
-            # プロパティレコードを作成
-            property_address = os.path.basename(pdf_path).replace('_', ' ').replace('-', '/').replace('.pdf', '')
-            db_property = models.Property(
-                property_address=property_address,
-                registry_office=registry_office,
-                property_type="land"  # デフォルト値
+        document = db.query(models.Document).filter(models.Document.id == document_id).first()
+        if not document:
+            return
+
+        try:
+            # 登記情報PDFをダウンロード（登記所名は台帳ごとに 1 回だけ抽出）
+            from app.services.auto_mode import download_ledger
+
+            manifest = download_ledger(file_path, run_key=f"document-{document_id}")
+
+            # 各PDFに対応するプロパティレコードを作成
+            persist_properties(
+                db,
+                [entry["address"] for entry in manifest["downloads"]],
+                manifest["registry_office"],
             )
-            db.add(db_property)
+
+            # ドキュメントステータスを更新
+            document.processing_status = "completed"
+            document.status = "processed"
             db.commit()
-    
-    except Exception as e:
-        # エラー時の処理
-        document.processing_status = "failed"
-        document.error_message = str(e)
-        db.commit()
\ No newline at end of file
+
+        except Exception as e:
+            # エラー時の処理
+            db.rollback()
+            document.processing_status = "failed"
+            document.error_message = str(e)
+            db.commit()
+    finally:
+        db.close()
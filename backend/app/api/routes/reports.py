@@ -1,21 +1,24 @@
 # app/api/routes/reports.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-import pandas as pd
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
 from sqlalchemy import func
 
+from app.api.exports import export_response
 from app.db.database import get_db
 from app.db import models
 from app.core.security import get_current_active_user, get_current_admin_user
+from app.schemas.auth import UserPrincipal
+from app.services import dashboard, rollups
+from app.services.exports import lead_export_query
 
 router = APIRouter()
 
 @router.get("/dashboard", response_model=Dict[str, Any])
 def get_dashboard_data(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
 ):
     """
     ダッシュボード用の集計データを返します。
@@ -24,89 +27,16 @@ def get_dashboard_data(
     - recent_tasks: 最新タスク実行 5 件
     - customer_status: 顧客ステータスごとの件数
     - task_status: タスクステータスごとの件数
-    """
-
-    # 各テーブルの総件数を取得
-    document_count = db.query(func.count(models.Document.id)).scalar()
-    customer_count = db.query(func.count(models.Customer.id)).scalar()
-    task_count = db.query(func.count(models.Task.id)).scalar()
-    error_count = (
-        db.query(func.count(models.ErrorReport.id))
-        .filter(models.ErrorReport.status == "open")
-        .scalar()
-    )
-
-    # 最新アップロード文書 5 件
-    recent_documents = (
-        db.query(models.Document)
-        .order_by(models.Document.upload_date.desc())
-        .limit(5)
-        .all()
-    )
-
-    # 最新タスク実行 5 件
-    recent_tasks = (
-        db.query(models.Task)
-        .order_by(models.Task.start_time.desc())
-        .limit(5)
-        .all()
-    )
-
-    # 顧客ステータスごとの分布
-    customer_status_rows = (
-        db.query(models.Customer.status, func.count(models.Customer.id))
-        .group_by(models.Customer.status)
-        .all()
-    )
-    customer_status_data: Dict[str, int] = {
-        status: count for status, count in customer_status_rows
-    }
-
-    # タスクステータスごとの分布
-    task_status_rows = (
-        db.query(models.Task.status, func.count(models.Task.id))
-        .group_by(models.Task.status)
-        .all()
-    )
-    task_status_data: Dict[str, int] = {
-        status: count for status, count in task_status_rows
-    }
 
-    return {
-        "counts": {
-            "documents": document_count,
-            "customers": customer_count,
-            "tasks": task_count,
-            "errors": error_count,
-        },
-        "recent_documents": [
-            {
-                "id": doc.id,
-                "file_name": doc.file_name,
-                "document_type": doc.document_type,
-                "status": doc.status,
-                "upload_date": doc.upload_date,
-            }
-            for doc in recent_documents
-        ],
-        "recent_tasks": [
-            {
-                "id": task.id,
-                "task_id": task.task_id,
-                "task_type": task.task_type,
-                "status": task.status,
-                "start_time": task.start_time,
-            }
-            for task in recent_tasks
-        ],
-        "customer_status": customer_status_data,
-        "task_status": task_status_data,
-    }
+    集計は 1 クエリで取得し、DASHBOARD_CACHE_TTL_SECONDS の間キャッシュします。
+    文書・タスク・顧客・エラーレポートの変更時にはキャッシュを破棄します。
+    """
+    return dashboard.get_dashboard_data(db)
 
 @router.get("/customers/status", response_model=Dict[str, int])
 def get_customer_status_report(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
 ):
     """
     顧客ステータスごとのレコード数を返します。
@@ -122,46 +52,146 @@ def get_customer_status_report(
     return {status: count for status, count in rows}
 
 
-@router.get("/tasks/status", response_model=Dict[str, int])
+@router.get("/tasks/status", response_model=Dict[str, Any])
 def get_task_status_report(
+    window_hours: int = Query(24, ge=1, le=24 * 30),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
 ):
     """
-    タスクステータスごとのレコード数を返します。
+    タスクの状況を返します。
+    - by_status: タスクステータスごとのレコード数
+    - by_priority: 優先度ごとの待機中・実行中の件数と、直近 window_hours 時間に開始して
+      完了したタスクの件数・スループット（件/時）・平均所要時間（秒）
     """
-    rows = (
-        db.query(
-            models.Task.status,
-            func.count(models.Task.id).label("count"),
+    by_status = {
+        status: count
+        for status, count in (
+            db.query(
+                models.Task.status,
+                func.count(models.Task.id).label("count"),
+            )
+            .group_by(models.Task.status)
+            .all()
         )
-        .group_by(models.Task.status)
+    }
+
+    by_priority: Dict[str, Dict[str, Any]] = {}
+
+    def bucket(priority: int) -> Dict[str, Any]:
+        return by_priority.setdefault(str(priority), {
+            "queued": 0,
+            "processing": 0,
+            "completed": 0,
+            "throughput_per_hour": 0.0,
+            "avg_duration_seconds": None,
+        })
+
+    in_flight = (
+        db.query(models.Task.status, models.Task.priority, func.count(models.Task.id))
+        .filter(models.Task.status.in_(["queued", "processing"]))
+        .group_by(models.Task.status, models.Task.priority)
         .all()
     )
-    return {status: count for status, count in rows}
+    for task_status, priority, count in in_flight:
+        bucket(priority)[task_status] = count
+
+    since = datetime.utcnow() - timedelta(hours=window_hours)
+    completed = (
+        db.query(models.Task.priority, models.Task.start_time, models.Task.end_time)
+        .filter(models.Task.status == "completed", models.Task.start_time >= since)
+        .all()
+    )
+    durations: Dict[int, List[float]] = {}
+    for priority, start_time, end_time in completed:
+        bucket(priority)["completed"] += 1
+        if end_time is not None:
+            durations.setdefault(priority, []).append((end_time - start_time).total_seconds())
+    for priority, values in durations.items():
+        bucket(priority)["avg_duration_seconds"] = round(sum(values) / len(values), 1)
+    for stats in by_priority.values():
+        stats["throughput_per_hour"] = round(stats["completed"] / window_hours, 3)
+
+    return {
+        "by_status": by_status,
+        "by_priority": dict(sorted(by_priority.items(), key=lambda item: -int(item[0]))),
+        "window_hours": window_hours,
+    }
 
 
 @router.get("/documents/monthly", response_model=Dict[str, int])
 def get_monthly_document_report(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
 ):
     """
     過去12か月間の月単位アップロード件数を "YYYY-MM" : count の辞書で返します。
     """
-    now = datetime.utcnow()
-    start_date = now - timedelta(days=365)
+    start_day = (datetime.utcnow() - timedelta(days=365)).date()
+    months = rollups.monthly_rollups(db, "documents", start_day)
+    return {
+        month: sum(bucket["count"] for bucket in dimensions.values())
+        for month, dimensions in months.items()
+    }
+
+
+@router.get("/tasks/monthly", response_model=Dict[str, Dict[str, int]])
+def get_monthly_task_report(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+):
+    """
+    過去12か月間の月単位タスク件数をステータス別に返します。
+    例: {"2025-04": {"completed": 10, "failed": 1}}
+    """
+    start_day = (datetime.utcnow() - timedelta(days=365)).date()
+    months = rollups.monthly_rollups(db, "tasks", start_day)
+    return {
+        month: {status: bucket["count"] for status, bucket in dimensions.items()}
+        for month, dimensions in months.items()
+    }
 
-    rows = (
-        db.query(
-            func.date_trunc("month", models.Document.upload_date).label("month"),
-            func.count(models.Document.id).label("count"),
-        )
-        .filter(models.Document.upload_date >= start_date)
-        .group_by("month")
-        .order_by("month")
-        .all()
-    )
 
-    # month は datetime.datetime 型。%Y-%m 形式の文字列キーに変換
-    return {row.month.strftime("%Y-%m"): row.count for row in rows}
\ No newline at end of file
+@router.get("/registry/monthly", response_model=Dict[str, Dict[str, int]])
+def get_monthly_registry_report(
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+):
+    """
+    過去12か月間の月単位の登記情報請求件数と費用（円）を返します。
+    例: {"2025-04": {"requests": 12, "cost": 3972}}
+    """
+    start_day = (datetime.utcnow() - timedelta(days=365)).date()
+    months = rollups.monthly_rollups(db, "registry_requests", start_day)
+    return {
+        month: {
+            "requests": sum(bucket["count"] for bucket in dimensions.values()),
+            "cost": sum(bucket["amount"] for bucket in dimensions.values()),
+        }
+        for month, dimensions in months.items()
+    }
+
+
+@router.get("/leads/export")
+def export_leads(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    document_id: Optional[int] = None,
+    prefecture: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+):
+    """
+    抽出済みのリード（extracted_data）を CSV または XLSX でエクスポートします。
+    date_from / date_to は抽出日（両端を含む）で絞り込みます。
+    """
+    query = lead_export_query(
+        status=status_filter,
+        document_id=document_id,
+        prefecture=prefecture,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return export_response(db, query, export_format, "leads")
@@ -0,0 +1,38 @@
+# app/api/routes/search.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.database import get_db
+from app.core.security import get_current_active_user
+from app.schemas.auth import UserPrincipal
+from app.schemas.search import SearchResult
+from app.services.search import SEARCH_TYPES, search
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchResult])
+def search_records(
+    q: str = Query(..., min_length=2, max_length=100),
+    types: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user)
+):
+    """
+    顧客・所有者・物件の氏名や住所を部分一致・あいまい一致で検索し、一致度の高い順に返します。
+    types で対象（customer / owner / property）を絞り込めます。
+    """
+    # 前後の空白を除くと 2 文字未満になる検索語は全件に一致してしまうため受け付けない
+    if len(q.strip()) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Search query must contain at least 2 non-whitespace characters"
+        )
+    unknown = set(types or []) - set(SEARCH_TYPES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown search types: {', '.join(sorted(unknown))}"
+        )
+    return search(db, q, types=types, limit=limit)
@@ -1,41 +1,176 @@
 # app/api/routes/tasks.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.db import models
+from app.db.pagination import InvalidCursorError
+from app.db.repositories.tasks import task_repository
 from app.schemas.tasks import Task, TaskStatus
 from app.core.security import get_current_active_user
+from app.schemas.auth import UserPrincipal
 from app.api.dependencies import get_task
+from app.services.progress import TERMINAL_STATUSES, get_progress_broker
 
 router = APIRouter()
 
+# 進捗イベントが来ない間に keepalive を送る間隔（秒）
+SSE_KEEPALIVE_SECONDS = 15
+
+def build_task_status(task: models.Task) -> TaskStatus:
+    """
+    Task レコードと最新の進捗から TaskStatus を組み立てます。
+    result は JSON カラムの dict をそのまま返します。
+    """
+    # 実行中であればブローカーの最新進捗を返す
+    snapshot = get_progress_broker().latest(task.task_id)
+    progress = 100.0 if task.status == "completed" else (snapshot or {}).get("progress")
+    message = snapshot["message"] if snapshot else f"Task is {task.status}"
+
+    return TaskStatus(
+        task_id=task.task_id,
+        status=task.status,
+        progress=progress,
+        message=message,
+        result=task.result
+    )
+
 @router.get("/", response_model=List[Task])
 def read_tasks(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    min_pdf_count: Optional[int] = None,
+    min_owner_count: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: UserPrincipal = Depends(get_current_active_user)
 ):
-    tasks = db.query(models.Task).offset(skip).limit(limit).all()
+    """
+    開始日時の新しい順に返します。
+    次ページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定してください。
+    """
+    try:
+        tasks, next_cursor = task_repository.get_page(
+            db,
+            cursor=cursor,
+            limit=limit,
+            status=status_filter,
+            min_pdf_count=min_pdf_count,
+            min_owner_count=min_owner_count
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return tasks
 
 @router.get("/{task_id}", response_model=TaskStatus)
 def read_task(
     task: models.Task = Depends(get_task)
 ):
-    result = None
-    if task.result:
+    return build_task_status(task)
+
+@router.post("/{task_id}/cancel", response_model=TaskStatus)
+def cancel_task(
+    task: models.Task = Depends(get_task),
+    db: Session = Depends(get_db)
+):
+    """
+    タスクをキャンセルします。
+    待機中のタスクは実行されず、実行中のタスクは次のページ・住所・PDF の区切りで停止します。
+    """
+    if task.status in TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task is already {task.status}"
+        )
+
+    broker = get_progress_broker()
+    broker.request_cancel(task.task_id)
+
+    task.status = "cancelled"
+    task.end_time = datetime.utcnow()
+    db.commit()
+    broker.publish(task.task_id, _terminal_event(task.task_id, "cancelled"))
+    return build_task_status(task)
+
+def _format_sse(event: dict) -> str:
+    return f"event: progress\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+def _terminal_event(task_id: str, task_status: str) -> dict:
+    return {
+        "task_id": task_id,
+        "status": task_status,
+        "progress": 100.0 if task_status == "completed" else None,
+        "message": f"Task is {task_status}",
+    }
+
+def _load_task_status(task_id: str) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        task = db.query(models.Task.status).filter(models.Task.task_id == task_id).first()
+        return task.status if task else None
+    finally:
+        db.close()
+
+@router.get("/{task_id}/events")
+async def stream_task_events(
+    task: models.Task = Depends(get_task)
+):
+    """
+    タスクの進捗を Server-Sent Events で配信します。
+    タスクが completed / failed / cancelled になった時点でストリームを閉じます。
+    """
+    broker = get_progress_broker()
+    task_id = task.task_id
+    task_status = task.status
+
+    async def event_stream():
+        if task_status in TERMINAL_STATUSES:
+            yield _format_sse(_terminal_event(task_id, task_status))
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            async for event in broker.subscribe(task_id):
+                await queue.put(event)
+
+        pump_task = asyncio.create_task(pump())
         try:
-            import json
-            result = json.loads(task.result.replace("'", "\""))
-        except:
-            result = {"raw_result": task.result}
-    
-    return TaskStatus(
-        task_id=task.task_id,
-        status=task.status,
-        message=f"Task is {task.status}",
-        result=result
+            snapshot = broker.latest(task_id)
+            yield _format_sse(snapshot or {
+                "task_id": task_id,
+                "status": task_status,
+                "progress": None,
+                "message": f"Task is {task_status}",
+            })
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # 購読開始前に終了していた場合に備えて DB の状態も確認する
+                    current_status = await run_in_threadpool(_load_task_status, task_id)
+                    if current_status is None or current_status in TERMINAL_STATUSES:
+                        yield _format_sse(_terminal_event(task_id, current_status or "failed"))
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_sse(event)
+                if event.get("status") in TERMINAL_STATUSES:
+                    break
+        finally:
+            pump_task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
\ No newline at end of file
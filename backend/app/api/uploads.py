@@ -0,0 +1,85 @@
+# app/api/uploads.py
+'''
+アップロードされたファイルをディスクへストリーミング保存する。
+
+本文をまとめてメモリに読み込まず、固定サイズのチャンクごとに非同期で書き込む。
+書き込み中に SHA-256 を計算し、上限サイズを超えた時点で中断する。
+一意な一時ファイルに書き込んでからリネームするため、書きかけのファイルが
+見えることはなく、同名ファイルの同時アップロードが互いを上書きすることもない。
+
+content_addressed=True の場合は内容のハッシュをファイル名にして保存し、
+同じ内容のファイルはディスク上でも 1 つにまとめる。
+'''
+
+import hashlib
+import os
+import uuid
+from typing import NamedTuple, Optional
+
+import anyio
+from fastapi import HTTPException, UploadFile, status
+
+from app.core.config import settings
+from app.utils.helpers import ensure_dir, get_file_extension
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+def _safe_filename(filename: Optional[str]) -> str:
+    # クライアントが送ったパス区切りは無視する
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    return name or "upload"
+
+
+async def save_upload(
+    file: UploadFile,
+    directory: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    content_addressed: bool = False,
+) -> StoredUpload:
+    """
+    アップロードを directory 配下の一意なパスに保存し、(パス, サイズ, SHA-256) を返します。
+    max_bytes を超えた場合は 413 を送出し、書きかけのファイルは削除します。
+    content_addressed=True の場合は directory/objects/<ハッシュ先頭2文字>/<ハッシュ><拡張子> に保存します。
+    """
+    max_bytes = settings.MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    ensure_dir(directory)
+    unique_id = uuid.uuid4().hex
+    final_path = os.path.join(directory, f"{unique_id}_{_safe_filename(file.filename)}")
+    temp_path = os.path.join(directory, f".{unique_id}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(temp_path, "wb") as buffer:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"ファイルサイズが上限 ({max_bytes} bytes) を超えています"
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+        if content_addressed:
+            sha256 = digest.hexdigest()
+            object_dir = ensure_dir(os.path.join(directory, "objects", sha256[:2]))
+            final_path = os.path.join(object_dir, f"{sha256}{get_file_extension(file.filename or '')}")
+        if content_addressed and os.path.exists(final_path):
+            # 同じ内容のファイルが保存済み
+            os.remove(temp_path)
+        else:
+            await anyio.to_thread.run_sync(os.replace, temp_path, final_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return StoredUpload(path=final_path, size=size, sha256=digest.hexdigest())
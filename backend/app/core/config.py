@@ -20,9 +20,25 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # 認証済みユーザー (id・ロール・状態) のキャッシュ
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAXSIZE: int = 10000
+    # bcrypt のコスト (変更するとログイン時に自動で再ハッシュされる) と同時実行数
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_CONCURRENCY: int = 2
 
     # Database
     DATABASE_URL: str
+    # API 用の接続プール。DB_POOL_TIMEOUT は空きを待つ上限、DB_POOL_RECYCLE は接続を作り直す間隔（秒）
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 30 * 60
+    # 取り出すたびに接続が生きているか確認する（DB の再起動やアイドル切断の後もエラーにしない）
+    DB_POOL_PRE_PING: bool = True
+    # パイプラインなど長時間実行するバックグラウンド処理用の接続プール（API とは別）
+    DB_WORKER_POOL_SIZE: int = 4
+    DB_WORKER_MAX_OVERFLOW: int = 4
 
     # OpenAI API
     OPENAI_API_KEY: str
@@ -32,6 +48,14 @@ class Settings(BaseSettings):
     REGISTRY_PASSWORD: str
     OUTPUT_DIR: str = "./output"
     KEN_ALL_CSV_PATH: str = "./data/x-ken-all.csv"
+    # 住所の正規化・郵便番号検索の結果をメモ化する件数
+    ADDRESS_CACHE_SIZE: int = 100000
+    # 起動時に KEN_ALL.CSV を読み込んでおくか（pandas を読み込むぶん各ワーカーのメモリが増える）
+    WARMUP_POSTAL_CODES: bool = False
+
+    # アップロードの上限サイズと、ディスクへ書き込むチャンクサイズ（バイト）
+    MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
 
     # Google Cloud Vision 認証
     GOOGLE_APPLICATION_CREDENTIALS: str
@@ -39,5 +63,29 @@ class Settings(BaseSettings):
     # Redis (Celery用)
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # タスク進捗の配信先 ("memory": プロセス内 / "redis": Redis pub/sub)
+    PROGRESS_BROKER: str = "memory"
+
+    # 1 プロセスで同時に実行するパイプライン数（超えた分は優先度順に待機）
+    PIPELINE_CONCURRENCY: int = 2
+
+    # パイプライン出力の形式 ("csv" / "parquet") と Parquet の圧縮方式
+    PIPELINE_OUTPUT_FORMAT: str = "csv"
+    PARQUET_COMPRESSION: str = "zstd"
+
+    # 実行中のまま更新されないタスクを失敗扱いにするまでの時間（秒）
+    TASK_IN_FLIGHT_TIMEOUT_SECONDS: int = 6 * 60 * 60
+    # 実行中のタスクの updated_at を更新する間隔（秒）
+    TASK_HEARTBEAT_SECONDS: int = 60
+
+    # エクスポート時に 1 回のフェッチで取り出す行数
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # ダッシュボード集計のキャッシュ有効期間（秒）
+    DASHBOARD_CACHE_TTL_SECONDS: int = 10
+
+    # 月次レポート用ロールアップの差分更新間隔（秒）
+    ROLLUP_REFRESH_SECONDS: int = 60
+
 # 設定をインスタンス化
 settings = Settings()
@@ -1,26 +1,64 @@
 # app/core/security.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.db.database import get_db
 from app.db import models
-from app.schemas.auth import TokenData
+from app.schemas.auth import TokenData, UserPrincipal
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# コストを min/max でも固定し、異なるコストのハッシュは needs_update 扱いにする
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
+# トークンの subject (email) -> UserPrincipal
+_principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt はイベントループや API のスレッドプールを占有しないよう専用の Executor で実行する
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_CONCURRENCY,
+    thread_name_prefix="password-hash",
+)
+
+async def _run_password_task(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, func, *args)
+
+async def verify_and_update_password(plain_password, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    パスワードを検証し、(一致したか, 再ハッシュ後の値) を返します。
+    コスト変更などでハッシュの更新が必要な場合のみ 2 番目の値が返ります。
+    ユーザーが存在しない場合 (hashed_password=None) も同程度の時間をかけて False を返します。
+    """
+    if hashed_password is None:
+        await _run_password_task(pwd_context.dummy_verify)
+        return False, None
+    return await _run_password_task(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await _run_password_task(pwd_context.hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -31,7 +69,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def invalidate_user_cache(email: str) -> None:
+    _principal_cache.delete(email)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserPrincipal:
+    """
+    JWT を検証し、認証済みユーザーのスナップショットを返します。
+    ユーザー情報は AUTH_CACHE_TTL_SECONDS の間キャッシュし、User の更新時に破棄します。
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -45,20 +90,47 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
-    if user is None:
-        raise credentials_exception
-    return user
 
-def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+    principal = _principal_cache.get(token_data.email)
+    if principal is None:
+        user = (
+            db.query(models.User.id, models.User.email, models.User.role, models.User.status)
+            .filter(models.User.email == token_data.email)
+            .first()
+        )
+        if user is None:
+            raise credentials_exception
+        principal = UserPrincipal.model_validate(user)
+        _principal_cache.set(token_data.email, principal)
+    return principal
+
+def get_current_active_user(current_user: UserPrincipal = Depends(get_current_user)):
     if current_user.status != "active":
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_admin_user(current_user: models.User = Depends(get_current_active_user)):
+def get_current_admin_user(current_user: UserPrincipal = Depends(get_current_active_user)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    emails = session.info.setdefault("changed_user_emails", set())
+    for instance in (*session.dirty, *session.deleted, *session.new):
+        if isinstance(instance, models.User):
+            # メールアドレスが変更された場合は変更前のキーも破棄する
+            history = inspect(instance).attrs.email.history
+            emails.update(email for email in (*history.added, *history.unchanged, *history.deleted) if email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for email in session.info.pop("changed_user_emails", set()):
+        invalidate_user_cache(email)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_emails", None)
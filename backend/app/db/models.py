@@ -1,9 +1,23 @@
 # app/db/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Date, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Date, Boolean, Float, JSON, Index, UniqueConstraint, text, DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
 
+# 検索用のトライグラムインデックス（gin_trgm_ops）に必要な拡張
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+def trigram_index(name: str, column: str) -> Index:
+    """
+    部分一致・あいまい検索用の GIN トライグラムインデックス（PostgreSQL のみ）。
+    """
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}).ddl_if(dialect="postgresql")
+
 class User(Base):
     __tablename__ = "users"
 
@@ -35,19 +49,25 @@ class Document(Base):
     file_path = Column(String(255), nullable=False)
     document_type = Column(String(50), nullable=False)
     status = Column(String(20), nullable=False, default="pending")
-    upload_date = Column(DateTime, default=func.now(), nullable=False)
+    upload_date = Column(DateTime, default=func.now(), nullable=False, index=True)
     uploaded_by = Column(Integer, ForeignKey("users.id"))
     processed_at = Column(DateTime, nullable=True)
     processing_status = Column(String(20), default="pending")
     error_message = Column(Text, nullable=True)
+    # ファイル内容の SHA-256。同じ内容の再アップロードを検出する
+    content_hash = Column(String(64), nullable=True, index=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, index=True)
 
     # リレーションシップ
     uploader = relationship("User", back_populates="documents")
     extracted_data = relationship("ExtractedData", back_populates="document")
     error_reports = relationship("ErrorReport", back_populates="document")
 
+    __table_args__ = (
+        Index("ix_documents_status_upload_date", "status", "upload_date"),
+    )
+
 
 class ExtractedData(Base):
     __tablename__ = "extracted_data"
@@ -70,6 +90,14 @@ class ExtractedData(Base):
     document = relationship("Document", back_populates="extracted_data")
     extractor = relationship("User", back_populates="extracted_data")
 
+    __table_args__ = (
+        # 同じ文書を再処理しても同じ抽出結果は重複させない
+        UniqueConstraint(
+            "document_id", "customer_name", "current_address", "inheritance_address",
+            name="uq_extracted_data_document_owner_property",
+        ),
+    )
+
 
 class Property(Base):
     __tablename__ = "properties"
@@ -87,6 +115,11 @@ class Property(Base):
     ownerships = relationship("Ownership", back_populates="property")
     registry_requests = relationship("RegistryRequest", back_populates="property")
 
+    __table_args__ = (
+        UniqueConstraint("property_address", "registry_office", name="uq_properties_address_office"),
+        trigram_index("ix_properties_property_address_trgm", "property_address"),
+    )
+
 
 class Owner(Base):
     __tablename__ = "owners"
@@ -97,12 +130,21 @@ class Owner(Base):
     postal_code = Column(String(8), nullable=True)
     phone_number = Column(String(20), nullable=True)
     email = Column(String(255), nullable=True)
+    # 重複判定用に正規化した氏名・住所（手入力の所有者では NULL）
+    normalized_name = Column(String(100), nullable=True)
+    normalized_address = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
     # リレーションシップ
     ownerships = relationship("Ownership", back_populates="owner")
 
+    __table_args__ = (
+        UniqueConstraint("normalized_name", "normalized_address", name="uq_owners_normalized_name_address"),
+        trigram_index("ix_owners_name_trgm", "name"),
+        trigram_index("ix_owners_address_trgm", "address"),
+    )
+
 
 class Ownership(Base):
     __tablename__ = "ownerships"
@@ -121,6 +163,10 @@ class Ownership(Base):
     property = relationship("Property", back_populates="ownerships")
     owner = relationship("Owner", back_populates="ownerships")
 
+    __table_args__ = (
+        UniqueConstraint("property_id", "owner_id", name="uq_ownerships_property_owner"),
+    )
+
 
 class Customer(Base):
     __tablename__ = "customers"
@@ -133,12 +179,16 @@ class Customer(Base):
     postal_code = Column(String(8), nullable=True)
     property_address = Column(String(255), nullable=False)
     property_type = Column(String(50), nullable=True)
-    status = Column(String(20), nullable=False, default="new")
+    status = Column(String(20), nullable=False, default="new", index=True)
     assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
     last_contact_date = Column(Date, nullable=True)
-    next_contact_date = Column(Date, nullable=True)
+    next_contact_date = Column(Date, nullable=True, index=True)
     notes = Column(Text, nullable=True)
     source = Column(String(50), nullable=True)
+    # 重複判定用に正規化した氏名・住所・物件所在地
+    normalized_name = Column(String(100), nullable=True)
+    normalized_address = Column(String(255), nullable=True)
+    normalized_property_address = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -147,12 +197,22 @@ class Customer(Base):
     activities = relationship("CustomerActivity", back_populates="customer")
     registry_requests = relationship("RegistryRequest", back_populates="customer")
 
+    __table_args__ = (
+        Index(
+            "ix_customers_normalized_identity",
+            "normalized_name", "normalized_address", "normalized_property_address",
+        ),
+        trigram_index("ix_customers_name_trgm", "name"),
+        trigram_index("ix_customers_address_trgm", "address"),
+        trigram_index("ix_customers_property_address_trgm", "property_address"),
+    )
+
 
 class CustomerActivity(Base):
     __tablename__ = "customer_activities"
 
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"))
     activity_date = Column(Date, nullable=False)
     activity_type = Column(String(20), nullable=False)
     description = Column(Text, nullable=False)
@@ -165,6 +225,11 @@ class CustomerActivity(Base):
     customer = relationship("Customer", back_populates="activities")
     creator = relationship("User", back_populates="customer_activities")
 
+    __table_args__ = (
+        # 顧客ごとの活動履歴を日付順に取得するための複合インデックス
+        Index("ix_customer_activities_customer_id_activity_date", "customer_id", "activity_date"),
+    )
+
 
 class RegistryRequest(Base):
     __tablename__ = "registry_requests"
@@ -180,7 +245,7 @@ class RegistryRequest(Base):
     cost = Column(Integer, default=331)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, index=True)
 
     # リレーションシップ
     property = relationship("Property", back_populates="registry_requests")
@@ -245,6 +310,16 @@ class ErrorReport(Base):
     reporter = relationship("User", foreign_keys=[reported_by], back_populates="reported_errors")
     resolver = relationship("User", foreign_keys=[resolved_by], back_populates="resolved_errors")
 
+    __table_args__ = (
+        # 未対応 (open) のエラーのみを対象とした部分インデックス
+        Index(
+            "ix_error_reports_open",
+            "reported_at",
+            postgresql_where=text("status = 'open'"),
+            sqlite_where=text("status = 'open'"),
+        ),
+    )
+
 
 class PostalCode(Base):
     __tablename__ = "postal_codes"
@@ -265,9 +340,74 @@ class Task(Base):
     task_id = Column(String(36), unique=True, nullable=False)
     task_type = Column(String(50), nullable=False)
     status = Column(String(20), nullable=False, default="processing")
-    result = Column(Text, nullable=True)
-    start_time = Column(DateTime, default=func.now(), nullable=False)
+    # 大きいほど先に実行する
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True, index=True)
+    # クライアントが Idempotency-Key ヘッダーで指定したキー
+    idempotency_key = Column(String(255), nullable=True, unique=True)
+    # PostgreSQL では JSONB、その他 (テスト用 SQLite) では JSON として保存
+    result = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    start_time = Column(DateTime, default=func.now(), nullable=False, index=True)
     end_time = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_tasks_status_start_time", "status", "start_time"),
+        # 1 つの文書に対して実行中 (queued / processing) のタスクは 1 つだけ
+        Index(
+            "uq_tasks_document_in_flight",
+            "document_id",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'processing')"),
+            sqlite_where=text("status IN ('queued', 'processing')"),
+        ),
+        # result 内の件数でタスクを絞り込むための式インデックス
+        Index("ix_tasks_result_pdf_count", text("((result ->> 'pdf_count')::integer)")).ddl_if(dialect="postgresql"),
+        Index("ix_tasks_result_owner_count", text("((result ->> 'owner_count')::integer)")).ddl_if(dialect="postgresql"),
+    )
+
+
+# 日次の集計値（レポート用）。月次の値は日次を合算して求める。
+# metric: documents / tasks / registry_requests
+# dimension: tasks・registry_requests ではステータス、documents では空文字
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    metric = Column(String(50), primary_key=True)
+    dimension = Column(String(50), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+    amount = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class RollupState(Base):
+    __tablename__ = "rollup_state"
+
+    name = Column(String(50), primary_key=True)
+    refreshed_at = Column(DateTime, nullable=False)
+
+
+# 重複検出ジョブが見つけた重複候補。primary_id に duplicate_id を統合する想定。
+# entity_type: customer / owner
+# status: pending / merged / dismissed
+class DuplicateCandidate(Base):
+    __tablename__ = "duplicate_candidates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(20), nullable=False)
+    primary_id = Column(Integer, nullable=False)
+    duplicate_id = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    resolved_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    resolved_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("entity_type", "primary_id", "duplicate_id", name="uq_duplicate_candidates_pair"),
+        Index("ix_duplicate_candidates_entity_status_score", "entity_type", "status", "score"),
+    )
@@ -0,0 +1,77 @@
+# app/db/pagination.py
+'''
+キーセット（カーソル）ページネーション。
+
+OFFSET を使わず「前ページ最後の行のソートキーより小さいもの」を取得するため、
+何ページ目であってもインデックスを使って一定時間で取得できる。
+カーソルはソートキーの値を JSON → base64url にした不透明な文字列。
+'''
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursorError(ValueError):
+    """
+    カーソル文字列が不正な場合に送出されます。
+    """
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _coerce(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def paginate(
+    query: Query,
+    columns: Sequence,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    columns の降順でページを取得し、(行のリスト, 次ページのカーソル) を返します。
+    columns の最後は主キーなど一意な列にしてください。次ページがなければカーソルは None です。
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if len(columns) == 1:
+            query = query.filter(columns[0] < values[0])
+        else:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    rows = query.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return rows, next_cursor
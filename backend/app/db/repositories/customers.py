@@ -1,10 +1,12 @@
 # app/db/repositories/customers.py
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import date
 
 from app.db import models
+from app.db.pagination import paginate
 from app.schemas.customers import CustomerCreate, CustomerUpdate, CustomerActivityCreate
+from app.services.persistence import normalized_customer_fields
 
 class CustomerRepository:
     def create(self, db: Session, customer_in: CustomerCreate) -> models.Customer:
@@ -21,7 +23,8 @@ class CustomerRepository:
             last_contact_date=customer_in.last_contact_date,
             next_contact_date=customer_in.next_contact_date,
             notes=customer_in.notes,
-            source=customer_in.source
+            source=customer_in.source,
+            **normalized_customer_fields(customer_in.name, customer_in.address, customer_in.property_address)
         )
         db.add(db_customer)
         db.commit()
@@ -32,12 +35,31 @@ class CustomerRepository:
         return db.query(models.Customer).filter(models.Customer.id == customer_id).first()
     
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[models.Customer]:
-        return db.query(models.Customer).offset(skip).limit(limit).all()
+        return db.query(models.Customer).order_by(models.Customer.id).offset(skip).limit(limit).all()
+
+    def get_page(
+        self,
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        status: Optional[str] = None,
+        assigned_to: Optional[int] = None
+    ) -> Tuple[List[models.Customer], Optional[str]]:
+        query = db.query(models.Customer)
+        if status is not None:
+            query = query.filter(models.Customer.status == status)
+        if assigned_to is not None:
+            query = query.filter(models.Customer.assigned_to == assigned_to)
+        return paginate(query, [models.Customer.id], cursor, limit)
     
     def update(self, db: Session, db_customer: models.Customer, customer_in: CustomerUpdate) -> models.Customer:
         update_data = customer_in.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_customer, field, value)
+        for field, value in normalized_customer_fields(
+            db_customer.name, db_customer.address, db_customer.property_address
+        ).items():
+            setattr(db_customer, field, value)
         
         db.commit()
         db.refresh(db_customer)
@@ -83,6 +105,26 @@ class CustomerRepository:
     ) -> List[models.CustomerActivity]:
         return db.query(models.CustomerActivity).filter(
             models.CustomerActivity.customer_id == customer_id
-        ).offset(skip).limit(limit).all()
+        ).order_by(models.CustomerActivity.activity_date, models.CustomerActivity.id).offset(skip).limit(limit).all()
+
+    def get_activities_page(
+        self,
+        db: Session,
+        customer_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        activity_type: Optional[str] = None
+    ) -> Tuple[List[models.CustomerActivity], Optional[str]]:
+        query = db.query(models.CustomerActivity).filter(
+            models.CustomerActivity.customer_id == customer_id
+        )
+        if activity_type is not None:
+            query = query.filter(models.CustomerActivity.activity_type == activity_type)
+        return paginate(
+            query,
+            [models.CustomerActivity.activity_date, models.CustomerActivity.id],
+            cursor,
+            limit
+        )
 
 customer_repository = CustomerRepository()
\ No newline at end of file
@@ -1,9 +1,10 @@
 # app/db/repositories/documents.py
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from app.db import models
+from app.db.pagination import paginate
 from app.schemas.documents import DocumentCreate, DocumentUpdate
 
 class DocumentRepository:
@@ -22,8 +23,34 @@ class DocumentRepository:
     def get_by_id(self, db: Session, document_id: int) -> Optional[models.Document]:
         return db.query(models.Document).filter(models.Document.id == document_id).first()
     
+    def get_by_content_hash(self, db: Session, content_hash: str, document_type: str) -> Optional[models.Document]:
+        """
+        同じ内容・種別で最初にアップロードされた文書を返します。
+        """
+        return (
+            db.query(models.Document)
+            .filter(models.Document.content_hash == content_hash, models.Document.document_type == document_type)
+            .order_by(models.Document.id)
+            .first()
+        )
+    
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[models.Document]:
-        return db.query(models.Document).offset(skip).limit(limit).all()
+        return db.query(models.Document).order_by(models.Document.id).offset(skip).limit(limit).all()
+
+    def get_page(
+        self,
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        status: Optional[str] = None,
+        document_type: Optional[str] = None
+    ) -> Tuple[List[models.Document], Optional[str]]:
+        query = db.query(models.Document)
+        if status is not None:
+            query = query.filter(models.Document.status == status)
+        if document_type is not None:
+            query = query.filter(models.Document.document_type == document_type)
+        return paginate(query, [models.Document.upload_date, models.Document.id], cursor, limit)
     
     def update(self, db: Session, db_document: models.Document, document_in: DocumentUpdate) -> models.Document:
         update_data = document_in.dict(exclude_unset=True)
@@ -1,8 +1,9 @@
 # app/db/repositories/owners.py
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from app.db import models
+from app.db.pagination import paginate
 from app.schemas.owners import OwnerCreate, OwnerUpdate
 
 class OwnerRepository:
@@ -23,7 +24,19 @@ class OwnerRepository:
         return db.query(models.Owner).filter(models.Owner.id == owner_id).first()
     
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[models.Owner]:
-        return db.query(models.Owner).offset(skip).limit(limit).all()
+        return db.query(models.Owner).order_by(models.Owner.id).offset(skip).limit(limit).all()
+
+    def get_page(
+        self,
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        postal_code: Optional[str] = None
+    ) -> Tuple[List[models.Owner], Optional[str]]:
+        query = db.query(models.Owner)
+        if postal_code is not None:
+            query = query.filter(models.Owner.postal_code == postal_code)
+        return paginate(query, [models.Owner.id], cursor, limit)
     
     def update(self, db: Session, db_owner: models.Owner, owner_in: OwnerUpdate) -> models.Owner:
         update_data = owner_in.dict(exclude_unset=True)
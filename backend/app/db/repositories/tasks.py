@@ -1,11 +1,15 @@
 # app/db/repositories/tasks.py
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from app.db import models
+from app.db.pagination import paginate
 from app.schemas.tasks import TaskCreate, TaskUpdate
 
+# 文書ごとに同時に 1 つしか存在できない（uq_tasks_document_in_flight）ステータス
+IN_FLIGHT_STATUSES = ("queued", "processing")
+
 class TaskRepository:
     def create(self, db: Session, task_in: TaskCreate) -> models.Task:
         db_task = models.Task(
@@ -21,8 +25,45 @@ class TaskRepository:
     def get_by_id(self, db: Session, task_id: str) -> Optional[models.Task]:
         return db.query(models.Task).filter(models.Task.task_id == task_id).first()
     
+    def get_by_idempotency_key(self, db: Session, idempotency_key: str) -> Optional[models.Task]:
+        return db.query(models.Task).filter(models.Task.idempotency_key == idempotency_key).first()
+    
+    def get_in_flight_for_document(self, db: Session, document_id: int) -> Optional[models.Task]:
+        return (
+            db.query(models.Task)
+            .filter(models.Task.document_id == document_id, models.Task.status.in_(IN_FLIGHT_STATUSES))
+            .first()
+        )
+    
+    def get_latest_completed_for_document(self, db: Session, document_id: int) -> Optional[models.Task]:
+        return (
+            db.query(models.Task)
+            .filter(models.Task.document_id == document_id, models.Task.status == "completed")
+            .order_by(models.Task.start_time.desc(), models.Task.id.desc())
+            .first()
+        )
+    
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[models.Task]:
-        return db.query(models.Task).offset(skip).limit(limit).all()
+        return db.query(models.Task).order_by(models.Task.id).offset(skip).limit(limit).all()
+
+    def get_page(
+        self,
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        status: Optional[str] = None,
+        min_pdf_count: Optional[int] = None,
+        min_owner_count: Optional[int] = None
+    ) -> Tuple[List[models.Task], Optional[str]]:
+        query = db.query(models.Task)
+        if status is not None:
+            query = query.filter(models.Task.status == status)
+        # result 内の件数による絞り込み（PostgreSQL では式インデックスを利用）
+        if min_pdf_count is not None:
+            query = query.filter(models.Task.result["pdf_count"].as_integer() >= min_pdf_count)
+        if min_owner_count is not None:
+            query = query.filter(models.Task.result["owner_count"].as_integer() >= min_owner_count)
+        return paginate(query, [models.Task.start_time, models.Task.id], cursor, limit)
     
     def update(self, db: Session, db_task: models.Task, task_in: TaskUpdate) -> models.Task:
         update_data = task_in.dict(exclude_unset=True)
@@ -38,11 +79,11 @@ class TaskRepository:
         db: Session, 
         db_task: models.Task, 
         status: str, 
-        result: Optional[str] = None, 
+        result: Optional[Dict[str, Any]] = None, 
         error_message: Optional[str] = None
     ) -> models.Task:
         db_task.status = status
-        if status in ["completed", "failed"]:
+        if status in ["completed", "failed", "cancelled"]:
             db_task.end_time = datetime.now()
         
         if result is not None:
@@ -1,20 +1,30 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 import os
 
-from app.api.routes import auth, documents, tasks, owners, customers, reports, registry
+from app.api.routes import auth, documents, tasks, owners, customers, reports, registry, duplicates, search, health
 from app.core.config import settings
-from app.db.database import engine, Base
+from app.services.health import warm_up
+
+# テーブルは Alembic のマイグレーション（start.sh の alembic upgrade head）で作成する
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB の接続・Redis・キャッシュを温めてからリクエストを受け付ける
+    # （失敗した処理は /ready の確認時に再実行される）
+    await run_in_threadpool(warm_up)
+    yield
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
-    redoc_url=f"{settings.API_V1_STR}/redoc"
+    redoc_url=f"{settings.API_V1_STR}/redoc",
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -30,6 +40,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 一覧 API の次ページカーソルをブラウザから参照できるようにする
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -63,6 +75,12 @@ app.include_router(
     tags=["customers"]
 )
 
+app.include_router(
+    duplicates.router,
+    prefix=f"{settings.API_V1_STR}/duplicates",
+    tags=["duplicates"]
+)
+
 app.include_router(
     reports.router,
     prefix=f"{settings.API_V1_STR}/reports",
@@ -75,6 +93,18 @@ app.include_router(
     tags=["registry"]
 )
 
+app.include_router(
+    search.router,
+    prefix=f"{settings.API_V1_STR}/search",
+    tags=["search"]
+)
+
+# 死活監視・受け入れ可否（バージョンに依存しないパス）
+app.include_router(
+    health.router,
+    tags=["health"]
+)
+
 @app.get("/")
 def read_root():
     return {
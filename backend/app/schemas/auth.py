@@ -10,6 +10,20 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class UserPrincipal(BaseModel):
+    """
+    認証済みユーザーのスナップショット（トークンの subject ごとにキャッシュされる）
+    """
+    id: int
+    email: str
+    role: str
+    status: str
+
+    model_config = {
+        "from_attributes": True,
+        "frozen": True
+    }
+
 class UserBase(BaseModel):
     email: EmailStr
     name: str
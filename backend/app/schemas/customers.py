@@ -1,6 +1,6 @@
 # app/schemas/customers.py
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, field_validator
+from typing import Any, Dict, Optional, List
 from datetime import datetime, date
 
 class CustomerBase(BaseModel):
@@ -21,6 +21,41 @@ class CustomerBase(BaseModel):
 class CustomerCreate(CustomerBase):
     pass
 
+class CustomerImportRow(CustomerCreate):
+    """
+    一括登録の 1 行。画面や CSV から空文字で届く任意項目は未入力として扱います。
+    """
+
+    @field_validator(
+        "phone_number", "email", "postal_code", "property_type", "assigned_to",
+        "last_contact_date", "next_contact_date", "notes", "source",
+        mode="before",
+    )
+    @classmethod
+    def blank_to_none(cls, value):
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+class CustomerBatchCreate(BaseModel):
+    # 行ごとに検証して結果を返すため、ここでは dict のまま受け取る
+    customers: List[Dict[str, Any]]
+
+class CustomerImportRowResult(BaseModel):
+    row: int
+    status: str  # created / duplicate / invalid
+    customer_id: Optional[int] = None
+    duplicate_of_row: Optional[int] = None
+    errors: List[str] = []
+
+class CustomerImportReport(BaseModel):
+    total: int
+    created: int
+    duplicates: int
+    invalid: int
+    dry_run: bool = False
+    rows: List[CustomerImportRowResult]
+
 class CustomerUpdate(BaseModel):
     name: Optional[str] = None
     phone_number: Optional[str] = None
@@ -26,6 +26,7 @@ class DocumentInDB(DocumentBase):
     processed_at: Optional[datetime] = None
     processing_status: str
     error_message: Optional[str] = None
+    content_hash: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,32 @@
+# app/schemas/duplicates.py
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class DuplicateRecord(BaseModel):
+    id: int
+    name: str
+    address: str
+    postal_code: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class DuplicateCandidate(BaseModel):
+    id: int
+    entity_type: str
+    primary_id: int
+    duplicate_id: int
+    score: float
+    status: str
+    resolved_by: Optional[int] = None
+    resolved_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class DuplicateCandidateDetail(DuplicateCandidate):
+    # 統合・削除済みの場合は None
+    primary: Optional[DuplicateRecord] = None
+    duplicate: Optional[DuplicateRecord] = None
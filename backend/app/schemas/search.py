@@ -0,0 +1,10 @@
+# app/schemas/search.py
+from pydantic import BaseModel
+from typing import Optional
+
+class SearchResult(BaseModel):
+    entity_type: str
+    id: int
+    title: str
+    subtitle: Optional[str] = None
+    score: float
@@ -12,14 +12,15 @@ class TaskCreate(TaskBase):
 
 class TaskUpdate(BaseModel):
     status: Optional[str] = None
-    result: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
     end_time: Optional[datetime] = None
     error_message: Optional[str] = None
 
 class TaskInDB(TaskBase):
     id: int
     task_id: str
-    result: Optional[str] = None
+    priority: int = 0
+    result: Optional[Dict[str, Any]] = None
     start_time: datetime
     end_time: Optional[datetime] = None
     error_message: Optional[str] = None
@@ -35,6 +36,7 @@ class Task(TaskInDB):
 class TaskStatus(BaseModel):
     task_id: str
     status: str
+    # 進捗（0〜100 のパーセント）
     progress: Optional[float] = None
     message: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
\ No newline at end of file
@@ -0,0 +1,225 @@
+'''
+住所の正規化と構造化。
+
+OCR・登記PDF・手入力など取得元ごとに揺れる住所の表記を、比較・結合用の
+1 つの正規形にそろえる。
+
+- NFKC・ハイフンの統一・空白の除去
+- 「外2」など付記された筆数の除去
+- 大字・字の除去（「十文字町」のような地名中の「字」は残す）
+- 丁目・番地・号に付く漢数字の算用数字への変換（十・百・千・万を含む。建物名・地名の漢数字は変えない）
+- 丁目・番地・番・号・「の」のハイフンへの統一（例: 三丁目4番地の5 → 3-4-5）
+
+正規形は都道府県・市区町村・町域・番地（ハイフン区切りの数字）・残り（建物名など）に
+分けて Address として返す。同じ住所は台帳・所有者・郵便番号検索で何度も現れるため、
+結果は ADDRESS_CACHE_SIZE 件まで LRU でメモ化する。
+
+CLI（マイクロベンチマーク）:
+    python -m app.services.address --benchmark 100000
+'''
+
+import argparse
+import json
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import settings
+from app.utils.helpers import normalize_text
+
+_KANJI_DIGITS = {
+    "〇": 0, "零": 0, "一": 1, "二": 2, "三": 3, "四": 4,
+    "五": 5, "六": 6, "七": 7, "八": 8, "九": 9,
+}
+_KANJI_UNITS = {"十": 10, "百": 100, "千": 1000}
+_KANJI_NUMERAL = re.compile(r"[〇零一二三四五六七八九十百千万]+")
+
+# 漢数字を数として読む位置: 直後が丁目・地割・番・号・ハイフン・筆数（外N）・筆のとき、
+# または番地の最後（空白・住所の末尾）のとき。直前だけでは判断しない
+# （「1号 六本木ヒルズ」の「六」のように建物名の先頭の場合がある）。
+# 番・号は、さらに後ろに数字・「の」・番地の終わりが続く場合だけ単位とみなす
+# （「一番町」「三番街」「二号館」は地名・建物名なので数字にしない）
+_BLOCK_END = r"(?:[-‐‑‒–—―−]|外[\d〇一二三四五六七八九十]|\s|$)"
+_NUMBER_FOLLOWERS = re.compile(
+    r"丁目|地割|筆|" + _BLOCK_END
+    + r"|(?:番地?|号)(?:[\d〇一二三四五六七八九十]|の|" + _BLOCK_END + ")"
+)
+
+_ADDITIONAL_LOTS = re.compile(r"外\d+(?:筆)?$")
+_OAZA = re.compile(r"大字|(?<=[市区町村])字")
+_CHOME = re.compile(r"(\d+)丁目")
+_BANCHI = re.compile(r"(\d+)(?:番地の?|番の?|号の?|の)(?=\d)")
+_TRAILING_BANCHI = re.compile(r"(\d+)(?:番地|番|号)(?![町丁])")
+_LONG_VOWEL_DASH = re.compile(r"(?<=\d)ー(?=\d)")
+_HYPHENS = re.compile(r"-{2,}")
+
+_PREFECTURE = re.compile(r"^(東京都|北海道|(?:京都|大阪)府|.{2,3}県)")
+# 名前の途中に市・町・村を含む市（最短一致だと途中で切れてしまうもの）
+_CITY_EXCEPTIONS = (
+    "四日市市", "廿日市市", "野々市市", "十日町市", "大町市", "東村山市", "武蔵村山市",
+    "羽村市", "大村市", "田村市", "中村市", "玉村町", "町田市", "市川市", "市原市",
+)
+_CITY = re.compile(
+    r"^((?:[^\d]+?郡)?(?:" + "|".join(_CITY_EXCEPTIONS) + r"|[^\d]+?[市区町村]))"
+    # 政令指定都市の区
+    r"([^\d市区町村-]{1,4}区)?"
+)
+# 町域（「北1条西」「2地割」のように条・線・地割の数字は町域に含める）
+_TOWN = re.compile(r"^(?:[^\d-]|\d+(?:条|線|地割))*")
+_BLOCK = re.compile(r"^[\d-]+")
+
+
+@dataclass(frozen=True)
+class Address:
+    """
+    正規化した住所の各部分。canonical はそれらをつなげた比較用の文字列です。
+    """
+    canonical: str
+    prefecture: str = ""
+    city: str = ""
+    town: str = ""
+    block: str = ""
+    rest: str = ""
+
+
+def kanji_to_number(text: str) -> int:
+    """
+    漢数字を整数に変換します（例: 三百二十一 → 321、二〇三 → 203）。
+    """
+    if text.isdigit():
+        return int(text)
+    if not any(char in _KANJI_UNITS or char == "万" for char in text):
+        # 位取り表記（二〇三）
+        return int("".join(str(_KANJI_DIGITS[char]) for char in text))
+
+    total = 0
+    section = 0
+    digit = None
+    for char in text:
+        if char in _KANJI_DIGITS:
+            digit = _KANJI_DIGITS[char]
+        elif char in _KANJI_UNITS:
+            section += (1 if digit is None else digit) * _KANJI_UNITS[char]
+            digit = None
+        elif char == "万":
+            total += (section + (digit or 0) or 1) * 10000
+            section = 0
+            digit = None
+    return total + section + (digit or 0)
+
+
+def _convert_numerals(text: str) -> str:
+    """
+    番地を表す漢数字を算用数字に変換します。空白で番地の終わりを判断するため、
+    空白を除く前の文字列に対して呼びます。
+    """
+    def replace(match: "re.Match") -> str:
+        if _NUMBER_FOLLOWERS.match(text, match.end()):
+            return str(kanji_to_number(match.group(0)))
+        return match.group(0)
+
+    return _KANJI_NUMERAL.sub(replace, text)
+
+
+@lru_cache(maxsize=settings.ADDRESS_CACHE_SIZE)
+def normalize_address(value: Optional[str]) -> str:
+    """
+    比較・結合用の住所の正規形を返します（例: 東近江市佐野町字北三丁目4番地の5 外2 → 東近江市佐野町北3-4-5）。
+    """
+    if value is None:
+        return ""
+    text = _convert_numerals(unicodedata.normalize("NFKC", str(value)))
+    text = _LONG_VOWEL_DASH.sub("-", normalize_text(text))
+    text = _ADDITIONAL_LOTS.sub("", text)
+    text = _OAZA.sub("", text)
+    text = _CHOME.sub(r"\1-", text)
+    text = _BANCHI.sub(r"\1-", text)
+    text = _TRAILING_BANCHI.sub(r"\1", text)
+    return _HYPHENS.sub("-", text).rstrip("-")
+
+
+@lru_cache(maxsize=settings.ADDRESS_CACHE_SIZE)
+def parse_address(value: Optional[str]) -> Address:
+    """
+    住所を正規化し、都道府県・市区町村・町域・番地・残りに分けて返します。
+    読み取れない部分は空文字になります。
+    """
+    canonical = normalize_address(value)
+    rest = canonical
+
+    match = _PREFECTURE.match(rest)
+    prefecture = match.group(1) if match else ""
+    rest = rest[len(prefecture):]
+
+    match = _CITY.match(rest)
+    city = "".join(part for part in match.groups() if part) if match else ""
+    rest = rest[len(city):]
+
+    town = _TOWN.match(rest).group(0)
+    rest = rest[len(town):]
+    match = _BLOCK.match(rest)
+    block = match.group(0).strip("-") if match else ""
+    rest = rest[match.end():] if match else rest
+
+    return Address(canonical, prefecture, city, town, block, rest)
+
+
+def strip_additional_lots(address: str) -> str:
+    """
+    台帳の住所に付く「外2」などの筆数を除きます（表記はそのまま残します）。
+    """
+    return re.sub(r"\s?外\s?[\d〇一二三四五六七八九十]+(?:筆)?\s*$", "", address).strip()
+
+
+def address_filename(address: str) -> str:
+    """
+    住所から保存用のファイル名（拡張子なし）を返します。
+    """
+    return address.replace(" ", "_").replace("/", "-")
+
+
+def benchmark(count: int) -> dict:
+    """
+    count 件の住所（うち 1 割は重複）を正規化し、1 件/秒のスループットを返します。
+    uncached はメモなし、cold は空のメモから、warm はメモ済みの住所を再度正規化した場合です。
+    """
+    chome = ["一", "二", "三", "十二", "二十五"]
+    addresses = [
+        f"滋賀県東近江市佐野町字北{chome[i % len(chome)]}丁目{count - i}番地の{i % 50 + 1}"
+        for i in range(count)
+    ]
+    addresses += addresses[: count // 10]
+
+    def measure(normalize) -> int:
+        started = time.perf_counter()
+        for address in addresses:
+            normalize(address)
+        return round(len(addresses) / (time.perf_counter() - started))
+
+    normalize_address.cache_clear()
+    return {
+        "addresses": len(addresses),
+        "uncached_per_second": measure(normalize_address.__wrapped__),
+        "cold_per_second": measure(normalize_address),
+        "warm_per_second": measure(normalize_address),
+        "cache": normalize_address.cache_info()._asdict(),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="住所を正規化します")
+    parser.add_argument("addresses", nargs="*", help="正規化する住所")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="N 件の住所で正規化の速度を測る")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        print(json.dumps(benchmark(args.benchmark), ensure_ascii=False, indent=2))
+    for address in args.addresses:
+        print(json.dumps(parse_address(address).__dict__, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,17 +6,27 @@ OCR済みテキストから抽出した住所リストを取得し、
 各住所の登記PDFを自動ダウンロードする。
 
 営業時間外や重複住所は除外され、全処理後に自動でログアウトする。
+
+ダウンロード結果は、住所と保存先 PDF の対応および台帳の登記所名を
+マニフェスト（JSON）として書き出す。登記所名は台帳ごとに 1 回だけ抽出する。
+同じ内容の台帳は 1 つのファイルを共有するため、マニフェストは台帳の場所ではなく
+実行ごとのキー（タスク ID など）で OUTPUT_DIR/manifests 配下に保存する。
 '''
 
-from app.services.extract_info import get_cleaned_addresses
+from app.services.extract_info import extract_addresses, extract_registry_office, ocr_pdf
 from datetime import datetime, time as dtime
 from datetime import timedelta, timezone
 import holidays
 import time
 from playwright.sync_api import Playwright, sync_playwright
 from pathlib import Path
+import json
 import os
-from typing import List
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.services.address import address_filename
+from app.services.progress import ProgressCallback
 
 JP_HOLIDAYS = holidays.Japan()
 
@@ -77,13 +87,13 @@ def download_owner_info(page, address: str) -> str:
     # 環境変数から保存ディレクトリを取得するか、デフォルト値を使用
     save_dir = Path(os.getenv("OUTPUT_DIR", "./output"))
     save_dir.mkdir(parents=True, exist_ok=True)
-    save_path = save_dir / f"{address.replace(' ', '_').replace('/', '-')}.pdf"
+    save_path = save_dir / f"{address_filename(address)}.pdf"
     download.save_as(str(save_path))
     print(f"✅ Downloaded PDF for: {address}")
     return str(save_path)
 
 
-def login_and_download_all(playwright, address_list):
+def login_and_download_all(playwright, address_list, on_progress: Optional[ProgressCallback] = None):
     browser = playwright.chromium.launch(headless=True)
     context = browser.new_context(accept_downloads=True)
     page = context.new_page()
@@ -102,15 +112,17 @@ def login_and_download_all(playwright, address_list):
     page.get_by_role("button", name="利用規約に同意してログイン").click()
     time.sleep(1)
 
-    saved_paths = []
+    downloads = []
     for idx, address in enumerate(address_list):
         print(f"\n▶️ ({idx+1}/{len(address_list)}) 処理開始: {address}")
         try:
             path = download_owner_info(page, address)
             if path:
-                saved_paths.append(path)
+                downloads.append({"address": address, "pdf_path": path})
         except Exception as e:
             print(f"❌ エラー発生: {address}\n{e}")
+        if on_progress:
+            on_progress("download", idx + 1, len(address_list))
         print("⏳ 次の住所まで10秒待機中...\n")
         time.sleep(10)
 
@@ -118,15 +130,39 @@ def login_and_download_all(playwright, address_list):
     context.close()
     browser.close()
     
-    return saved_paths
-
-def run_auto_mode(pdf_path) -> List[str]:
-    cleaned_addresses = get_cleaned_addresses(pdf_path)
-    address_list = sorted(set(cleaned_addresses))
-
-    saved_paths = []
+    return downloads
+
+def manifest_path_for(run_key: str) -> str:
+    manifest_dir = Path(os.getenv("OUTPUT_DIR", "./output")) / "manifests"
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+    return str(manifest_dir / f"{run_key}.manifest.json")
+
+def download_ledger(
+    pdf_path,
+    on_progress: Optional[ProgressCallback] = None,
+    run_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    台帳を OCR して住所と登記所名を抽出し、各住所の登記PDFをダウンロードします。
+    結果は OUTPUT_DIR/manifests/<run_key>.manifest.json にも書き出します。
+    run_key にはタスク ID などの実行ごとのキーを指定します（省略時は一意な値）。
+    """
+    text_data = ocr_pdf(pdf_path, on_progress)
+    registry_office = extract_registry_office(text_data)
+    address_list = sorted(set(extract_addresses(text_data)))
 
     with sync_playwright() as playwright:
-        saved_paths = login_and_download_all(playwright, address_list)
-
-    return saved_paths
\ No newline at end of file
+        downloads = login_and_download_all(playwright, address_list, on_progress)
+
+    manifest = {
+        "ledger": pdf_path,
+        "registry_office": registry_office,
+        "downloads": downloads,
+    }
+    with open(manifest_path_for(run_key or uuid.uuid4().hex), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+def run_auto_mode(pdf_path, on_progress: Optional[ProgressCallback] = None) -> List[str]:
+    manifest = download_ledger(pdf_path, on_progress)
+    return [entry["pdf_path"] for entry in manifest["downloads"]]
\ No newline at end of file
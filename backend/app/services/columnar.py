@@ -0,0 +1,159 @@
+'''
+パイプラインの出力を Parquet（列指向・圧縮・型付き）で書き出す。
+
+タスクごとの出力ファイルに加えて、最終出力を OUTPUT_DIR/dataset 配下の
+1 つのデータセットに追記する。データセットは処理月と登記所で
+Hive 形式（month=YYYY-MM/registry_office=…）にパーティション分割されるため、
+複数回分をまたぐ集計でも必要なパーティションと列だけを読めばよい。
+ファイル名はタスク ID から決まり、書き込み前に全パーティションから同じタスクの
+ファイルを削除するため、月や登記所が変わる再実行でも行は重複しない。
+
+pyarrow は Parquet を使う場合だけ必要なため、関数内で読み込む。
+'''
+
+import glob
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.helpers import ensure_dir
+
+OUTPUT_FORMATS = ("csv", "parquet")
+
+DATASET_DIRNAME = "dataset"
+PARTITION_COLUMNS = ["month", "registry_office"]
+
+# 出力ごとの列と型（郵便番号は先頭の 0 を保つため文字列）
+STRING_COLUMNS: Dict[str, List[str]] = {
+    "owner_info": ["PDFファイル", "氏名", "所有者住所", "不動産所在地"],
+    "zipcode_info": ["所有者住所", "郵便番号"],
+    "final_output": ["PDFファイル", "氏名", "所有者住所", "不動産所在地", "郵便番号"],
+}
+
+
+def validate_output_format(output_format: str) -> str:
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    return output_format
+
+
+def output_extension(output_format: str) -> str:
+    return f".{validate_output_format(output_format)}"
+
+
+def dataset_dir(output_dir: str) -> str:
+    return os.path.join(output_dir, DATASET_DIRNAME)
+
+
+def _schema(columns: Iterable[str], extra=()):
+    import pyarrow as pa
+
+    return pa.schema([pa.field(column, pa.string()) for column in columns] + list(extra))
+
+
+def _to_table(frame: pd.DataFrame, schema):
+    import pyarrow as pa
+
+    frame = frame.reindex(columns=schema.names)
+    for field in schema:
+        if pa.types.is_string(field.type):
+            # 欠損は None のまま、それ以外は文字列にそろえる
+            frame[field.name] = frame[field.name].map(lambda value: None if pd.isna(value) else str(value))
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+
+def write_parquet(frame: pd.DataFrame, path: str, columns: Optional[List[str]] = None) -> str:
+    """
+    DataFrame を型付きの圧縮 Parquet ファイルとして書き出します。
+    """
+    import pyarrow.parquet as pq
+
+    schema = _schema(columns if columns is not None else list(frame.columns))
+    pq.write_table(_to_table(frame, schema), path, compression=settings.PARQUET_COMPRESSION)
+    return path
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    """
+    CSV・Parquet のどちらで書かれた出力も DataFrame として読み込みます。
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, encoding="utf-8-sig", dtype=str)
+
+
+def _remove_task_files(root: str, run_key: str) -> None:
+    pattern = os.path.join(root, "*", "*", f"part-{glob.escape(run_key)}-*.parquet")
+    for path in glob.glob(pattern):
+        os.remove(path)
+
+
+def append_to_dataset(
+    df_final: pd.DataFrame,
+    output_dir: str,
+    registry_office: str,
+    task_id: Optional[str] = None,
+    processed_at: Optional[datetime] = None,
+) -> str:
+    """
+    最終出力を処理月・登記所のパーティションに追記し、データセットのディレクトリを返します。
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    processed_at = processed_at or datetime.utcnow()
+    frame = df_final.copy()
+    frame["task_id"] = task_id or ""
+    frame["processed_at"] = processed_at.replace(microsecond=0)
+    frame["month"] = processed_at.strftime("%Y-%m")
+    frame["registry_office"] = registry_office or "unknown"
+
+    schema = _schema(
+        STRING_COLUMNS["final_output"] + ["task_id"],
+        extra=[pa.field("processed_at", pa.timestamp("s"))] + [
+            pa.field(column, pa.string()) for column in PARTITION_COLUMNS
+        ],
+    )
+    root = ensure_dir(dataset_dir(output_dir))
+    run_key = task_id or processed_at.strftime("%Y%m%d%H%M%S")
+    # 同じタスクの前回分は、別の月・登記所のパーティションにあっても置き換える
+    _remove_task_files(root, run_key)
+    ds.write_dataset(
+        _to_table(frame, schema),
+        root,
+        format="parquet",
+        partitioning=PARTITION_COLUMNS,
+        partitioning_flavor="hive",
+        basename_template=f"part-{run_key}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=settings.PARQUET_COMPRESSION),
+    )
+    return root
+
+
+def read_dataset(
+    output_dir: str,
+    months: Optional[Iterable[str]] = None,
+    registry_offices: Optional[Iterable[str]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    データセットから指定した月・登記所のパーティションと列だけを読み込みます。
+    """
+    import pyarrow.dataset as ds
+
+    root = dataset_dir(output_dir)
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=columns or STRING_COLUMNS["final_output"])
+
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    condition = None
+    for column, values in (("month", months), ("registry_office", registry_offices)):
+        if values is None:
+            continue
+        expression = ds.field(column).isin(list(values))
+        condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
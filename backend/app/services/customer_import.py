@@ -0,0 +1,183 @@
+'''
+パイプラインの最終出力や CSV から顧客を一括登録する。
+
+行は BATCH_SIZE 件ずつ Pydantic で検証し、正規化した (氏名, 住所, 物件所在地) で
+既存の顧客と同じファイル内の重複を検出する。新規の行だけをバッチごとに
+1 つの INSERT 文で登録し、行ごとの結果（登録・重複・不正）を返す。
+
+CLI:
+    python -m app.services.customer_import --task-id <task_id> [--dry-run]
+    python -m app.services.customer_import --csv customers.csv [--dry-run]
+'''
+
+import argparse
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.schemas.customers import CustomerImportReport, CustomerImportRow, CustomerImportRowResult
+from app.services.persistence import normalized_customer_fields
+
+# pandas はファイルやタスク出力から取り込む場合だけ必要なため、関数内で読み込む
+if TYPE_CHECKING:
+    import pandas as pd
+
+BATCH_SIZE = 1000
+
+# パイプライン出力の列 → 顧客の項目
+PIPELINE_COLUMNS = {
+    "氏名": "name",
+    "所有者住所": "address",
+    "不動産所在地": "property_address",
+    "郵便番号": "postal_code",
+}
+PIPELINE_SOURCE = "受付台帳"
+
+
+def _identity(fields: Dict[str, str]) -> Tuple[str, str, str]:
+    return (fields["normalized_name"], fields["normalized_address"], fields["normalized_property_address"])
+
+
+def records_from_frame(frame: "pd.DataFrame", source: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    パイプライン出力（日本語の列名）または顧客の項目名の列を持つ DataFrame を行の dict に変換します。
+    """
+    frame = frame.rename(columns=PIPELINE_COLUMNS)
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = frame.to_dict("records")
+    if source:
+        for record in records:
+            record.setdefault("source", source)
+    return records
+
+
+def read_task_output(task: models.Task) -> "pd.DataFrame":
+    """
+    完了したタスクの最終出力（CSV または Parquet）を読み込みます。
+    """
+    from app.services.columnar import read_frame
+
+    output_files = (task.result or {}).get("output_files") or {}
+    path = output_files.get("final_output")
+    if not path or not os.path.exists(path):
+        raise ValueError(f"Task {task.task_id} has no final output")
+    return read_frame(path)
+
+
+def _errors(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+def _existing_ids(db: Session, identities: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], int]:
+    if not identities:
+        return {}
+    columns = (
+        models.Customer.normalized_name,
+        models.Customer.normalized_address,
+        models.Customer.normalized_property_address,
+    )
+    rows = (
+        db.query(models.Customer.id, *columns)
+        .filter(tuple_(*columns).in_(identities))
+        .all()
+    )
+    existing: Dict[Tuple[str, str, str], int] = {}
+    for row in rows:
+        existing.setdefault(tuple(row[1:]), row.id)
+    return existing
+
+
+def import_customers(db: Session, records: List[Dict[str, Any]], dry_run: bool = False) -> CustomerImportReport:
+    """
+    行を検証して新規の顧客だけを登録し、行ごとの結果を返します（row は 1 始まり）。
+    dry_run=True の場合は登録せずに結果だけを返します。コミットは呼び出し側で行います。
+    """
+    results: List[CustomerImportRowResult] = []
+    seen: Dict[Tuple[str, str, str], int] = {}
+
+    for start in range(0, len(records), BATCH_SIZE):
+        valid = []
+        for row, record in enumerate(records[start:start + BATCH_SIZE], start + 1):
+            try:
+                customer = CustomerImportRow(**record)
+            except ValidationError as exc:
+                results.append(CustomerImportRowResult(row=row, status="invalid", errors=_errors(exc)))
+                continue
+            values = customer.model_dump()
+            values.update(normalized_customer_fields(customer.name, customer.address, customer.property_address))
+            valid.append((row, values))
+
+        existing = _existing_ids(db, list({_identity(values) for _, values in valid}))
+        new_rows = []
+        for row, values in valid:
+            identity = _identity(values)
+            if identity in existing:
+                results.append(CustomerImportRowResult(row=row, status="duplicate", customer_id=existing[identity]))
+            elif identity in seen:
+                results.append(CustomerImportRowResult(row=row, status="duplicate", duplicate_of_row=seen[identity]))
+            else:
+                seen[identity] = row
+                new_rows.append((row, values))
+
+        if new_rows and not dry_run:
+            stmt = insert(models.Customer).returning(models.Customer.id, sort_by_parameter_order=True)
+            ids = db.execute(stmt, [values for _, values in new_rows]).scalars().all()
+        else:
+            ids = [None] * len(new_rows)
+        results.extend(
+            CustomerImportRowResult(row=row, status="created", customer_id=customer_id)
+            for (row, _), customer_id in zip(new_rows, ids)
+        )
+
+    results.sort(key=lambda result: result.row)
+    return CustomerImportReport(
+        total=len(records),
+        created=sum(result.status == "created" for result in results),
+        duplicates=sum(result.status == "duplicate" for result in results),
+        invalid=sum(result.status == "invalid" for result in results),
+        dry_run=dry_run,
+        rows=results,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="顧客を一括登録します")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--task-id", help="最終出力を取り込むタスクの ID")
+    source.add_argument("--csv", help="取り込む CSV ファイル")
+    parser.add_argument("--dry-run", action="store_true", help="登録せずに結果だけを表示する")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.task_id:
+            task = db.query(models.Task).filter(models.Task.task_id == args.task_id).first()
+            if task is None:
+                parser.error(f"Task with ID {args.task_id} not found")
+            records = records_from_frame(read_task_output(task), source=PIPELINE_SOURCE)
+        else:
+            records = records_from_frame(pd.read_csv(args.csv, dtype=str, encoding="utf-8-sig"))
+
+        report = import_customers(db, records, dry_run=args.dry_run)
+        db.commit()
+    finally:
+        db.close()
+
+    summary = report.model_dump(exclude={"rows"})
+    summary["errors"] = [result.model_dump() for result in report.rows if result.status == "invalid"]
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+'''
+ダッシュボード用の集計を 1 回のクエリで取得し、短い TTL でキャッシュする。
+
+件数・ステータス分布・最新の文書/タスクを UNION ALL で 1 つの結果セットにまとめ、
+DB への往復を 1 回にする。文書・タスク・顧客・エラーレポートが変更された
+トランザクションのコミット時にはキャッシュを破棄する。
+'''
+
+from typing import Any, Dict
+
+from sqlalchemy import DateTime, Integer, String, cast, event, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db import models
+
+_CACHE_KEY = "dashboard"
+_cache = TTLCache(maxsize=1, ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+# これらのモデルが変更されたらダッシュボードのキャッシュを破棄する
+_WATCHED_MODELS = (models.Document, models.Task, models.Customer, models.ErrorReport)
+
+RECENT_LIMIT = 5
+
+
+def _row(kind, key=None, count=None, id=None, name=None, type_=None, status=None, timestamp=None):
+    """
+    UNION ALL の各ブランチを共通の列構成にそろえる。
+    """
+    return [
+        literal(kind, String).label("kind"),
+        (key if key is not None else cast(null(), String)).label("key"),
+        (count if count is not None else cast(null(), Integer)).label("count"),
+        (id if id is not None else cast(null(), Integer)).label("id"),
+        (name if name is not None else cast(null(), String)).label("name"),
+        (type_ if type_ is not None else cast(null(), String)).label("type"),
+        (status if status is not None else cast(null(), String)).label("status"),
+        (timestamp if timestamp is not None else cast(null(), DateTime)).label("timestamp"),
+    ]
+
+
+def _dashboard_statement():
+    Document, Task, Customer, ErrorReport = models.Document, models.Task, models.Customer, models.ErrorReport
+
+    recent_documents = (
+        select(Document.id, Document.file_name, Document.document_type, Document.status, Document.upload_date)
+        .order_by(Document.upload_date.desc())
+        .limit(RECENT_LIMIT)
+        .subquery()
+    )
+    recent_tasks = (
+        select(Task.id, Task.task_id, Task.task_type, Task.status, Task.start_time)
+        .order_by(Task.start_time.desc())
+        .limit(RECENT_LIMIT)
+        .subquery()
+    )
+
+    return union_all(
+        select(*_row("count", key=literal("documents"), count=func.count(Document.id))),
+        select(*_row("count", key=literal("customers"), count=func.count(Customer.id))),
+        select(*_row("count", key=literal("tasks"), count=func.count(Task.id))),
+        select(*_row("count", key=literal("errors"), count=func.count(ErrorReport.id)))
+        .where(ErrorReport.status == "open"),
+        select(*_row("customer_status", key=Customer.status, count=func.count(Customer.id)))
+        .group_by(Customer.status),
+        select(*_row("task_status", key=Task.status, count=func.count(Task.id)))
+        .group_by(Task.status),
+        select(*_row(
+            "recent_document",
+            id=recent_documents.c.id,
+            name=recent_documents.c.file_name,
+            type_=recent_documents.c.document_type,
+            status=recent_documents.c.status,
+            timestamp=recent_documents.c.upload_date,
+        )),
+        select(*_row(
+            "recent_task",
+            id=recent_tasks.c.id,
+            name=recent_tasks.c.task_id,
+            type_=recent_tasks.c.task_type,
+            status=recent_tasks.c.status,
+            timestamp=recent_tasks.c.start_time,
+        )),
+    )
+
+
+def build_dashboard_data(db: Session) -> Dict[str, Any]:
+    """
+    キャッシュを使わずにダッシュボードの集計を取得する。
+    """
+    data: Dict[str, Any] = {
+        "counts": {"documents": 0, "customers": 0, "tasks": 0, "errors": 0},
+        "recent_documents": [],
+        "recent_tasks": [],
+        "customer_status": {},
+        "task_status": {},
+    }
+
+    for row in db.execute(_dashboard_statement()):
+        if row.kind == "count":
+            data["counts"][row.key] = row.count
+        elif row.kind == "customer_status":
+            data["customer_status"][row.key] = row.count
+        elif row.kind == "task_status":
+            data["task_status"][row.key] = row.count
+        elif row.kind == "recent_document":
+            data["recent_documents"].append({
+                "id": row.id,
+                "file_name": row.name,
+                "document_type": row.type,
+                "status": row.status,
+                "upload_date": row.timestamp,
+            })
+        elif row.kind == "recent_task":
+            data["recent_tasks"].append({
+                "id": row.id,
+                "task_id": row.name,
+                "task_type": row.type,
+                "status": row.status,
+                "start_time": row.timestamp,
+            })
+
+    # UNION ALL では各ブランチ内の並び順が保証されないため並べ直す
+    data["recent_documents"].sort(key=lambda doc: doc["upload_date"], reverse=True)
+    data["recent_tasks"].sort(key=lambda task: task["start_time"], reverse=True)
+    return data
+
+
+def get_dashboard_data(db: Session) -> Dict[str, Any]:
+    """
+    キャッシュ済みであればそれを、なければ集計して返す。
+    """
+    data = _cache.get(_CACHE_KEY)
+    if data is None:
+        data = build_dashboard_data(db)
+        _cache.set(_CACHE_KEY, data)
+    return data
+
+
+def invalidate_dashboard_cache() -> None:
+    _cache.delete(_CACHE_KEY)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dashboard_changes(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _WATCHED_MODELS):
+            session.info["dashboard_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("dashboard_changed", False):
+        invalidate_dashboard_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes_on_rollback(session):
+    session.info.pop("dashboard_changed", None)
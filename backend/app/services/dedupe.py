@@ -0,0 +1,303 @@
+'''
+顧客・所有者の重複候補を検出し、統合する。
+
+全件の総当たりは行わず、郵便番号（なければ住所の市区町村）が同じ行どうしだけを
+比較する（ブロッキング）。ブロックが MAX_BLOCK_SIZE を超える場合は町域
+（住所の番地より前）でさらに分け、それでも大きいブロックは氏名順に並べて
+前後 WINDOW_SIZE 件とだけ比較する（ソート近傍法）。比較の回数は行数に
+ほぼ比例するため、100 万行でも 1 台で数分で終わる。比較には app.services.address の
+正規形（漢数字・丁目/番地/番/号・大字/字の表記をそろえたもの）をカタカナ→ひらがなに
+そろえた文字列を使い、氏名と住所の類似度の
+重み付き和が DUPLICATE_THRESHOLD 以上の組を候補として duplicate_candidates に保存する。
+統合は候補ごとに API から行う。
+
+CLI:
+    python -m app.services.dedupe --entity customer [--threshold 0.9]
+'''
+
+import argparse
+import json
+import re
+from collections import defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.services.address import normalize_address, parse_address
+from app.utils.helpers import normalize_text
+
+ENTITY_TYPES = ("customer", "owner")
+
+# 住所が同じなら氏名の 1 文字違い（例: 山田太郎 / 山田太朗 → 0.85）を候補にし、
+# 住所が同じでも氏名が別人（例: 山田太郎 / 佐藤花子 → 0.4）は候補にしない
+DUPLICATE_THRESHOLD = 0.8
+NAME_WEIGHT = 0.6
+ADDRESS_WEIGHT = 0.4
+MAX_BLOCK_SIZE = 200
+WINDOW_SIZE = 20
+BATCH_SIZE = 1000
+
+_NAME_NOISE = re.compile(r"[・･.,、。]")
+_STREET = re.compile(r"^\D*")
+
+
+def fold_kana(text: str) -> str:
+    """
+    カタカナをひらがなにそろえます。
+    """
+    return "".join(chr(ord(char) - 0x60) if "ァ" <= char <= "ヶ" else char for char in text)
+
+
+def canonical_name(value) -> str:
+    return _NAME_NOISE.sub("", fold_kana(normalize_text(value)))
+
+
+def canonical_address(value) -> str:
+    """
+    比較用に住所の表記をそろえます（例: 三丁目4番地5号 → 3-4-5）。
+    """
+    return fold_kana(normalize_address(value))
+
+
+def blocking_key(postal_code, address: str) -> Optional[str]:
+    """
+    郵便番号（7 桁）があればそれを、なければ市区町村をブロックのキーにします。
+    """
+    digits = re.sub(r"\D", "", normalize_text(postal_code))
+    if len(digits) == 7:
+        return f"zip:{digits}"
+    city = parse_address(address).city
+    return f"city:{city}" if city else None
+
+
+class _Record:
+    __slots__ = ("id", "name", "address")
+
+    def __init__(self, record_id: int, name: str, address: str):
+        self.id = record_id
+        self.name = name
+        self.address = address
+
+
+def _split(block: List[_Record], key) -> Iterable[List[_Record]]:
+    groups: Dict[str, List[_Record]] = defaultdict(list)
+    for record in block:
+        groups[key(record)].append(record)
+    return groups.values()
+
+
+def _blocks(rows: Iterable[Tuple[int, str, str, Optional[str]]]) -> Iterable[List[_Record]]:
+    blocks: Dict[str, List[_Record]] = defaultdict(list)
+    for record_id, name, address, postal_code in rows:
+        record = _Record(record_id, canonical_name(name), canonical_address(address))
+        key = blocking_key(postal_code, record.address)
+        if key is not None and record.name:
+            blocks[key].append(record)
+
+    for block in blocks.values():
+        # 大きすぎるブロック（郵便番号のない市区町村など）は町域で分ける
+        sub_blocks = [block] if len(block) <= MAX_BLOCK_SIZE else _split(
+            block, lambda record: _STREET.match(record.address).group(0)
+        )
+        yield from (sub_block for sub_block in sub_blocks if len(sub_block) > 1)
+
+
+def _candidate_pairs(block: List[_Record]) -> Iterable[Tuple[_Record, List[_Record]]]:
+    """
+    (基準の行, 比較相手) を返します。大きいブロックは氏名順で前後 WINDOW_SIZE 件だけを比較相手にします。
+    """
+    if len(block) <= MAX_BLOCK_SIZE:
+        block.sort(key=lambda record: record.id)
+        for i, left in enumerate(block):
+            yield left, block[i + 1:]
+        return
+    block.sort(key=lambda record: (record.name, record.address))
+    for i, left in enumerate(block):
+        yield left, block[i + 1:i + 1 + WINDOW_SIZE]
+
+
+def _compare_block(block: List[_Record], threshold: float) -> Iterable[Tuple[int, int, float]]:
+    name_matcher = SequenceMatcher(autojunk=False)
+    address_matcher = SequenceMatcher(autojunk=False)
+    for left, others in _candidate_pairs(block):
+        # seq2 側の解析結果は比較相手が変わっても使い回す
+        name_matcher.set_seq2(left.name)
+        address_matcher.set_seq2(left.address)
+        for right in others:
+            if right.name == left.name:
+                name_score = 1.0
+            else:
+                name_matcher.set_seq1(right.name)
+                # 住所が完全一致しても閾値に届かない組は詳しく比較しない
+                if NAME_WEIGHT * name_matcher.real_quick_ratio() + ADDRESS_WEIGHT < threshold:
+                    continue
+                if NAME_WEIGHT * name_matcher.quick_ratio() + ADDRESS_WEIGHT < threshold:
+                    continue
+                name_score = name_matcher.ratio()
+                if NAME_WEIGHT * name_score + ADDRESS_WEIGHT < threshold:
+                    continue
+            if right.address == left.address:
+                address_score = 1.0
+            else:
+                address_matcher.set_seq1(right.address)
+                address_score = address_matcher.ratio()
+            score = NAME_WEIGHT * name_score + ADDRESS_WEIGHT * address_score
+            if score >= threshold:
+                # id の小さい（先に登録された）方を残す
+                primary_id, duplicate_id = sorted((left.id, right.id))
+                yield primary_id, duplicate_id, round(score, 4)
+
+
+def find_duplicates(
+    rows: Iterable[Tuple[int, str, str, Optional[str]]],
+    threshold: float = DUPLICATE_THRESHOLD,
+) -> List[Tuple[int, int, float]]:
+    """
+    (id, 氏名, 住所, 郵便番号) の行から重複候補 (残す id, 統合する id, スコア) を返します。
+    残す側は id の小さい（先に登録された）方です。
+    """
+    pairs: List[Tuple[int, int, float]] = []
+    for block in _blocks(rows):
+        pairs.extend(_compare_block(block, threshold))
+    return pairs
+
+
+def _model(entity_type: str):
+    if entity_type == "customer":
+        return models.Customer
+    if entity_type == "owner":
+        return models.Owner
+    raise ValueError(f"Unsupported entity type: {entity_type}")
+
+
+def scan_duplicates(db: Session, entity_type: str, threshold: float = DUPLICATE_THRESHOLD) -> Dict[str, int]:
+    """
+    重複候補を検出して未対応 (pending) の候補を入れ替え、件数を返します。
+    統合・却下済みの組は再度候補にしません。コミットは呼び出し側で行います。
+    """
+    model = _model(entity_type)
+    result = db.execute(
+        select(model.id, model.name, model.address, model.postal_code)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    counter = {"rows": 0}
+
+    def rows():
+        for row in result:
+            counter["rows"] += 1
+            yield row
+
+    pairs = find_duplicates(rows(), threshold)
+
+    candidates = db.query(models.DuplicateCandidate).filter(models.DuplicateCandidate.entity_type == entity_type)
+    candidates.filter(models.DuplicateCandidate.status == "pending").delete(synchronize_session=False)
+    resolved = {
+        (row.primary_id, row.duplicate_id)
+        for row in candidates.with_entities(
+            models.DuplicateCandidate.primary_id, models.DuplicateCandidate.duplicate_id
+        )
+    }
+
+    values = [
+        {
+            "entity_type": entity_type,
+            "primary_id": primary_id,
+            "duplicate_id": duplicate_id,
+            "score": score,
+            "status": "pending",
+        }
+        for primary_id, duplicate_id, score in pairs
+        if (primary_id, duplicate_id) not in resolved
+    ]
+    for start in range(0, len(values), BATCH_SIZE):
+        db.execute(insert(models.DuplicateCandidate), values[start:start + BATCH_SIZE])
+
+    return {"rows": counter["rows"], "candidates": len(values)}
+
+
+def _fill_missing(primary, duplicate, fields: Iterable[str]) -> None:
+    for field in fields:
+        if getattr(primary, field) in (None, "") and getattr(duplicate, field) not in (None, ""):
+            setattr(primary, field, getattr(duplicate, field))
+
+
+def _merge_customers(db: Session, primary: models.Customer, duplicate: models.Customer) -> None:
+    _fill_missing(primary, duplicate, (
+        "phone_number", "email", "postal_code", "property_type", "assigned_to",
+        "last_contact_date", "next_contact_date", "notes", "source",
+    ))
+    for model in (models.CustomerActivity, models.RegistryRequest):
+        db.query(model).filter(model.customer_id == duplicate.id).update(
+            {"customer_id": primary.id}, synchronize_session=False
+        )
+
+
+def _merge_owners(db: Session, primary: models.Owner, duplicate: models.Owner) -> None:
+    _fill_missing(primary, duplicate, ("postal_code", "phone_number", "email"))
+    owned = select(models.Ownership.property_id).where(models.Ownership.owner_id == primary.id)
+    # 同じ物件の所有関係は統合先に既にあるため削除する
+    db.query(models.Ownership).filter(
+        models.Ownership.owner_id == duplicate.id, models.Ownership.property_id.in_(owned)
+    ).delete(synchronize_session=False)
+    db.query(models.Ownership).filter(models.Ownership.owner_id == duplicate.id).update(
+        {"owner_id": primary.id}, synchronize_session=False
+    )
+
+
+def merge_candidate(db: Session, candidate: models.DuplicateCandidate, user_id: Optional[int] = None):
+    """
+    duplicate_id の関連レコードを primary_id に付け替えて削除し、統合先を返します。
+    どちらかが既に存在しない場合は ValueError を送出します。コミットは呼び出し側で行います。
+    """
+    model = _model(candidate.entity_type)
+    primary = db.get(model, candidate.primary_id)
+    duplicate = db.get(model, candidate.duplicate_id)
+    if primary is None or duplicate is None:
+        raise ValueError("Candidate refers to a record that no longer exists")
+
+    if candidate.entity_type == "customer":
+        _merge_customers(db, primary, duplicate)
+    else:
+        _merge_owners(db, primary, duplicate)
+    db.flush()
+    db.delete(duplicate)
+
+    # 削除したレコードを含む他の未対応候補は次回の検出で作り直す
+    db.query(models.DuplicateCandidate).filter(
+        models.DuplicateCandidate.entity_type == candidate.entity_type,
+        models.DuplicateCandidate.status == "pending",
+        models.DuplicateCandidate.id != candidate.id,
+        or_(
+            models.DuplicateCandidate.primary_id == duplicate.id,
+            models.DuplicateCandidate.duplicate_id == duplicate.id,
+        ),
+    ).delete(synchronize_session=False)
+
+    candidate.status = "merged"
+    candidate.resolved_by = user_id
+    candidate.resolved_at = datetime.utcnow()
+    return primary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="重複候補を検出します")
+    parser.add_argument("--entity", choices=ENTITY_TYPES, required=True)
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        stats = scan_duplicates(db, args.entity, args.threshold)
+        db.commit()
+    finally:
+        db.close()
+    print(json.dumps(stats, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+'''
+顧客・抽出リードを CSV / XLSX でエクスポートする。
+
+ORM オブジェクトを作らず、必要な列だけを SELECT して yield_per で
+EXPORT_BATCH_SIZE 行ずつ取り出す（PostgreSQL ではサーバーサイドカーソルになる）。
+CSV はバッチごとに書き出してそのままレスポンスへ流すため、件数に関係なく
+メモリ使用量は一定になる。XLSX は ZIP 形式で末尾まで書き終えないと
+送れないため、openpyxl の write_only モードで一時ファイルに書いてから返す。
+'''
+
+import csv
+import io
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+EXPORT_FORMATS = ("csv", "xlsx")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+CUSTOMER_COLUMNS = [
+    models.Customer.id,
+    models.Customer.name,
+    models.Customer.phone_number,
+    models.Customer.email,
+    models.Customer.address,
+    models.Customer.postal_code,
+    models.Customer.property_address,
+    models.Customer.property_type,
+    models.Customer.status,
+    models.Customer.assigned_to,
+    models.Customer.last_contact_date,
+    models.Customer.next_contact_date,
+    models.Customer.source,
+    models.Customer.created_at,
+]
+
+LEAD_COLUMNS = [
+    models.ExtractedData.id,
+    models.ExtractedData.document_id,
+    models.ExtractedData.customer_name,
+    models.ExtractedData.postal_code,
+    models.ExtractedData.prefecture,
+    models.ExtractedData.current_address,
+    models.ExtractedData.inheritance_address,
+    models.ExtractedData.phone_number,
+    models.ExtractedData.status,
+    models.ExtractedData.extracted_at,
+]
+
+
+def _date_range(query: Select, column, date_from: Optional[date], date_to: Optional[date]) -> Select:
+    # date_to の日も含める
+    if date_from is not None:
+        query = query.where(column >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        query = query.where(column < datetime.combine(date_to + timedelta(days=1), time.min))
+    return query
+
+
+def customer_export_query(
+    status: Optional[str] = None,
+    assigned_to: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Select:
+    query = select(*CUSTOMER_COLUMNS)
+    if status is not None:
+        query = query.where(models.Customer.status == status)
+    if assigned_to is not None:
+        query = query.where(models.Customer.assigned_to == assigned_to)
+    query = _date_range(query, models.Customer.created_at, date_from, date_to)
+    return query.order_by(models.Customer.id)
+
+
+def lead_export_query(
+    status: Optional[str] = None,
+    document_id: Optional[int] = None,
+    prefecture: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Select:
+    query = select(*LEAD_COLUMNS)
+    if status is not None:
+        query = query.where(models.ExtractedData.status == status)
+    if document_id is not None:
+        query = query.where(models.ExtractedData.document_id == document_id)
+    if prefecture is not None:
+        query = query.where(models.ExtractedData.prefecture == prefecture)
+    query = _date_range(query, models.ExtractedData.extracted_at, date_from, date_to)
+    return query.order_by(models.ExtractedData.id)
+
+
+def _partitions(db: Session, query: Select) -> Tuple[List[str], Iterator[Sequence]]:
+    result = db.execute(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    return list(result.keys()), result.partitions()
+
+
+def iter_csv(db: Session, query: Select) -> Iterator[bytes]:
+    """
+    クエリ結果を CSV（UTF-8 BOM 付き）としてバッチごとに返します。
+    """
+    headers, partitions = _partitions(db, query)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_xlsx(db: Session, query: Select, sheet_title: str = "export") -> str:
+    """
+    クエリ結果を XLSX の一時ファイルに書き出し、そのパスを返します。
+    削除は呼び出し側で行います。
+    """
+    from openpyxl import Workbook
+
+    headers, partitions = _partitions(db, query)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(headers)
+    for rows in partitions:
+        for row in rows:
+            sheet.append(list(row))
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def export_filename(prefix: str, export_format: str) -> str:
+    return f"{prefix}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
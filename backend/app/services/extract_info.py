@@ -10,9 +10,12 @@ from tempfile import TemporaryDirectory
 import os
 import io
 import re
-from typing import List
+from typing import List, Optional
 
-def ocr_pdf(pdf_path: str) -> str:
+from app.services.address import strip_additional_lots
+from app.services.progress import ProgressCallback
+
+def ocr_pdf(pdf_path: str, on_progress: Optional[ProgressCallback] = None) -> str:
     # 環境変数からAPIキーを取得
     api_key = os.getenv("OPENAI_API_KEY")
     client = OpenAI(api_key=api_key)
@@ -33,6 +36,8 @@ def ocr_pdf(pdf_path: str) -> str:
                 print(f"❌ Page {idx} OCR失敗: {response.error.message}")
             else:
                 all_text.append(response.full_text_annotation.text)
+            if on_progress:
+                on_progress("ocr", idx, len(images))
     return "\n".join(all_text)
 
 def extract_registry_office(text_data: str) -> str:
@@ -91,11 +96,11 @@ def extract_addresses(text_data: str) -> List[str]:
     filtered = [line for line in raw_lines if re.search(r'[都道府県市区町村].*\d', line)]
 
     # ③ 「外2」などを削除し、前後空白も除去
-    return [re.sub(r"\s?外\s?\d+", "", addr).strip() for addr in filtered]
+    return [strip_additional_lots(addr) for addr in filtered]
 
 
-def get_cleaned_addresses(pdf_path: str) -> List[str]:
-    text_data = ocr_pdf(pdf_path)
+def get_cleaned_addresses(pdf_path: str, on_progress: Optional[ProgressCallback] = None) -> List[str]:
+    text_data = ocr_pdf(pdf_path, on_progress)
     return extract_addresses(text_data)
 
 def run(pdf_path: str):
@@ -5,19 +5,20 @@
 '''
 
 import pandas as pd
-import re
-import unicodedata
 import os
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
-# 環境変数からKEN_ALL.CSVのパスを取得
-load_dotenv()
-ken_all_path = os.getenv("KEN_ALL_CSV_PATH", "./data/KEN_ALL.CSV")
-print(f"KEN_ALL.CSV Path: {ken_all_path}")
+from app.core.config import settings
+from app.services.address import parse_address
 
-# 日本郵便KEN_ALL.CSV読み込み
+# 日本郵便KEN_ALL.CSV読み込み（プロセスごとに 1 回だけ読む）
+@lru_cache(maxsize=1)
 def load_postal_code_data():
+    # 環境変数からKEN_ALL.CSVのパスを取得
+    load_dotenv()
+    ken_all_path = os.getenv("KEN_ALL_CSV_PATH", "./data/KEN_ALL.CSV")
     df = pd.read_csv(
         ken_all_path,
         encoding="shift_jis",
@@ -33,34 +34,9 @@ def load_postal_code_data():
     ]
     return df
 
-# 漢数字をアラビア数字に変換するマップ
-KANJI_NUM_MAP = {
-    '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
-    '六': '6', '七': '7', '八': '8', '九': '9', '十': '10'
-}
-
-def kanji_to_arabic(text):
-    for kanji, num in KANJI_NUM_MAP.items():
-        text = text.replace(kanji + '丁目', num + '丁目')
-    return text
-
-def get_zipcode(address: str) -> str:
-    """
-    住所文字列から郵便番号を検索して返す
-    """
+@lru_cache(maxsize=settings.ADDRESS_CACHE_SIZE)
+def _lookup_zipcode(pref: str, city: str, town: str) -> Optional[str]:
     df = load_postal_code_data()
-    
-    address = unicodedata.normalize("NFKC", address)
-    address = kanji_to_arabic(address)
-    address = re.sub(r"字", "", address)
-
-    m = re.match(r"(..[都道府県])(.+?[市区町村])(.+)", address)
-    if not m:
-        raise ValueError("住所の形式が不正です: " + address)
-    pref, city, rest = m.groups()
-    rest = rest.split()[0]
-    town = re.split(r"[\d\-－ー0-9]", rest)[0]
-
     result = df[
         (df["都道府県"] == pref) &
         (df["市区町村"] == city) &
@@ -70,9 +46,19 @@ def get_zipcode(address: str) -> str:
         result = df[
             (df["都道府県"] == pref) &
             (df["市区町村"] == city) &
-            (df["町域"].str.contains(town))
+            (df["町域"].str.contains(town, regex=False))
         ]
-    if not result.empty:
-        zip7 = str(result.iloc[0]["郵便番号"]).zfill(7)
-        return f"{zip7[:3]}-{zip7[3:]}"
-    return "該当なし"
\ No newline at end of file
+    if result.empty:
+        return None
+    zip7 = str(result.iloc[0]["郵便番号"]).zfill(7)
+    return f"{zip7[:3]}-{zip7[3:]}"
+
+def get_zipcode(address: str) -> str:
+    """
+    住所文字列から郵便番号を検索して返す
+    住所は app.services.address で正規化し、(都道府県, 市区町村, 町域) ごとに結果をメモ化する
+    """
+    parsed = parse_address(address)
+    if not parsed.prefecture or not parsed.city:
+        raise ValueError("住所の形式が不正です: " + parsed.canonical)
+    return _lookup_zipcode(parsed.prefecture, parsed.city, parsed.town) or "該当なし"
@@ -0,0 +1,107 @@
+'''
+死活監視（liveness）と受け入れ可否（readiness）の判定、起動時のウォームアップ。
+
+liveness はプロセスが応答できるかだけを返し、外部の依存先は確認しない。
+readiness は DB（SELECT 1）・Redis（PROGRESS_BROKER=redis の場合）・ウォームアップの
+完了を確認し、どれかが満たされない間はロードバランサーからリクエストを振られないよう
+503 を返す。
+
+ウォームアップは register_warmup で登録した処理を起動時（lifespan）に 1 回実行する。
+DB がまだ起動していないなどで失敗した処理は、次の readiness の確認時に再実行する。
+'''
+
+import logging
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import engine
+from app.services.progress import get_progress_broker
+
+logger = logging.getLogger(__name__)
+
+_warmups: List[Tuple[str, Callable[[], None]]] = []
+_warmed: Dict[str, bool] = {}
+_warmup_lock = threading.Lock()
+
+
+def register_warmup(name: str):
+    """
+    起動時に実行するウォームアップ処理を登録するデコレーターです。
+    """
+    def decorator(func: Callable[[], None]) -> Callable[[], None]:
+        _warmups.append((name, func))
+        return func
+    return decorator
+
+
+def warm_up() -> Dict[str, bool]:
+    """
+    まだ完了していないウォームアップ処理を実行し、処理ごとの完了状態を返します。
+    失敗した処理はログに記録し、次回の呼び出しで再実行します。
+    """
+    with _warmup_lock:
+        for name, func in _warmups:
+            if _warmed.get(name):
+                continue
+            try:
+                func()
+                _warmed[name] = True
+            except Exception:
+                logger.exception("Warm-up %s failed", name)
+                _warmed[name] = False
+        return {name: _warmed.get(name, False) for name, _ in _warmups}
+
+
+def reset_warmup() -> None:
+    with _warmup_lock:
+        _warmed.clear()
+
+
+@register_warmup("database")
+def _warm_database() -> None:
+    # 最初のリクエストで接続を張らずに済むよう、プールに接続を 1 本作っておく
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+@register_warmup("progress_broker")
+def _warm_progress_broker() -> None:
+    get_progress_broker().ping()
+
+
+@register_warmup("postal_codes")
+def _warm_postal_codes() -> None:
+    if not settings.WARMUP_POSTAL_CODES:
+        return
+    from app.services.extract_zipcode import load_postal_code_data
+
+    load_postal_code_data()
+
+
+def _check(func: Callable[[], None]) -> str:
+    try:
+        func()
+    except Exception as exc:
+        logger.warning("Readiness check failed: %s", exc)
+        return "unavailable"
+    return "ok"
+
+
+def check_readiness(db: Session) -> Tuple[bool, Dict[str, str]]:
+    """
+    依存先ごとの状態（"ok" / "unavailable" / "skipped" / "pending"）と、
+    リクエストを受け入れられるかを返します。
+    """
+    checks = {"database": _check(lambda: db.execute(text("SELECT 1")))}
+    if settings.PROGRESS_BROKER == "redis":
+        checks["redis"] = _check(lambda: get_progress_broker().ping())
+    else:
+        checks["redis"] = "skipped"
+    checks["warmup"] = "ok" if all(warm_up().values()) else "pending"
+
+    ready = all(state in ("ok", "skipped") for state in checks.values())
+    return ready, checks
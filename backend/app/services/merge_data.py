@@ -1,21 +1,38 @@
 # app/services/merge_data.py
+from typing import Dict, Optional, Union
+
 import pandas as pd
 
-def merge_data(owner_info_path: str, zipcode_info_path: str, output_path: str):
+from app.core.config import settings
+from app.services.columnar import STRING_COLUMNS, read_frame, validate_output_format, write_parquet
+
+def merge_frames(df_owner: pd.DataFrame, zipcodes: Union[pd.DataFrame, Dict[str, Optional[str]]]) -> pd.DataFrame:
+    """
+    所有者情報に郵便番号の列を付けて返す（メモリ上で住所 → 郵便番号を引く）
+    zipcodes は {所有者住所: 郵便番号} の辞書、または同じ列を持つ DataFrame
+    """
+    if isinstance(zipcodes, pd.DataFrame):
+        zipcodes = dict(zip(zipcodes['所有者住所'], zipcodes['郵便番号'])) if len(zipcodes) else {}
+
+    df_merged = df_owner.copy()
+    df_merged['郵便番号'] = df_merged['所有者住所'].map(zipcodes)
+    return df_merged
+
+def merge_data(owner_info_path: str, zipcode_info_path: str, output_path: str, output_format: Optional[str] = None):
     """
-    所有者情報CSVと郵便番号CSVを結合して、最終的なCSVを出力する
+    所有者情報と郵便番号のファイル（CSV または Parquet）を結合して、最終的なファイルを出力する
+    output_format が "parquet" の場合は型付きの圧縮 Parquet で書き出す
     """
-    df_owner = pd.read_csv(owner_info_path)
-    df_zip   = pd.read_csv(zipcode_info_path)
+    output_format = validate_output_format(output_format or settings.PIPELINE_OUTPUT_FORMAT)
+    df_owner = read_frame(owner_info_path)
+    df_zip   = read_frame(zipcode_info_path)
 
-    df_merged = pd.merge(
-        df_owner,
-        df_zip,
-        on='所有者住所',
-        how='left'
-    )
+    df_merged = merge_frames(df_owner, df_zip)
 
-    df_merged.to_csv(output_path, index=False, encoding='utf-8-sig')
+    if output_format == "parquet":
+        write_parquet(df_merged, output_path, STRING_COLUMNS["final_output"])
+    else:
+        df_merged.to_csv(output_path, index=False, encoding='utf-8-sig')
     print(f"✅ 結合完了: {output_path}")
     
-    return df_merged
\ No newline at end of file
+    return df_merged
@@ -3,30 +3,50 @@
 import os
 import re
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
+from functools import lru_cache
 
 import pandas as pd
-from openai import OpenAI
-from markitdown import MarkItDown
+from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.services.extract_info import get_cleaned_addresses
-from app.services.auto_mode import run_auto_mode
+from app.services.auto_mode import download_ledger
 from app.services.extract_zipcode import get_zipcode
-from app.services.merge_data import merge_data
+from app.services.columnar import (
+    STRING_COLUMNS,
+    append_to_dataset,
+    output_extension,
+    validate_output_format,
+    write_parquet,
+)
+from app.services.merge_data import merge_frames
+from app.services.persistence import persist_pipeline_results
+from app.services.progress import ProgressCallback
 
-# OpenAI API キーを環境変数から読み込んで設定
-client = OpenAI()
+@lru_cache(maxsize=1)
+def _openai_client():
+    # OpenAI API キーを環境変数から読み込んで設定（最初に使うときに 1 回だけ作る）
+    from openai import OpenAI
 
+    return OpenAI()
 
-def extract_owner_info(pdf_paths: List[str]) -> pd.DataFrame:
+
+# extract_owner_info が返す DataFrame の列
+OWNER_COLUMNS = ["PDFファイル", "氏名", "所有者住所", "不動産所在地"]
+
+
+def extract_owner_info(pdf_paths: List[str], on_progress: Optional[ProgressCallback] = None) -> pd.DataFrame:
     """
     ダウンロード済みの所有者情報PDFを解析し、氏名・所有者住所・不動産所在地を抽出してDataFrameを返す
     """
+    from markitdown import MarkItDown
+
     md = MarkItDown()  # MarkItDown インスタンス
     records = []
 
-    for pdf_path in pdf_paths:
+    for idx, pdf_path in enumerate(pdf_paths, 1):
         # 1) PDF → テキスト化
         result = md.convert(pdf_path)
         text_data = result.text_content
@@ -52,7 +72,7 @@ def extract_owner_info(pdf_paths: List[str]) -> pd.DataFrame:
             {"role": "user",   "content": prompt}
         ]
 
-        response = client.chat.completions.create(
+        response = _openai_client().chat.completions.create(
             model="gpt-4o",
             messages=messages,
             temperature=0.0
@@ -70,25 +90,54 @@ def extract_owner_info(pdf_paths: List[str]) -> pd.DataFrame:
                 "所有者住所":       addr_m.group(1).strip(),
                 "不動産所在地":     prop_m.group(1).strip()
             })
+        if on_progress:
+            on_progress("owner_extraction", idx, len(pdf_paths))
 
-    return pd.DataFrame(records)
+    return pd.DataFrame(records, columns=OWNER_COLUMNS)
 
 
-def run_pipeline(ledger_pdf: str, task_id: str = None) -> Dict:
+def write_outputs(frames: Dict[str, pd.DataFrame], paths: Dict[str, str], output_format: str = "csv") -> None:
+    """
+    各ステージの DataFrame をまとめてファイルに書き出す（CSV または Parquet）
+    """
+    for name, frame in frames.items():
+        if output_format == "parquet":
+            write_parquet(frame, paths[name], STRING_COLUMNS[name])
+        else:
+            frame.to_csv(paths[name], index=False, encoding='utf-8-sig')
+        print(f"✅ {name} 出力: {paths[name]}")
+
+
+def run_pipeline(
+    ledger_pdf: str,
+    task_id: str = None,
+    on_progress: Optional[ProgressCallback] = None,
+    db: Optional[Session] = None,
+    document_id: Optional[int] = None,
+    extracted_by: Optional[int] = None,
+    output_format: Optional[str] = None,
+) -> Dict:
     """
     不動産相続情報パイプラインを実行する
+    on_progress を渡すと各ステージの進捗 (stage, current, total) を通知する
+    db を渡すと結果を ExtractedData・Owner・Property・Ownership に一括登録する（コミットは呼び出し側）
+    output_format が "parquet" の場合は Parquet で出力し、最終出力を月・登記所別のデータセットにも追記する
     """
+    output_format = validate_output_format(output_format or settings.PIPELINE_OUTPUT_FORMAT)
+    ext = output_extension(output_format)
+
     # 出力ディレクトリの設定
     output_dir = os.getenv("OUTPUT_DIR", "./output")
     Path(output_dir).mkdir(exist_ok=True)
+    base_output_dir = output_dir
 
     if task_id:
         output_dir = os.path.join(output_dir, task_id)
         Path(output_dir).mkdir(exist_ok=True)
 
-    owner_out    = f"owner_info_{task_id}.csv"   if task_id else "owner_info.csv"
-    zipcode_out  = f"zipcode_info_{task_id}.csv" if task_id else "zipcode_info.csv"
-    final_out    = f"final_output_{task_id}.csv" if task_id else "final_output.csv"
+    owner_out    = f"owner_info_{task_id}{ext}"   if task_id else f"owner_info{ext}"
+    zipcode_out  = f"zipcode_info_{task_id}{ext}" if task_id else f"zipcode_info{ext}"
+    final_out    = f"final_output_{task_id}{ext}" if task_id else f"final_output{ext}"
 
     owner_out_path   = os.path.join(output_dir, owner_out)
     zipcode_out_path = os.path.join(output_dir, zipcode_out)
@@ -96,37 +145,64 @@ def run_pipeline(ledger_pdf: str, task_id: str = None) -> Dict:
 
     # ステップ1: 地番抽出 & PDFダウンロード
     print("▶️ 地番抽出とPDFダウンロード開始")
-    pdf_paths = run_auto_mode(ledger_pdf)
+    manifest = download_ledger(ledger_pdf, on_progress, run_key=task_id)
+    pdf_paths = [entry["pdf_path"] for entry in manifest["downloads"]]
     print(f"✅ PDFダウンロード完了: {len(pdf_paths)} 件")
 
     # ステップ2: 所有者情報抽出
     print("▶️ 所有者情報抽出開始")
-    df_owner = extract_owner_info(pdf_paths)
-    df_owner.to_csv(owner_out_path, index=False, encoding='utf-8-sig')
-    print(f"✅ 所有者情報CSV出力: {owner_out_path}")
+    df_owner = extract_owner_info(pdf_paths, on_progress)
+    print(f"✅ 所有者情報抽出完了: {len(df_owner)} 件")
 
     # ステップ3: 郵便番号取得
     print("▶️ 郵便番号検索開始")
-    zip_records = []
-    for addr in df_owner['所有者住所'].unique():
-        zipcode = get_zipcode(addr)
-        zip_records.append({'所有者住所': addr, '郵便番号': zipcode})
-    df_zip = pd.DataFrame(zip_records)
-    df_zip.to_csv(zipcode_out_path, index=False, encoding='utf-8-sig')
-    print(f"✅ 郵便番号CSV出力: {zipcode_out_path}")
-
-    # ステップ4: CSV結合
-    print("▶️ CSV結合開始")
-    merge_data(owner_out_path, zipcode_out_path, final_out_path)
-    print(f"✅ 最終CSV出力: {final_out_path}")
+    zipcodes = {}
+    owner_addresses = df_owner['所有者住所'].unique()
+    for idx, addr in enumerate(owner_addresses, 1):
+        zipcodes[addr] = get_zipcode(addr)
+        if on_progress:
+            on_progress("zipcode", idx, len(owner_addresses))
+    df_zip = pd.DataFrame({'所有者住所': list(zipcodes), '郵便番号': list(zipcodes.values())})
+    print(f"✅ 郵便番号検索完了: {len(df_zip)} 件")
+
+    # ステップ4: 結合（ファイルを介さずメモリ上で郵便番号を引く）
+    print("▶️ 結合開始")
+    df_final = merge_frames(df_owner, zipcodes)
+    if on_progress:
+        on_progress("merge", 1, 1)
+
+    # 出力ファイルは最後にまとめて書き出す
+    output_files = {
+        "owner_info":   owner_out_path,
+        "zipcode_info": zipcode_out_path,
+        "final_output": final_out_path
+    }
+    write_outputs(
+        {"owner_info": df_owner, "zipcode_info": df_zip, "final_output": df_final},
+        output_files,
+        output_format,
+    )
+    if output_format == "parquet":
+        output_files["dataset"] = append_to_dataset(
+            df_final, base_output_dir, manifest["registry_office"], task_id
+        )
+
+    # ステップ5: DB 登録
+    persisted = None
+    if db is not None:
+        persisted = persist_pipeline_results(
+            db,
+            df_final.to_dict("records"),
+            document_id=document_id,
+            registry_office=manifest["registry_office"],
+            extracted_by=extracted_by,
+        )
+        print(f"✅ DB登録: {persisted}")
 
     return {
         "task_id":     task_id,
         "pdf_count":   len(pdf_paths),
         "owner_count": len(df_owner),
-        "output_files": {
-            "owner_info":   owner_out_path,
-            "zipcode_info": zipcode_out_path,
-            "final_output": final_out_path
-        }
+        "output_files": output_files,
+        "persisted": persisted
     }
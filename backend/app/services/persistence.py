@@ -0,0 +1,187 @@
+'''
+パイプラインの抽出結果を ExtractedData・Owner・Property・Ownership に一括登録する。
+
+行ごとに ORM で flush せず、テーブルごとに 1 つの INSERT ... ON CONFLICT 文
+（複数行 VALUES）で登録するため、所有者が何件あっても文の数は一定になる。
+所有者は正規化した氏名と住所、物件は (所在地, 登記所) で重複を排除するため、
+同じ台帳を再処理しても行は増えない。物件の所在地と、所有者・顧客の重複判定用の
+住所（normalized_*）は app.services.address の正規形（丁目・番地・号をハイフンに
+そろえたもの）にそろえ、台帳と登記PDFのどちらから登録しても同じ行になるようにする。
+'''
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.address import normalize_address, parse_address
+from app.utils.helpers import normalize_text
+
+# 1 文あたりの最大行数（SQLite のバインド変数上限に収まるように）
+BATCH_SIZE = 1000
+
+def extract_prefecture(address: str) -> str:
+    return parse_address(address).prefecture
+
+
+def normalized_customer_fields(name: Any, address: Any, property_address: Any) -> Dict[str, str]:
+    """
+    顧客の重複判定用に正規化した氏名・住所・物件所在地を返します。
+    """
+    return {
+        "normalized_name": normalize_text(name),
+        "normalized_address": normalize_address(address),
+        "normalized_property_address": normalize_address(property_address),
+    }
+
+
+def _insert(db: Session, model):
+    """
+    接続先のデータベースに合わせた ON CONFLICT 対応の INSERT を返します。
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Upsert is not supported for {dialect}")
+
+
+def _batches(rows: List[Dict[str, Any]]) -> Iterable[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start:start + BATCH_SIZE]
+
+
+def _upsert_owners(db: Session, owners: Dict[tuple, Dict[str, Any]]) -> Dict[tuple, int]:
+    ids: Dict[tuple, int] = {}
+    for batch in _batches(list(owners.values())):
+        stmt = _insert(db, models.Owner).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["normalized_name", "normalized_address"],
+            set_={
+                "postal_code": func.coalesce(stmt.excluded.postal_code, models.Owner.postal_code),
+                "updated_at": func.now(),
+            },
+        ).returning(models.Owner.id, models.Owner.normalized_name, models.Owner.normalized_address)
+        for row in db.execute(stmt):
+            ids[(row.normalized_name, row.normalized_address)] = row.id
+    return ids
+
+
+def _upsert_properties(db: Session, properties: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    ids: Dict[str, int] = {}
+    for batch in _batches(list(properties.values())):
+        stmt = _insert(db, models.Property).values(batch)
+        # DO NOTHING では既存行の id が返らないため、更新日時だけ更新する
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["property_address", "registry_office"],
+            set_={"updated_at": func.now()},
+        ).returning(models.Property.id, models.Property.property_address)
+        for row in db.execute(stmt):
+            ids[row.property_address] = row.id
+    return ids
+
+
+def persist_properties(db: Session, addresses: Iterable[str], registry_office: str) -> Dict[str, int]:
+    """
+    所在地の一覧を 1 つの文で物件として登録し、{正規化した所在地: id} を返します。
+    コミットは呼び出し側で行います。
+    """
+    properties = {
+        normalize_address(address): {
+            "property_address": normalize_address(address),
+            "registry_office": registry_office,
+            "property_type": "land",  # デフォルト値
+        }
+        for address in addresses
+        if normalize_address(address)
+    }
+    return _upsert_properties(db, properties) if properties else {}
+
+
+def _insert_ignoring_duplicates(db: Session, model, rows: List[Dict[str, Any]], index_elements: List[str]) -> None:
+    for batch in _batches(rows):
+        stmt = _insert(db, model).values(batch).on_conflict_do_nothing(index_elements=index_elements)
+        db.execute(stmt)
+
+
+def persist_pipeline_results(
+    db: Session,
+    records: List[Dict[str, Any]],
+    document_id: Optional[int] = None,
+    registry_office: str = "",
+    extracted_by: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    最終出力の各行（氏名・所有者住所・不動産所在地・郵便番号）を登録し、
+    テーブルごとの登録対象件数を返します。コミットは呼び出し側で行います。
+    """
+    owners: Dict[tuple, Dict[str, Any]] = {}
+    properties: Dict[str, Dict[str, Any]] = {}
+    rows = []
+    for record in records:
+        name = str(record.get("氏名") or "").strip()
+        owner_address = str(record.get("所有者住所") or "").strip()
+        property_address = normalize_address(record.get("不動産所在地"))
+        if not name or not owner_address or not property_address:
+            continue
+        postal_code = record.get("郵便番号")
+        postal_code = str(postal_code).strip() if postal_code and str(postal_code) != "nan" else None
+
+        owner_key = (normalize_text(name), normalize_address(owner_address))
+        owners.setdefault(owner_key, {
+            "name": name,
+            "address": owner_address,
+            "postal_code": postal_code,
+            "normalized_name": owner_key[0],
+            "normalized_address": owner_key[1],
+        })
+        properties.setdefault(property_address, {
+            "property_address": property_address,
+            "registry_office": registry_office,
+            "property_type": "land",  # デフォルト値
+        })
+        rows.append((owner_key, property_address, name, owner_address, postal_code))
+
+    if not rows:
+        return {"owners": 0, "properties": 0, "ownerships": 0, "extracted_data": 0}
+
+    owner_ids = _upsert_owners(db, owners)
+    property_ids = _upsert_properties(db, properties)
+
+    ownerships = {
+        (property_ids[property_address], owner_ids[owner_key]): {
+            "property_id": property_ids[property_address],
+            "owner_id": owner_ids[owner_key],
+        }
+        for owner_key, property_address, _, _, _ in rows
+    }
+    _insert_ignoring_duplicates(db, models.Ownership, list(ownerships.values()), ["property_id", "owner_id"])
+
+    extracted = {
+        (name, owner_address, property_address): {
+            "document_id": document_id,
+            "customer_name": name,
+            "postal_code": postal_code,
+            "prefecture": extract_prefecture(owner_address),
+            "current_address": owner_address,
+            "inheritance_address": property_address,
+            "extracted_by": extracted_by,
+        }
+        for _, property_address, name, owner_address, postal_code in rows
+    }
+    _insert_ignoring_duplicates(
+        db,
+        models.ExtractedData,
+        list(extracted.values()),
+        ["document_id", "customer_name", "current_address", "inheritance_address"],
+    )
+
+    return {
+        "owners": len(owners),
+        "properties": len(properties),
+        "ownerships": len(ownerships),
+        "extracted_data": len(extracted),
+    }
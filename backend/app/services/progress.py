@@ -0,0 +1,258 @@
+'''
+パイプライン処理の進捗をタスク単位で配信するブローカー。
+
+各ステージ（OCR・PDFダウンロード・所有者情報抽出・郵便番号検索・CSV結合）から
+ProgressReporter 経由で進捗を publish し、SSE エンドポイントやタスク状態 API が
+最新の進捗を参照・購読する。PROGRESS_BROKER=redis の場合は Redis pub/sub を使い、
+複数ワーカー間でも進捗を共有する。
+
+タスクのキャンセル要求もブローカー経由で伝える。ProgressReporter は進捗の通知
+（ページ・住所・PDF ごと）のたびに要求を確認し、TaskCancelled を送出して
+パイプラインを協調的に停止させる。あわせて TASK_HEARTBEAT_SECONDS ごとに
+heartbeat を呼び、実行中のタスクが止まっていないことを記録する。
+'''
+
+import asyncio
+import json
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+# パイプラインのステージ（実行順）
+PIPELINE_STAGES = ["ocr", "download", "owner_extraction", "zipcode", "merge"]
+
+# これ以上進捗が更新されないタスク状態
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+# 各ステージから呼ばれるコールバック: (stage, current, total)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class TaskCancelled(Exception):
+    """
+    キャンセルが要求されたタスクのパイプライン内で送出されます。
+    """
+
+
+class ProgressBroker:
+    """
+    プロセス内ブローカー。
+    publish はバックグラウンドタスクのスレッドから、subscribe はイベントループから呼ばれる。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: Dict[str, dict] = {}
+        self._cancelled: Set[str] = set()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def publish(self, task_id: str, event: dict) -> None:
+        with self._lock:
+            if event.get("status") in TERMINAL_STATUSES:
+                self._latest.pop(task_id, None)
+            else:
+                self._latest[task_id] = event
+            subscribers = list(self._subscribers.get(task_id, []))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def latest(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._latest.get(task_id)
+
+    def request_cancel(self, task_id: str) -> None:
+        with self._lock:
+            self._cancelled.add(task_id)
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        with self._lock:
+            return task_id in self._cancelled
+
+    def clear_cancel(self, task_id: str) -> None:
+        with self._lock:
+            self._cancelled.discard(task_id)
+
+    def ping(self) -> None:
+        """
+        配信先に接続できることを確認します（接続できない場合は例外を送出します）。
+        """
+
+    def _add_subscriber(self, task_id: str, entry: Tuple[asyncio.AbstractEventLoop, asyncio.Queue]) -> None:
+        # これ以降に publish された進捗は購読側に届く
+        with self._lock:
+            self._subscribers.setdefault(task_id, []).append(entry)
+
+    async def subscribe(self, task_id: str) -> AsyncIterator[dict]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (loop, queue)
+        self._add_subscriber(task_id, entry)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(task_id, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(task_id, None)
+
+
+class RedisProgressBroker(ProgressBroker):
+    """
+    Redis pub/sub を使うブローカー。
+    最新の進捗は TTL 付きのキーに保存し、どのワーカーからでも参照できるようにする。
+    """
+
+    CHANNEL_PREFIX = "task_progress:"
+    LATEST_TTL_SECONDS = 60 * 60 * 24
+
+    def __init__(self, redis_url: str):
+        import redis
+
+        super().__init__()
+        self._redis_url = redis_url
+        self._client = redis.Redis.from_url(redis_url)
+
+    def _channel(self, task_id: str) -> str:
+        return f"{self.CHANNEL_PREFIX}{task_id}"
+
+    def publish(self, task_id: str, event: dict) -> None:
+        payload = json.dumps(event, ensure_ascii=False)
+        key = f"{self._channel(task_id)}:latest"
+        pipe = self._client.pipeline()
+        if event.get("status") in TERMINAL_STATUSES:
+            pipe.delete(key)
+        else:
+            pipe.set(key, payload, ex=self.LATEST_TTL_SECONDS)
+        pipe.publish(self._channel(task_id), payload)
+        pipe.execute()
+
+    def latest(self, task_id: str) -> Optional[dict]:
+        payload = self._client.get(f"{self._channel(task_id)}:latest")
+        return json.loads(payload) if payload else None
+
+    def request_cancel(self, task_id: str) -> None:
+        self._client.set(f"{self._channel(task_id)}:cancel", 1, ex=self.LATEST_TTL_SECONDS)
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        return bool(self._client.exists(f"{self._channel(task_id)}:cancel"))
+
+    def clear_cancel(self, task_id: str) -> None:
+        self._client.delete(f"{self._channel(task_id)}:cancel")
+
+    def ping(self) -> None:
+        self._client.ping()
+
+    async def subscribe(self, task_id: str) -> AsyncIterator[dict]:
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self._redis_url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self._channel(task_id))
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(self._channel(task_id))
+            await pubsub.close()
+            await client.close()
+
+
+_broker: Optional[ProgressBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_progress_broker() -> ProgressBroker:
+    """
+    設定 (PROGRESS_BROKER) に応じたブローカーを返す。
+    """
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if settings.PROGRESS_BROKER == "redis":
+                _broker = RedisProgressBroker(settings.REDIS_URL)
+            else:
+                _broker = ProgressBroker()
+        return _broker
+
+
+class ProgressReporter:
+    """
+    1タスク分の進捗を組み立てて publish する。
+    パイプラインの各ステージに ProgressCallback として渡す。
+    呼ばれるたびにキャンセル要求を確認し、要求があれば TaskCancelled を送出する。
+    heartbeat を渡した場合は、キャンセル確認の際に heartbeat_interval 秒に 1 回まで呼ぶ。
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        broker: Optional[ProgressBroker] = None,
+        heartbeat: Optional[Callable[[], None]] = None,
+        heartbeat_interval: Optional[float] = None,
+    ):
+        self.task_id = task_id
+        self.broker = broker or get_progress_broker()
+        self.heartbeat = heartbeat
+        self.heartbeat_interval = (
+            heartbeat_interval if heartbeat_interval is not None else settings.TASK_HEARTBEAT_SECONDS
+        )
+        self._last_beat: Optional[float] = None
+        self._stage: Optional[str] = None
+        self._stage_started_at = time.monotonic()
+
+    def beat(self) -> None:
+        if self.heartbeat is None:
+            return
+        now = time.monotonic()
+        if self._last_beat is not None and now - self._last_beat < self.heartbeat_interval:
+            return
+        self._last_beat = now
+        self.heartbeat()
+
+    def is_cancel_requested(self) -> bool:
+        self.beat()
+        return self.broker.is_cancel_requested(self.task_id)
+
+    def raise_if_cancelled(self) -> None:
+        if self.is_cancel_requested():
+            raise TaskCancelled(self.task_id)
+
+    def __call__(self, stage: str, current: int, total: int) -> None:
+        self.raise_if_cancelled()
+        now = time.monotonic()
+        if stage != self._stage:
+            self._stage = stage
+            self._stage_started_at = now
+        elapsed = now - self._stage_started_at
+
+        stage_index = PIPELINE_STAGES.index(stage) if stage in PIPELINE_STAGES else 0
+        stage_fraction = current / total if total else 1.0
+        # 0〜100 のパーセント（画面のプログレスバーにそのまま渡す）
+        progress = (stage_index + stage_fraction) / len(PIPELINE_STAGES) * 100
+
+        self.broker.publish(self.task_id, {
+            "task_id":  self.task_id,
+            "status":   "processing",
+            "stage":    stage,
+            "current":  current,
+            "total":    total,
+            "progress": round(progress, 1),
+            # ステージ内のスループット（件/秒）
+            "rate":     round(current / elapsed, 4) if elapsed > 0 else None,
+            "message":  f"{stage}: {current}/{total}",
+        })
+
+    def finish(self, status: str, message: Optional[str] = None) -> None:
+        self.broker.publish(self.task_id, {
+            "task_id":  self.task_id,
+            "status":   status,
+            "progress": 100.0 if status == "completed" else None,
+            "message":  message or f"Task is {status}",
+        })
@@ -0,0 +1,183 @@
+'''
+レポート用の日次ロールアップ (daily_rollups) を管理する。
+
+文書・タスク・登記請求を日付（とステータス）単位で集計して保持し、
+月次レポートはこの日次の値を合算して返す。前回の集計以降に updated_at が
+更新された行の日付だけを再集計するため、差分更新のコストはテーブルの大きさに
+依存しない。行の削除は差分では検出できないため、必要に応じて full=True で
+全期間を再集計する。
+'''
+
+import threading
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Date, DateTime, and_, func, insert, literal, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.database import db_now
+
+ROLLUP_NAME = "daily_rollups"
+
+# コミット前のトランザクションを取りこぼさないよう、前回集計時刻から少し遡って差分を取る
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+_refresh_lock = threading.Lock()
+
+
+def _sources():
+    """
+    metric -> (モデル, 日付列, ディメンション列, 金額列)
+    """
+    return {
+        "documents": (models.Document, models.Document.upload_date, None, None),
+        "tasks": (models.Task, models.Task.start_time, models.Task.status, None),
+        "registry_requests": (
+            models.RegistryRequest,
+            models.RegistryRequest.request_date,
+            models.RegistryRequest.status,
+            models.RegistryRequest.cost,
+        ),
+    }
+
+
+def _day_expr(date_column):
+    # date() は PostgreSQL・SQLite の両方で使える
+    return func.date(date_column, type_=Date)
+
+
+def _bound(date_column, day: date):
+    if isinstance(date_column.type, DateTime):
+        return datetime.combine(day, time.min)
+    return day
+
+
+def _dirty_days(db: Session, model, date_column, since: Optional[datetime]) -> Set[date]:
+    query = db.query(_day_expr(date_column)).distinct()
+    if since is not None:
+        query = query.filter(model.updated_at >= since)
+    return {row[0] for row in query if row[0] is not None}
+
+
+def _day_ranges(days: Set[date]) -> List[Tuple[date, date]]:
+    """
+    日付の集合を連続する日ごとの [開始日, 終了日] にまとめます。
+    """
+    ranges: List[Tuple[date, date]] = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _recompute(db: Session, metric: str, source, days: Set[date], full: bool) -> None:
+    model, date_column, dimension_column, amount_column = source
+    day = _day_expr(date_column)
+    dimension = dimension_column if dimension_column is not None else literal("")
+    amount = func.coalesce(func.sum(amount_column), 0) if amount_column is not None else literal(0)
+
+    group_by = [day] if dimension_column is None else [day, dimension_column]
+    query = db.query(day.label("day"), dimension.label("dimension"), func.count().label("count"), amount.label("amount"))
+    if not full:
+        # 変更のあった日だけを読む（日付列のインデックスが使えるよう、連続する日は範囲にまとめる）
+        query = query.filter(or_(*[
+            and_(
+                date_column >= _bound(date_column, first),
+                date_column < _bound(date_column, last + timedelta(days=1)),
+            )
+            for first, last in _day_ranges(days)
+        ]))
+    rows = query.group_by(*group_by).all()
+
+    stale = db.query(models.DailyRollup).filter(models.DailyRollup.metric == metric)
+    if not full:
+        stale = stale.filter(models.DailyRollup.day.in_(days))
+    stale.delete(synchronize_session=False)
+
+    values = [
+        {
+            "day": row.day,
+            "metric": metric,
+            "dimension": row.dimension or "",
+            "count": row.count,
+            "amount": int(row.amount or 0),
+        }
+        for row in rows
+        if row.day in days
+    ]
+    if values:
+        db.execute(insert(models.DailyRollup), values)
+
+
+def refresh_rollups(db: Session, full: bool = False) -> None:
+    """
+    前回の集計以降に変更された日付のロールアップを再集計します。
+    full=True の場合は全期間を再集計します。
+    """
+    # updated_at と同じ DB の時計で集計時刻を記録する
+    started_at = db_now(db)
+    state = db.get(models.RollupState, ROLLUP_NAME)
+    since = None if full or state is None else state.refreshed_at - REFRESH_OVERLAP
+
+    for metric, source in _sources().items():
+        model, date_column, _, _ = source
+        days = _dirty_days(db, model, date_column, since)
+        if days or since is None:
+            _recompute(db, metric, source, days or {started_at.date()}, since is None)
+
+    if state is None:
+        db.add(models.RollupState(name=ROLLUP_NAME, refreshed_at=started_at))
+    else:
+        state.refreshed_at = started_at
+    db.commit()
+
+
+def ensure_fresh(db: Session) -> None:
+    """
+    最終集計から ROLLUP_REFRESH_SECONDS 以上経過していれば差分更新します。
+    """
+    state = db.get(models.RollupState, ROLLUP_NAME)
+    if state is not None:
+        if db_now(db) - state.refreshed_at < timedelta(seconds=settings.ROLLUP_REFRESH_SECONDS):
+            return
+
+    if not _refresh_lock.acquire(blocking=False):
+        # 同じプロセスで集計中であれば、その時点の値をそのまま返す
+        return
+    try:
+        refresh_rollups(db)
+    except IntegrityError:
+        # 別ワーカーが同時に集計した場合はそちらの結果を使う
+        db.rollback()
+    finally:
+        _refresh_lock.release()
+
+
+def monthly_rollups(db: Session, metric: str, start_day: date) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    start_day 以降の日次ロールアップを月単位に合算し、
+    {"YYYY-MM": {dimension: {"count": n, "amount": n}}} で返します。
+    """
+    ensure_fresh(db)
+
+    rows = (
+        db.query(models.DailyRollup)
+        .filter(models.DailyRollup.metric == metric, models.DailyRollup.day >= start_day)
+        .order_by(models.DailyRollup.day)
+        .all()
+    )
+
+    months: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(
+        lambda: defaultdict(lambda: {"count": 0, "amount": 0})
+    )
+    for row in rows:
+        bucket = months[row.day.strftime("%Y-%m")][row.dimension]
+        bucket["count"] += row.count
+        bucket["amount"] += row.amount
+    return {month: dict(dimensions) for month, dimensions in months.items()}
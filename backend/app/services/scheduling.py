@@ -0,0 +1,78 @@
+'''
+パイプラインの同時実行数を制限し、優先度の高いタスクから実行する。
+
+バックグラウンドタスクは登録されるとすぐにスレッドプールで開始されるため、
+パイプライン本体の前で PriorityScheduler の枠を取得させる。枠が空くと、
+待っているタスクのうち優先度が最も高いもの（同じ優先度なら先に来たもの）が
+実行される。待機中もキャンセル要求を定期的に確認する。
+'''
+
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.progress import TaskCancelled
+
+# 待機中にキャンセル要求を確認する間隔（秒）
+CANCEL_POLL_SECONDS = 1.0
+
+
+class PriorityScheduler:
+    """
+    プロセス内で同時に slots 件までタスクを実行させる優先度付きセマフォ。
+    """
+
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+
+    def acquire(self, priority: int = 0, is_cancelled: Optional[Callable[[], bool]] = None) -> None:
+        """
+        実行枠を取得します。取得前にキャンセルされた場合は TaskCancelled を送出します。
+        """
+        entry = (-priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+        try:
+            while True:
+                with self._cond:
+                    if self._running < self.slots and self._waiting[0] == entry:
+                        heapq.heappop(self._waiting)
+                        self._running += 1
+                        return
+                    self._cond.wait(CANCEL_POLL_SECONDS)
+                if is_cancelled is not None and is_cancelled():
+                    raise TaskCancelled()
+        except BaseException:
+            with self._cond:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                self._cond.notify_all()
+            raise
+
+    def release(self) -> None:
+        with self._cond:
+            self._running -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: int = 0, is_cancelled: Optional[Callable[[], bool]] = None) -> Iterator[None]:
+        self.acquire(priority, is_cancelled)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def waiting(self) -> int:
+        with self._cond:
+            return len(self._waiting)
+
+
+pipeline_scheduler = PriorityScheduler(settings.PIPELINE_CONCURRENCY)
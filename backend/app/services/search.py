@@ -0,0 +1,113 @@
+'''
+顧客・所有者・物件の横断検索。
+
+PostgreSQL では pg_trgm の GIN インデックス（gin_trgm_ops）を使い、部分一致
+（ILIKE '%…%'）と語単位のあいまい一致（<% 演算子）で候補を絞り込み、
+word_similarity の最大値で順位付けする。どちらの条件もインデックスで評価できるため、
+件数が増えても走査するのは一致した行だけになる。
+SQLite（テスト）では LIKE の部分一致に切り替え、完全一致・前方一致・部分一致の
+順に点数を付ける。
+
+pg_trgm は英数字以外を区切りとして扱うため、日本語を検索するには LC_CTYPE が
+C 以外（ja_JP.UTF-8 / C.UTF-8 など）のデータベースが必要。
+'''
+
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+SEARCH_TYPES = ("customer", "owner", "property")
+
+# エンティティごとの (モデル, 表示名の列, 補足の列, 検索対象の列)
+_TARGETS = {
+    "customer": (
+        models.Customer,
+        models.Customer.name,
+        models.Customer.address,
+        [models.Customer.name, models.Customer.address, models.Customer.property_address],
+    ),
+    "owner": (
+        models.Owner,
+        models.Owner.name,
+        models.Owner.address,
+        [models.Owner.name, models.Owner.address],
+    ),
+    "property": (
+        models.Property,
+        models.Property.property_address,
+        models.Property.registry_office,
+        [models.Property.property_address],
+    ),
+}
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _postgresql_match(columns, query: str):
+    pattern = _like_pattern(query)
+    condition = or_(*[
+        or_(column.ilike(pattern, escape="\\"), literal(query).op("<%")(column))
+        for column in columns
+    ])
+    score = func.greatest(*[func.word_similarity(query, column) for column in columns])
+    return condition, score
+
+
+def _fallback_match(columns, query: str):
+    pattern = _like_pattern(query)
+    condition = or_(*[column.like(pattern, escape="\\") for column in columns])
+    scores = [
+        case(
+            (column == query, 1.0),
+            (column.like(f"{pattern[1:]}", escape="\\"), 0.75),
+            (column.like(pattern, escape="\\"), 0.5),
+            else_=0.0,
+        )
+        for column in columns
+    ]
+    score = func.max(*scores) if len(scores) > 1 else scores[0]
+    return condition, score
+
+
+def search(
+    db: Session,
+    query: str,
+    types: Optional[Sequence[str]] = None,
+    limit: int = 20,
+) -> List[Dict]:
+    """
+    顧客・所有者・物件を横断して検索し、点数の高い順に最大 limit 件を返します。
+    """
+    query = query.strip()
+    match = _postgresql_match if db.get_bind().dialect.name == "postgresql" else _fallback_match
+
+    results: List[Dict] = []
+    for entity_type in types or SEARCH_TYPES:
+        model, title, subtitle, columns = _TARGETS[entity_type]
+        condition, score = match(columns, query)
+        # エンティティごとに上位 limit 件だけを取り出してから全体で順位付けする
+        rows = db.execute(
+            select(model.id, title.label("title"), subtitle.label("subtitle"), score.label("score"))
+            .where(condition)
+            .order_by(score.desc(), model.id.desc())
+            .limit(limit)
+        )
+        results.extend(
+            {
+                "entity_type": entity_type,
+                "id": row.id,
+                "title": row.title,
+                "subtitle": row.subtitle,
+                "score": round(float(row.score or 0), 4),
+            }
+            for row in rows
+        )
+
+    results.sort(key=lambda result: (-result["score"], result["entity_type"], -result["id"]))
+    return results[:limit]
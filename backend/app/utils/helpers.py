@@ -1,8 +1,23 @@
 # app/utils/helpers.py
 import os
+import re
+import unicodedata
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+_DASHES = re.compile(r"[‐‑‒–—―−－ｰ]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(value: Any) -> str:
+    """
+    全角・半角や空白、ハイフンの揺れをそろえた比較用の文字列を返します。
+    """
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKC", str(value))
+    text = _DASHES.sub("-", text)
+    return _WHITESPACE.sub("", text)
 
 def ensure_dir(directory: str) -> str:
     """
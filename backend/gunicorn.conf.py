@@ -0,0 +1,36 @@
+# gunicorn.conf.py
+# WEB_CONCURRENCY が 2 以上のとき start.sh から使う gunicorn の設定。
+#
+# - アプリはマスターで 1 回だけ import してから fork する（preload_app）。
+#   各ワーカーは import 済みのモジュールをコピーオンライトで共有するため、起動が速くメモリも少ない。
+# - kill -HUP <マスターの PID> で新しいワーカーを起動してから古いワーカーを止める（無停止の再起動）。
+#   古いワーカーは GRACEFUL_TIMEOUT 秒まで処理中のリクエストを待ってから終了する。
+#   preload_app のためコードの変更は反映されない。コードを入れ替える場合はコンテナごと再起動する。
+# - タスクの進捗・キャンセル要求をワーカー間で共有するため PROGRESS_BROKER=redis にする。
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+# 応答しないワーカーを再起動するまでの時間と、停止時に処理中のリクエストを待つ時間（秒）
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("KEEPALIVE", 5))
+
+# 指定した件数を処理したワーカーを入れ替える（0 なら入れ替えない）。一斉に入れ替わらないよう揺らす
+max_requests = int(os.getenv("MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # マスターで作ったコネクションプールをワーカー間で共有しないよう、fork 後に作り直す
+    from app.db.database import engine, worker_engine
+
+    engine.dispose(close=False)
+    worker_engine.dispose(close=False)
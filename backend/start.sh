@@ -64,5 +64,15 @@ db.close()
 PYCODE
 
 # アプリケーションを起動
+# WEB_CONCURRENCY が 2 以上なら gunicorn + uvicorn ワーカーで複数プロセス起動する（設定は gunicorn.conf.py）
+WEB_CONCURRENCY=${WEB_CONCURRENCY:-1}
+if [ "$WEB_CONCURRENCY" -gt 1 ]; then
+  if [ "${PROGRESS_BROKER:-memory}" != "redis" ]; then
+    echo "WARNING: PROGRESS_BROKER is not redis; task progress and cancel requests are not shared between workers"
+  fi
+  echo "Starting application with $WEB_CONCURRENCY workers..."
+  exec gunicorn app.main:app -c gunicorn.conf.py
+fi
+
 echo "Starting application..."
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --timeout-graceful-shutdown "${GRACEFUL_TIMEOUT:-30}"
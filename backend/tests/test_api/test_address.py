@@ -0,0 +1,101 @@
+# tests/test_api/test_address.py
+import os
+
+import pandas as pd
+import pytest
+
+from app.services import extract_zipcode
+from app.services.address import (
+    address_filename,
+    benchmark,
+    kanji_to_number,
+    normalize_address,
+    parse_address,
+    strip_additional_lots,
+)
+
+@pytest.mark.parametrize("text, expected", [
+    ("十", 10),
+    ("二十五", 25),
+    ("三百二十一", 321),
+    ("千八", 1008),
+    ("一万二千", 12000),
+    ("二〇三", 203),
+])
+def test_kanji_to_number(text, expected):
+    assert kanji_to_number(text) == expected
+
+@pytest.mark.parametrize("address, expected", [
+    # 漢数字の丁目・番地・号、大字/字、外N
+    ("滋賀県東近江市佐野町字北三丁目4番地の5 外2", "滋賀県東近江市佐野町北3-4-5"),
+    ("滋賀県蒲生郡日野町大字大窪１０２３番地", "滋賀県蒲生郡日野町大窪1023"),
+    ("東京都千代田区丸の内一丁目１－１", "東京都千代田区丸の内1-1-1"),
+    ("東京都千代田区丸の内1ー1ー1", "東京都千代田区丸の内1-1-1"),
+    ("大阪府大阪市北区梅田二丁目5番25号", "大阪府大阪市北区梅田2-5-25"),
+    # 地名の漢数字や「字」は変えない
+    ("東京都千代田区一番町十二番地", "東京都千代田区一番町12"),
+    ("東京都千代田区一番町十二番地の三 二号館", "東京都千代田区一番町12-3二号館"),
+    ("滋賀県東近江市八日市町1-2", "滋賀県東近江市八日市町1-2"),
+    ("秋田県横手市十文字町字本町二十三", "秋田県横手市十文字町本町23"),
+    # 号・番・「の」の直後でも、建物名の先頭の漢数字は変えない
+    ("東京都港区六本木六丁目10番1号 六本木ヒルズ森タワー", "東京都港区六本木6-10-1六本木ヒルズ森タワー"),
+    ("大阪府大阪市北区梅田二丁目5番の二十五 三番街ビル", "大阪府大阪市北区梅田2-5-25三番街ビル"),
+    ("滋賀県東近江市佐野町801番地 外二筆", "滋賀県東近江市佐野町801"),
+])
+def test_normalize_address(address, expected):
+    assert normalize_address(address) == expected
+    # 正規形をもう一度正規化しても変わらない
+    assert normalize_address(expected) == expected
+
+def test_parse_address():
+    address = parse_address("大阪府大阪市北区梅田二丁目5番25号 梅田ビル3F")
+    assert (address.prefecture, address.city, address.town, address.block, address.rest) == (
+        "大阪府", "大阪市北区", "梅田", "2-5-25", "梅田ビル3F"
+    )
+    address = parse_address("東京都港区六本木六丁目10番1号 六本木ヒルズ森タワー")
+    assert (address.town, address.block, address.rest) == ("六本木", "6-10-1", "六本木ヒルズ森タワー")
+    assert parse_address("三重県四日市市諏訪町1番5号").city == "四日市市"
+    assert parse_address("滋賀県蒲生郡日野町大字大窪1023").city == "蒲生郡日野町"
+    assert parse_address("北海道札幌市中央区北1条西2丁目").town == "北1条西"
+
+def test_normalize_address_is_memoized():
+    normalize_address.cache_clear()
+    for _ in range(3):
+        normalize_address("滋賀県東近江市佐野町801番地")
+    info = normalize_address.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+def test_strip_additional_lots_and_filename():
+    assert strip_additional_lots("東近江市佐野町801 外2") == "東近江市佐野町801"
+    assert strip_additional_lots("東近江市佐野町801外十二") == "東近江市佐野町801"
+    assert address_filename("東近江市 佐野町801/2") == "東近江市_佐野町801-2"
+
+def test_get_zipcode_uses_normalized_address(monkeypatch):
+    ken_all = pd.DataFrame([
+        {"郵便番号": 5270046, "都道府県": "滋賀県", "市区町村": "東近江市", "町域": "佐野町"},
+        {"郵便番号": 1000005, "都道府県": "東京都", "市区町村": "千代田区", "町域": "丸の内"},
+    ])
+    calls = []
+
+    def load_postal_code_data():
+        calls.append(1)
+        return ken_all
+
+    monkeypatch.setattr(extract_zipcode, "load_postal_code_data", load_postal_code_data)
+    extract_zipcode._lookup_zipcode.cache_clear()
+
+    assert extract_zipcode.get_zipcode("滋賀県東近江市大字佐野町801番地") == "527-0046"
+    assert extract_zipcode.get_zipcode("東京都千代田区丸の内一丁目1番1号") == "100-0005"
+    # 表記が違っても同じ町域はメモから返す
+    assert extract_zipcode.get_zipcode("東京都千代田区丸の内１－２－３") == "100-0005"
+    assert len(calls) == 2
+    assert extract_zipcode.get_zipcode("東京都千代田区霞が関1-1") == "該当なし"
+    with pytest.raises(ValueError):
+        extract_zipcode.get_zipcode("住所不明")
+    extract_zipcode._lookup_zipcode.cache_clear()
+
+@pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS=1 で実行するマイクロベンチマーク")
+def test_normalize_address_benchmark():
+    result = benchmark(100000)
+    assert result["cache"]["misses"] == 100000
+    assert result["warm_per_second"] > result["uncached_per_second"]
@@ -0,0 +1,128 @@
+from fastapi.testclient import TestClient
+import asyncio
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    get_current_user,
+    get_password_hash,
+    invalidate_user_cache,
+    verify_and_update_password,
+)
+from app.db.models import User
+from tests.conftest import engine
+
+@pytest.fixture
+def user_queries():
+    """
+    users テーブルへの SELECT を数える。
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def create_user(db, email):
+    user = User(email=email, password_hash="x", name="Cached User", role="staff", status="active")
+    db.add(user)
+    db.commit()
+    invalidate_user_cache(email)
+    return user
+
+def test_get_current_user_is_cached(db, user_queries):
+    user_id = create_user(db, "cached@example.com").id
+    token = create_access_token(data={"sub": "cached@example.com"})
+    user_queries.clear()
+
+    # 1回目は DB から読み込む
+    principal = get_current_user(token=token, db=db)
+    assert principal.id == user_id
+    assert principal.role == "staff"
+    assert len(user_queries) == 1
+
+    # 2回目以降は署名の検証のみ
+    assert get_current_user(token=token, db=db) == principal
+    assert len(user_queries) == 1
+
+def test_user_cache_invalidated_on_update(db, user_queries):
+    user = create_user(db, "updated@example.com")
+    token = create_access_token(data={"sub": "updated@example.com"})
+    user_queries.clear()
+    assert get_current_user(token=token, db=db).status == "active"
+
+    # ステータスを変更するとキャッシュが破棄される
+    user.status = "inactive"
+    db.commit()
+    user_queries.clear()
+
+    assert get_current_user(token=token, db=db).status == "inactive"
+    assert len(user_queries) == 1
+
+def test_login_rehashes_when_cost_changes(client, db):
+    # 現在の設定より低いコストでハッシュされたパスワード
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("password")
+    # conftest の test_user (id=1) と ID が衝突しないよう明示する
+    user = User(id=1000, email="rehash@example.com", password_hash=old_hash, name="Rehash User")
+    db.add(user)
+    db.commit()
+
+    response = client.post("/api/v1/auth/token", data={"username": "rehash@example.com", "password": "password"})
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+    db.refresh(user)
+    assert user.password_hash != old_hash
+    assert user.password_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert user.last_login is not None
+
+    response = client.post("/api/v1/auth/token", data={"username": "rehash@example.com", "password": "wrong"})
+    assert response.status_code == 401
+
+def test_login_burst_runs_off_event_loop(monkeypatch):
+    """
+    ログインが集中しても bcrypt の検証はイベントループ外のスレッドで、
+    PASSWORD_HASH_CONCURRENCY 件までしか同時に実行されないことを確認する。
+    """
+    import threading
+    from app.core import security
+
+    burst_size = 8
+    hashed_password = get_password_hash("password")
+    verify_and_update = security.pwd_context.verify_and_update
+    lock = threading.Lock()
+    threads = set()
+    running = 0
+    max_running = 0
+
+    def tracking_verify_and_update(*args, **kwargs):
+        nonlocal running, max_running
+        with lock:
+            threads.add(threading.get_ident())
+            running += 1
+            max_running = max(max_running, running)
+        try:
+            return verify_and_update(*args, **kwargs)
+        finally:
+            with lock:
+                running -= 1
+
+    monkeypatch.setattr(security.pwd_context, "verify_and_update", tracking_verify_and_update)
+
+    async def run_burst():
+        return threading.get_ident(), await asyncio.gather(*[
+            verify_and_update_password("password", hashed_password) for _ in range(burst_size)
+        ])
+
+    loop_thread, results = asyncio.run(run_burst())
+
+    assert all(valid for valid, _ in results)
+    assert loop_thread not in threads
+    assert max_running <= settings.PASSWORD_HASH_CONCURRENCY
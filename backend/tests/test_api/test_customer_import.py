@@ -0,0 +1,119 @@
+# tests/test_api/test_customer_import.py
+import io
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from app.db.models import Customer, Task
+from app.services import customer_import
+
+def _row(i, **overrides):
+    row = {
+        "name": f"顧客{i}",
+        "address": f"東京都千代田区丸の内{i}-1",
+        "property_address": f"滋賀県東近江市佐野町{i}",
+    }
+    row.update(overrides)
+    return row
+
+def test_batch_reports_each_row(client, db):
+    client.post("/api/v1/customers/", json=_row(1))
+
+    response = client.post("/api/v1/customers/batch", json={"customers": [
+        # 画面から送られる形式（任意項目は空文字）
+        _row(2, assigned_to="", next_contact_date="", email="", status="new", source="受付台帳"),
+        # 既存の顧客と全角・空白の違いだけ
+        _row(1, name="顧客 1", address="東京都千代田区丸の内１－１"),
+        _row(2),
+        {"name": "住所なし"},
+        _row(3, email="not-an-email"),
+    ]})
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total"], report["created"], report["duplicates"], report["invalid"]) == (5, 1, 2, 2)
+    rows = report["rows"]
+    assert [row["status"] for row in rows] == ["created", "duplicate", "duplicate", "invalid", "invalid"]
+    existing_id = db.query(Customer.id).filter(Customer.name == "顧客1").scalar()
+    assert rows[1]["customer_id"] == existing_id
+    assert rows[2]["duplicate_of_row"] == 1
+    assert any(error.startswith("address") for error in rows[3]["errors"])
+    assert any(error.startswith("email") for error in rows[4]["errors"])
+
+    created = db.get(Customer, rows[0]["customer_id"])
+    assert created.assigned_to is None
+    assert created.source == "受付台帳"
+    assert created.normalized_address == "東京都千代田区丸の内2-1"
+
+def test_batch_dry_run_does_not_insert(client, db):
+    response = client.post("/api/v1/customers/batch?dry_run=true", json={"customers": [_row(1), _row(1)]})
+
+    assert response.json()["dry_run"] is True
+    assert [row["status"] for row in response.json()["rows"]] == ["created", "duplicate"]
+    assert db.query(Customer).count() == 0
+
+def test_import_from_task_output(client, db, tmp_path):
+    final_output = tmp_path / "final_output_task-import.csv"
+    pd.DataFrame([
+        {"PDFファイル": "a.pdf", "氏名": "山田太郎", "所有者住所": "東京都千代田区1-1", "不動産所在地": "滋賀県東近江市佐野町801", "郵便番号": "100-0001"},
+        {"PDFファイル": "b.pdf", "氏名": "山田花子", "所有者住所": "東京都千代田区1-1", "不動産所在地": "滋賀県東近江市佐野町802", "郵便番号": None},
+    ]).to_csv(final_output, index=False, encoding="utf-8-sig")
+    db.add(Task(task_id="task-import", task_type="pdf_processing", status="completed",
+                result={"output_files": {"final_output": str(final_output)}}))
+    db.commit()
+
+    response = client.post("/api/v1/customers/import", data={"task_id": "task-import"})
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+    customer = db.query(Customer).filter(Customer.name == "山田太郎").one()
+    assert (customer.postal_code, customer.source) == ("100-0001", "受付台帳")
+
+    # 同じ出力を再度取り込んでも増えない
+    assert client.post("/api/v1/customers/import", data={"task_id": "task-import"}).json()["duplicates"] == 2
+
+def test_import_from_uploaded_csv(client, db):
+    csv_body = "name,address,property_address,assigned_to\n顧客1,東京都1,滋賀県1,1\n,東京都2,滋賀県2,\n"
+
+    response = client.post(
+        "/api/v1/customers/import",
+        files={"file": ("customers.csv", io.BytesIO(csv_body.encode("utf-8-sig")), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    assert [row["status"] for row in response.json()["rows"]] == ["created", "invalid"]
+    assert db.query(Customer).one().assigned_to == 1
+
+def test_import_requires_exactly_one_source(client, db):
+    assert client.post("/api/v1/customers/import").status_code == 400
+    assert client.post("/api/v1/customers/import", data={"task_id": "missing"}).status_code == 404
+
+    db.add(Task(task_id="task-running", task_type="pdf_processing", status="processing"))
+    db.commit()
+    assert client.post("/api/v1/customers/import", data={"task_id": "task-running"}).status_code == 409
+
+def test_cli_imports_csv(db, tmp_path, monkeypatch, capsys):
+    from tests.conftest import TestingSessionLocal
+
+    path = tmp_path / "customers.csv"
+    pd.DataFrame([_row(1), _row(2)]).to_csv(path, index=False)
+    monkeypatch.setattr(customer_import, "SessionLocal", TestingSessionLocal)
+
+    customer_import.main(["--csv", str(path)])
+
+    assert json.loads(capsys.readouterr().out)["created"] == 2
+    assert db.query(Customer).count() == 2
+
+def test_import_10k_rows_in_batches(db):
+    records = [_row(i) for i in range(10000)]
+
+    started = time.perf_counter()
+    report = customer_import.import_customers(db, records)
+    db.commit()
+    elapsed = time.perf_counter() - started
+
+    assert report.created == 10000
+    assert db.query(Customer).count() == 10000
+    assert elapsed < 10
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.db import database
+from app.db.database import MeteredQueuePool
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+def test_engines_use_pool_settings():
+    for engine, size in (
+        (database.engine, settings.DB_POOL_SIZE),
+        (database.worker_engine, settings.DB_WORKER_POOL_SIZE),
+    ):
+        assert isinstance(engine.pool, MeteredQueuePool)
+        assert engine.pool.size() == size
+        assert engine.pool.timeout() == settings.DB_POOL_TIMEOUT
+        assert engine.pool._recycle == settings.DB_POOL_RECYCLE
+        assert engine.pool._pre_ping is settings.DB_POOL_PRE_PING
+    # バックグラウンド処理は API とは別のプールから接続を取り出す
+    assert database.worker_engine.pool is not database.engine.pool
+
+def test_pool_metrics_track_saturation_and_timeouts(pooled_engine):
+    connection = pooled_engine.connect()
+    metrics = pooled_engine.pool.metrics()
+    assert metrics["checked_out"] == 1
+    assert metrics["saturation"] == 1.0
+
+    with pytest.raises(PoolTimeoutError):
+        pooled_engine.connect()
+
+    connection.close()
+    metrics = pooled_engine.pool.metrics()
+    assert metrics["checked_out"] == 0
+    assert metrics["saturation"] == 0.0
+    assert metrics["checkouts"] == 2
+    assert metrics["timeouts"] == 1
+    # タイムアウトした取り出しは pool_timeout まで待っている
+    assert metrics["wait_seconds_max"] >= 0.05
+
+def test_db_pool_endpoint(client):
+    response = client.get("/health/db-pool")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"api", "worker"}
+    assert body["api"]["size"] == settings.DB_POOL_SIZE
+    assert body["worker"]["size"] == settings.DB_WORKER_POOL_SIZE
@@ -1,5 +1,7 @@
 # tests/test_api/test_documents.py
 from fastapi.testclient import TestClient
+import hashlib
+import io
 import pytest
 import os
 from unittest.mock import patch
@@ -79,4 +81,207 @@ def test_process_document(mock_process, client, db):
     finally:
         # テストファイルを削除
         if os.path.exists(test_file_path):
-            os.remove(test_file_path)
\ No newline at end of file
+            os.remove(test_file_path)
+
+@pytest.fixture
+def uploader(client, tmp_path, monkeypatch):
+    """
+    OUTPUT_DIR を一時ディレクトリにし、DB に存在するユーザーとしてアップロードする。
+    """
+    from app.core.security import get_current_active_user
+    from app.main import app
+    from app.schemas.auth import UserPrincipal
+
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    app.dependency_overrides[get_current_active_user] = lambda: UserPrincipal(
+        id=1, email="test@example.com", role="admin", status="active"
+    )
+
+    def upload(content, filename="ledger.pdf"):
+        return client.post(
+            "/api/v1/documents/upload",
+            data={"document_type": "registry_ledger"},
+            files={"file": (filename, io.BytesIO(content), "application/pdf")},
+        )
+    return upload
+
+def test_duplicate_upload_returns_existing_document(uploader, db, tmp_path):
+    from app.db.models import Document
+
+    first = uploader(b"same ledger", filename="first.pdf")
+    second = uploader(b"same ledger", filename="retry.pdf")
+    other = uploader(b"other ledger")
+
+    assert first.status_code == second.status_code == other.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert other.json()["id"] != first.json()["id"]
+    assert first.json()["content_hash"] == hashlib.sha256(b"same ledger").hexdigest()
+    assert db.query(Document).count() == 2
+
+    # 内容のハッシュで保存されるため、同じ内容のファイルは 1 つだけ
+    stored = [name for _, _, names in os.walk(tmp_path / "objects") for name in names]
+    assert len(stored) == 2
+
+@patch("app.api.routes.documents.process_document_task")
+def test_process_returns_previous_result_unless_forced(mock_process, uploader, client, db):
+    from app.db.models import Task
+
+    document_id = uploader(b"processed ledger").json()["id"]
+    db.add(Task(
+        task_id="previous-task",
+        task_type="pdf_processing",
+        status="completed",
+        document_id=document_id,
+        result={"task_id": "previous-task", "pdf_count": 3, "owner_count": 2},
+    ))
+    db.commit()
+
+    # 再アップロードされた台帳の処理要求は前回の結果をすぐに返す
+    duplicate_id = uploader(b"processed ledger").json()["id"]
+    response = client.post(f"/api/v1/documents/{duplicate_id}/process")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["task_id"] == "previous-task"
+    assert data["status"] == "completed"
+    assert data["result"]["pdf_count"] == 3
+    mock_process.assert_not_called()
+
+    # force=true で再処理する
+    response = client.post(f"/api/v1/documents/{duplicate_id}/process?force=true")
+    assert response.status_code == 200
+    assert response.json()["status"] == "queued"
+    assert response.json()["task_id"] != "previous-task"
+    mock_process.assert_called_once()
+    assert db.query(Task).filter(Task.document_id == document_id).count() == 2
+
+@patch("app.api.routes.documents.process_document_task")
+def test_process_coalesces_in_flight_requests(mock_process, uploader, client, db):
+    from app.db.models import Task
+
+    document_id = uploader(b"in-flight ledger").json()["id"]
+
+    first = client.post(f"/api/v1/documents/{document_id}/process")
+    second = client.post(f"/api/v1/documents/{document_id}/process?force=true")
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["task_id"] == first.json()["task_id"]
+    assert db.query(Task).filter(Task.document_id == document_id).count() == 1
+    mock_process.assert_called_once()
+
+@patch("app.api.routes.documents.process_document_task")
+def test_process_with_idempotency_key(mock_process, uploader, client, db):
+    from app.db.models import Task
+
+    document_id = uploader(b"idempotent ledger").json()["id"]
+    other_id = uploader(b"another ledger").json()["id"]
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = client.post(f"/api/v1/documents/{document_id}/process", headers=headers)
+    task_id = first.json()["task_id"]
+    # 完了後の再送でも同じタスクを返す
+    db.query(Task).filter(Task.task_id == task_id).update({"status": "completed"})
+    db.commit()
+    retry = client.post(f"/api/v1/documents/{document_id}/process?force=true", headers=headers)
+
+    assert retry.status_code == 200
+    assert retry.json()["task_id"] == task_id
+    mock_process.assert_called_once()
+
+    # 別の文書に同じキーは使えない
+    conflict = client.post(f"/api/v1/documents/{other_id}/process", headers=headers)
+    assert conflict.status_code == 422
+
+def test_in_flight_unique_index_rejects_second_task(db):
+    from sqlalchemy.exc import IntegrityError
+    from app.db.models import Document, Task
+
+    document = Document(file_name="a.pdf", file_path="a.pdf", document_type="registry_ledger", uploaded_by=1)
+    db.add(document)
+    db.commit()
+
+    db.add(Task(task_id="in-flight-1", task_type="pdf_processing", status="processing", document_id=document.id))
+    db.commit()
+    db.add(Task(task_id="in-flight-2", task_type="pdf_processing", status="queued", document_id=document.id))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+    # 完了したタスクは制約の対象外
+    db.add(Task(task_id="done-1", task_type="pdf_processing", status="completed", document_id=document.id))
+    db.commit()
+
+@patch("app.api.routes.documents.process_document_task")
+def test_stale_in_flight_task_is_replaced(mock_process, uploader, client, db):
+    from datetime import datetime, timedelta
+    from app.db.models import Task
+
+    document_id = uploader(b"stale ledger").json()["id"]
+    db.add(Task(
+        task_id="stale-task",
+        task_type="pdf_processing",
+        status="processing",
+        document_id=document_id,
+        updated_at=datetime.utcnow() - timedelta(days=1),
+    ))
+    db.commit()
+
+    response = client.post(f"/api/v1/documents/{document_id}/process")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "queued"
+    assert db.query(Task).filter(Task.task_id == "stale-task").one().status == "failed"
+    mock_process.assert_called_once()
+
+def test_heartbeat_keeps_running_task_fresh(monkeypatch, db):
+    from datetime import datetime, timedelta
+    from app.api.routes import documents
+    from app.db.models import Task
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(documents, "WorkerSessionLocal", TestingSessionLocal)
+    stale_since = datetime.utcnow() - timedelta(days=1)
+    db.add(Task(task_id="heartbeat-task", task_type="pdf_processing", status="processing", updated_at=stale_since))
+    db.commit()
+    task = db.query(Task).filter(Task.task_id == "heartbeat-task").one()
+    assert documents._is_stale(db, task)
+
+    documents._touch_task("heartbeat-task")
+
+    db.refresh(task)
+    assert task.updated_at > stale_since
+    assert not documents._is_stale(db, task)
+
+def test_get_documents_with_cursor_on_same_upload_date(client, db):
+    from datetime import datetime
+    from app.db.models import Document
+
+    # 同じアップロード日時のドキュメントを5件作成
+    upload_date = datetime(2024, 1, 1, 12, 0, 0)
+    documents = [
+        Document(
+            file_name=f"same_{i}.pdf",
+            file_path=f"/tmp/same_{i}.pdf",
+            document_type="pdf",
+            upload_date=upload_date,
+            uploaded_by=1,
+        )
+        for i in range(5)
+    ]
+    db.add_all(documents)
+    db.commit()
+    expected = sorted((document.id for document in documents), reverse=True)
+
+    # limit=2 で最後のページまでたどる
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/api/v1/documents/", params=params)
+        assert response.status_code == 200
+        seen.extend(document["id"] for document in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    # 同じ日時でも id で順序が決まり、重複も抜けもない
+    assert seen == expected
+
@@ -0,0 +1,161 @@
+# tests/test_api/test_duplicates.py
+import random
+import time
+from datetime import date
+
+import pytest
+
+from app.api.routes import duplicates
+from app.core.security import get_current_active_user
+from app.main import app
+from app.schemas.auth import UserPrincipal
+from app.db.models import Customer, CustomerActivity, DuplicateCandidate, Owner, Ownership, Property, Task
+from app.services import dedupe
+from tests.conftest import TestingSessionLocal
+
+@pytest.fixture(autouse=True)
+def background_session(monkeypatch):
+    # バックグラウンドのスキャンもテスト用 DB を使う
+    monkeypatch.setattr(duplicates, "WorkerSessionLocal", TestingSessionLocal)
+
+@pytest.fixture
+def staff_client(client):
+    # conftest の test_user は最初のテスト以外では DB に存在しないため、プリンシパルを直接渡す
+    app.dependency_overrides[get_current_active_user] = lambda: UserPrincipal(
+        id=1, email="test@example.com", role="admin", status="active"
+    )
+    return client
+
+def _customer(db, name, address, postal_code=None, **fields):
+    customer = Customer(name=name, address=address, property_address="滋賀県東近江市佐野町801",
+                        postal_code=postal_code, **fields)
+    db.add(customer)
+    db.flush()
+    return customer
+
+def test_canonical_address_unifies_notation():
+    assert dedupe.canonical_address("東京都千代田区丸の内三丁目4番地5号") == "東京都千代田区丸の内3-4-5"
+    assert dedupe.canonical_address("東京都千代田区丸の内３－４－５") == "東京都千代田区丸の内3-4-5"
+    assert dedupe.canonical_address("東京都千代田区丸の内二十一丁目4番5") == "東京都千代田区丸の内21-4-5"
+    assert dedupe.canonical_name("ヤマダ　タロウ") == dedupe.canonical_name("やまだたろう")
+
+def test_blocking_key_prefers_postal_code():
+    assert dedupe.blocking_key("100-0005", "東京都千代田区丸の内1") == "zip:1000005"
+    assert dedupe.blocking_key(None, "東京都千代田区丸の内1") == "city:千代田区"
+    assert dedupe.blocking_key("", "不明") is None
+
+def test_find_duplicates_within_blocks_only():
+    rows = [
+        (1, "山田太郎", "東京都千代田区丸の内三丁目4番地5号", "100-0005"),
+        (2, "山田 太朗", "東京都千代田区丸の内3-4-5", "1000005"),
+        # 同姓同名でも郵便番号が違えば比較しない
+        (3, "山田太郎", "大阪府大阪市北区梅田1-1", "530-0001"),
+        (4, "佐藤花子", "東京都千代田区丸の内3-4-5", "100-0005"),
+    ]
+
+    pairs = dedupe.find_duplicates(rows)
+
+    assert [(left, right) for left, right, _ in pairs] == [(1, 2)]
+    assert 0.8 <= pairs[0][2] < 1
+
+def test_scan_and_merge_customers(staff_client, db):
+    primary = _customer(db, "山田太郎", "東京都千代田区丸の内三丁目4番地5号", "100-0005")
+    duplicate = _customer(db, "山田 太朗", "東京都千代田区丸の内3-4-5", "100-0005",
+                          phone_number="03-0000-0000")
+    _customer(db, "佐藤花子", "東京都千代田区丸の内3-4-5", "100-0005")
+    db.add(CustomerActivity(customer_id=duplicate.id, activity_date=date(2026, 10, 1),
+                            activity_type="call", description="架電", created_by=1))
+    db.commit()
+
+    response = staff_client.post("/api/v1/duplicates/scan", params={"entity_type": "customer"})
+    assert response.status_code == 200
+    task = db.query(Task).filter(Task.task_id == response.json()["task_id"]).one()
+    db.refresh(task)
+    assert task.status == "completed"
+    assert task.result == {"rows": 3, "candidates": 1}
+
+    candidates = staff_client.get("/api/v1/duplicates/", params={"entity_type": "customer"}).json()
+    assert len(candidates) == 1
+    assert (candidates[0]["primary"]["id"], candidates[0]["duplicate"]["id"]) == (primary.id, duplicate.id)
+
+    merged = staff_client.post(f"/api/v1/duplicates/{candidates[0]['id']}/merge")
+    assert merged.status_code == 200
+    assert merged.json()["status"] == "merged"
+    db.expire_all()
+    assert db.get(Customer, duplicate.id) is None
+    assert db.get(Customer, primary.id).phone_number == "03-0000-0000"
+    assert db.query(CustomerActivity).one().customer_id == primary.id
+
+    # 統合済みの候補は再度統合できない
+    assert staff_client.post(f"/api/v1/duplicates/{candidates[0]['id']}/merge").status_code == 409
+
+def test_dismissed_pairs_are_not_proposed_again(staff_client, db):
+    _customer(db, "山田太郎", "東京都千代田区丸の内3-4-5", "100-0005")
+    _customer(db, "山田太朗", "東京都千代田区丸の内3-4-5", "100-0005")
+    db.commit()
+    dedupe.scan_duplicates(db, "customer")
+    db.commit()
+    candidate = db.query(DuplicateCandidate).one()
+
+    assert staff_client.post(f"/api/v1/duplicates/{candidate.id}/dismiss").json()["status"] == "dismissed"
+    assert dedupe.scan_duplicates(db, "customer")["candidates"] == 0
+
+def test_merge_owners_moves_ownerships(staff_client, db):
+    primary = Owner(name="山田太郎", address="東京都千代田区丸の内3-4-5", postal_code="100-0005")
+    duplicate = Owner(name="山田　太郎", address="東京都千代田区丸の内三丁目4番5号", postal_code="100-0005")
+    shared = Property(property_address="滋賀県東近江市佐野町801", registry_office="大津", property_type="land")
+    other = Property(property_address="滋賀県東近江市佐野町802", registry_office="大津", property_type="land")
+    db.add_all([primary, duplicate, shared, other])
+    db.flush()
+    db.add_all([
+        Ownership(property_id=shared.id, owner_id=primary.id),
+        Ownership(property_id=shared.id, owner_id=duplicate.id),
+        Ownership(property_id=other.id, owner_id=duplicate.id),
+    ])
+    db.commit()
+
+    dedupe.scan_duplicates(db, "owner")
+    db.commit()
+    candidate = db.query(DuplicateCandidate).one()
+    assert staff_client.post(f"/api/v1/duplicates/{candidate.id}/merge").status_code == 200
+
+    db.expire_all()
+    ownerships = db.query(Ownership).order_by(Ownership.property_id).all()
+    assert [(o.property_id, o.owner_id) for o in ownerships] == [(shared.id, primary.id), (other.id, primary.id)]
+
+def test_large_blocks_use_sorted_neighbourhood(monkeypatch):
+    monkeypatch.setattr(dedupe, "MAX_BLOCK_SIZE", 10)
+    # 郵便番号がなく、同じ町域に 50 人いるブロック
+    rows = [(i, f"住人{i:03d}", f"東京都千代田区丸の内1-{i}", None) for i in range(50)]
+    rows.append((100, "住人007", "東京都千代田区丸の内1-7", None))
+
+    pairs = dedupe.find_duplicates(rows)
+
+    assert (7, 100) in [(left, right) for left, right, _ in pairs]
+
+def test_find_duplicates_scales_with_blocking():
+    random.seed(0)
+    kanji = "山田佐藤鈴木高橋田中伊渡辺村小林加太郎花子一次洋健誠愛翔優美和正明博之幸恵智久"
+    rows = []
+    for i in range(100_000):
+        # 2 割は郵便番号がなく市区町村でブロックする
+        postal_code = None if i % 5 == 0 else f"{random.randint(100, 999)}-{random.randint(0, 9999):04d}"
+        rows.append((
+            i,
+            "".join(random.choices(kanji, k=4)),
+            f"東京都{random.choice(['千代田区', '港区', '新宿区'])}丸の内{i % 50}丁目{i % 13}番{i % 7}号",
+            postal_code,
+        ))
+    # 表記揺れのある重複を 1000 組混ぜる
+    for i in range(1000):
+        _, name, address, postal_code = rows[i * 7]
+        rows.append((100_000 + i, name[:3] + "太", address.replace("丁目", "-"), postal_code))
+
+    started = time.perf_counter()
+    pairs = dedupe.find_duplicates(rows)
+    elapsed = time.perf_counter() - started
+
+    # 比較回数は行数にほぼ比例する（10 万行が数秒なら 100 万行も数分）
+    assert elapsed < 30
+    found = {(left, right) for left, right, _ in pairs}
+    assert sum((i * 7, 100_000 + i) in found for i in range(1000)) >= 900
@@ -0,0 +1,124 @@
+# tests/test_api/test_exports.py
+import csv
+import io
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.models import Customer, Document, ExtractedData
+from app.services.exports import customer_export_query, iter_csv
+
+@pytest.fixture
+def customers(db):
+    for i in range(25):
+        db.add(Customer(
+            name=f"顧客{i:02d}",
+            address="東京都千代田区1-1-1",
+            property_address=f"滋賀県東近江市佐野町{i}",
+            status="new" if i % 2 == 0 else "contacted",
+            assigned_to=1 if i < 10 else None,
+            created_at=datetime(2026, 9, 1 + i),
+        ))
+    db.commit()
+
+@pytest.fixture
+def orm_loads():
+    """
+    ORM オブジェクトとして読み込まれた顧客・リードの数を数える。
+    """
+    loaded = []
+
+    def on_load(target, context):
+        loaded.append(target)
+
+    for model in (Customer, ExtractedData):
+        event.listen(model, "load", on_load)
+    yield loaded
+    for model in (Customer, ExtractedData):
+        event.remove(model, "load", on_load)
+
+def _rows(response):
+    assert response.content.startswith("﻿".encode("utf-8"))
+    return list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+
+def test_export_customers_csv(client, customers, orm_loads):
+    response = client.get("/api/v1/customers/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "customers_" in response.headers["content-disposition"]
+    rows = _rows(response)
+    assert [row["name"] for row in rows] == [f"顧客{i:02d}" for i in range(25)]
+    assert rows[0]["created_at"] == "2026-09-01 00:00:00"
+    assert orm_loads == []
+
+def test_iter_csv_yields_one_chunk_per_batch(db, customers, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 4)
+
+    chunks = list(iter_csv(db, customer_export_query()))
+
+    # 25 行を 4 行ずつ → 7 チャンク（1 チャンク目にヘッダーを含む）
+    assert len(chunks) == 7
+    assert chunks[0].decode("utf-8-sig").count("\r\n") == 5
+    assert chunks[-1].decode("utf-8").count("\r\n") == 1
+
+def test_export_customers_filters(client, customers):
+    response = client.get("/api/v1/customers/export", params={
+        "status": "new",
+        "assigned_to": 1,
+        "date_from": "2026-09-03",
+        "date_to": "2026-09-09",
+    })
+
+    assert response.status_code == 200
+    # 9/3〜9/9 登録（i=2..8）のうち status=new かつ担当者 1 のもの
+    assert [row["name"] for row in _rows(response)] == ["顧客02", "顧客04", "顧客06", "顧客08"]
+
+def test_export_customers_xlsx(client, customers):
+    response = client.get("/api/v1/customers/export", params={"format": "xlsx", "status": "contacted"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd.openxmlformats")
+    sheet = load_workbook(io.BytesIO(response.content), read_only=True).active
+    values = list(sheet.values)
+    assert values[0][:2] == ("id", "name")
+    assert len(values) == 1 + 12
+
+def test_export_rejects_unknown_format(client):
+    assert client.get("/api/v1/customers/export", params={"format": "pdf"}).status_code == 422
+
+def test_export_leads(client, db, orm_loads):
+    document = Document(file_name="a.pdf", file_path="./output/a.pdf", document_type="registry_ledger", uploaded_by=1)
+    db.add(document)
+    db.flush()
+    for i, extracted_at in enumerate([datetime(2026, 8, 31), datetime(2026, 9, 1), datetime(2026, 9, 30, 23)]):
+        db.add(ExtractedData(
+            document_id=document.id,
+            customer_name=f"所有者{i}",
+            prefecture="滋賀県",
+            current_address="滋賀県大津市1",
+            inheritance_address=f"滋賀県東近江市佐野町{i}",
+            extracted_at=extracted_at,
+        ))
+    db.commit()
+
+    response = client.get("/api/v1/reports/leads/export", params={
+        "date_from": "2026-09-01",
+        "date_to": "2026-09-30",
+        "status": "pending",
+        "document_id": document.id,
+    })
+
+    assert response.status_code == 200
+    assert [row["customer_name"] for row in _rows(response)] == ["所有者1", "所有者2"]
+    assert orm_loads == []
+
+def test_export_empty_result_has_header(client):
+    response = client.get("/api/v1/reports/leads/export")
+
+    assert response.status_code == 200
+    assert response.content.decode("utf-8-sig").startswith("id,document_id,customer_name")
+    assert _rows(response) == []
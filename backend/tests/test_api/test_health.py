@@ -0,0 +1,73 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services import health
+
+@pytest.fixture
+def warmups(monkeypatch):
+    calls = []
+    monkeypatch.setattr(health, "_warmups", [("cache", lambda: calls.append("cache"))])
+    health.reset_warmup()
+    yield calls
+    health.reset_warmup()
+
+def test_live(client):
+    response = client.get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+def test_ready(client, warmups):
+    for path in ("/health/ready", "/ready"):
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "status": "ok",
+            "checks": {"database": "ok", "redis": "skipped", "warmup": "ok"},
+        }
+
+def test_startup_runs_warmup_once(warmups):
+    with TestClient(app) as client:
+        assert warmups == ["cache"]
+        client.get("/health/live")
+    assert warmups == ["cache"]
+
+def test_ready_retries_failed_warmup(client, monkeypatch):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("not yet")
+
+    monkeypatch.setattr(health, "_warmups", [("flaky", flaky)])
+    health.reset_warmup()
+    try:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"]["warmup"] == "pending"
+
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert len(attempts) == 2
+    finally:
+        health.reset_warmup()
+
+def test_ready_reports_unreachable_redis(client, warmups, monkeypatch):
+    class UnreachableBroker:
+        def ping(self):
+            raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(settings, "PROGRESS_BROKER", "redis")
+    monkeypatch.setattr(health, "get_progress_broker", lambda: UnreachableBroker())
+
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {
+        "status": "unavailable",
+        "checks": {"database": "ok", "redis": "unavailable", "warmup": "ok"},
+    }
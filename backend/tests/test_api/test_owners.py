@@ -82,4 +82,111 @@ def test_update_owner(client, db):
     from app.db.models import Owner
     owner = db.query(Owner).filter(Owner.id == owner_id).first()
     assert owner is not None
-    assert owner.name == update_data["name"]
\ No newline at end of file
+    assert owner.name == update_data["name"]
+
+def test_get_owners_with_cursor(client, db):
+    # オーナーを3件作成
+    for i in range(3):
+        client.post("/api/v1/owners/", json={
+            "name": f"Owner {i}",
+            "address": "東京都千代田区1-1-1"
+        })
+
+    # 1ページ目（新しい順に2件）
+    response = client.get("/api/v1/owners/", params={"limit": 2})
+    assert response.status_code == 200
+    assert [owner["name"] for owner in response.json()] == ["Owner 2", "Owner 1"]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    # 2ページ目（残り1件、次ページなし）
+    response = client.get("/api/v1/owners/", params={"limit": 2, "cursor": next_cursor})
+    assert response.status_code == 200
+    assert [owner["name"] for owner in response.json()] == ["Owner 0"]
+    assert "X-Next-Cursor" not in response.headers
+
+    # 不正なカーソル
+    response = client.get("/api/v1/owners/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def pipeline_records(count):
+    return [
+        {
+            "PDFファイル": f"./output/{i}.pdf",
+            "氏名": f"所有者 {i}",
+            "所有者住所": f"東京都千代田区丸の内１－{i}",
+            "不動産所在地": f"滋賀県東近江市佐野町{i}",
+            "郵便番号": "100-0005",
+        }
+        for i in range(count)
+    ]
+
+def test_persist_pipeline_results_in_constant_statements(client, db):
+    from sqlalchemy import event
+    from app.db.models import ExtractedData, Owner, Ownership, Property
+    from app.services.persistence import persist_pipeline_results
+    from tests.conftest import engine
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        counts = persist_pipeline_results(db, pipeline_records(1000), registry_office="大津地方法務局")
+        db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    # 所有者 1,000 人でもテーブルごとに 1 文
+    assert len(statements) == 4
+    assert counts == {"owners": 1000, "properties": 1000, "ownerships": 1000, "extracted_data": 1000}
+    assert db.query(Owner).count() == 1000
+    assert db.query(Property).count() == 1000
+    assert db.query(Ownership).count() == 1000
+    assert db.query(ExtractedData).count() == 1000
+
+    extracted = db.query(ExtractedData).filter(ExtractedData.customer_name == "所有者 1").one()
+    assert extracted.prefecture == "東京都"
+    assert extracted.postal_code == "100-0005"
+
+def test_persist_pipeline_results_deduplicates(client, db):
+    from app.db.models import Owner, Ownership, Property
+    from app.services.persistence import persist_pipeline_results
+
+    persist_pipeline_results(db, pipeline_records(3), registry_office="大津地方法務局")
+    db.commit()
+
+    # 全角・半角や空白の違いは同じ所有者・物件として扱う
+    persist_pipeline_results(db, [
+        {
+            "氏名": "所有者　1",
+            "所有者住所": "東京都千代田区丸の内1-1",
+            "不動産所在地": "滋賀県東近江市佐野町１",
+            "郵便番号": None,
+        },
+        # 丁目・番地の表記が違っても同じ住所として扱う
+        {
+            "氏名": "所有者 2",
+            "所有者住所": "東京都千代田区丸の内一丁目2番",
+            "不動産所在地": "滋賀県東近江市大字佐野町2番地",
+            "郵便番号": None,
+        },
+    ], registry_office="大津地方法務局")
+    db.commit()
+
+    assert db.query(Owner).count() == 3
+    assert db.query(Property).count() == 3
+    assert db.query(Ownership).count() == 3
+    owner = db.query(Owner).filter(Owner.normalized_name == "所有者1").one()
+    assert owner.postal_code == "100-0005"
+
+    # 別の登記所の同じ所在地は別の物件
+    persist_pipeline_results(db, pipeline_records(1), registry_office="東京法務局")
+    db.commit()
+    assert db.query(Property).count() == 4
+
+    response = client.get("/api/v1/owners/")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
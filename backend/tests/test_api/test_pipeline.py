@@ -0,0 +1,135 @@
+# tests/test_api/test_pipeline.py
+import pandas as pd
+import pytest
+
+from app.services import pdf_processing
+from app.services.merge_data import merge_data, merge_frames
+
+OWNERS = pd.DataFrame([
+    {"PDFファイル": "a.pdf", "氏名": "山田太郎", "所有者住所": "東京都千代田区丸の内1-1", "不動産所在地": "滋賀県東近江市佐野町801"},
+    {"PDFファイル": "b.pdf", "氏名": "山田花子", "所有者住所": "東京都千代田区丸の内1-1", "不動産所在地": "滋賀県東近江市佐野町802"},
+    {"PDFファイル": "c.pdf", "氏名": "佐藤一郎", "所有者住所": "住所不明", "不動産所在地": "滋賀県東近江市八日市町1"},
+])
+
+@pytest.fixture
+def fake_stages(monkeypatch, tmp_path):
+    """
+    外部サービスを呼ぶステージを置き換える。
+    """
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_processing, "download_ledger", lambda ledger_pdf, on_progress=None, run_key=None: {
+        "ledger": ledger_pdf,
+        "registry_office": "大津地方法務局",
+        "downloads": [{"address": f"addr-{i}", "pdf_path": name} for i, name in enumerate(OWNERS["PDFファイル"])],
+    })
+    monkeypatch.setattr(pdf_processing, "extract_owner_info", lambda pdf_paths, on_progress=None: OWNERS.copy())
+    zipcodes = {"東京都千代田区丸の内1-1": "100-0005"}
+    monkeypatch.setattr(pdf_processing, "get_zipcode", lambda address: zipcodes.get(address))
+    return tmp_path
+
+def test_merge_frames_matches_pandas_merge():
+    df_zip = pd.DataFrame([{"所有者住所": "東京都千代田区丸の内1-1", "郵便番号": "100-0005"}])
+
+    expected = pd.merge(OWNERS, df_zip, on="所有者住所", how="left")
+    pd.testing.assert_frame_equal(merge_frames(OWNERS, df_zip), expected)
+    pd.testing.assert_frame_equal(merge_frames(OWNERS, {"東京都千代田区丸の内1-1": "100-0005"}), expected)
+
+def test_merge_data_keeps_file_interface(tmp_path):
+    OWNERS.to_csv(tmp_path / "owner.csv", index=False, encoding="utf-8-sig")
+    pd.DataFrame([{"所有者住所": "住所不明", "郵便番号": "999-9999"}]).to_csv(tmp_path / "zip.csv", index=False)
+
+    merged = merge_data(str(tmp_path / "owner.csv"), str(tmp_path / "zip.csv"), str(tmp_path / "final.csv"))
+
+    assert merged["郵便番号"].tolist()[2] == "999-9999"
+    assert (tmp_path / "final.csv").exists()
+
+def test_run_pipeline_hands_off_frames_in_memory(fake_stages, monkeypatch):
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("stages must not re-read their own output")
+
+    monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+    result = pdf_processing.run_pipeline("ledger.pdf", "task-memory")
+    monkeypatch.undo()
+
+    assert result["pdf_count"] == 3
+    assert result["owner_count"] == 3
+    final = pd.read_csv(result["output_files"]["final_output"], encoding="utf-8-sig", dtype=str)
+    assert final["郵便番号"].tolist()[:2] == ["100-0005", "100-0005"]
+    assert pd.isna(final["郵便番号"].tolist()[2])
+    zipcodes = pd.read_csv(result["output_files"]["zipcode_info"], encoding="utf-8-sig")
+    assert len(zipcodes) == 2
+
+def test_run_pipeline_with_no_owners(fake_stages, monkeypatch):
+    monkeypatch.setattr(
+        pdf_processing, "extract_owner_info",
+        lambda pdf_paths, on_progress=None: pd.DataFrame([], columns=pdf_processing.OWNER_COLUMNS),
+    )
+
+    result = pdf_processing.run_pipeline("ledger.pdf", "task-empty")
+
+    assert result["owner_count"] == 0
+    final = pd.read_csv(result["output_files"]["final_output"], encoding="utf-8-sig")
+    assert list(final.columns) == pdf_processing.OWNER_COLUMNS + ["郵便番号"]
+
+def test_run_pipeline_writes_typed_parquet(fake_stages):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    result = pdf_processing.run_pipeline("ledger.pdf", "task-parquet", output_format="parquet")
+
+    final_path = result["output_files"]["final_output"]
+    assert final_path.endswith("final_output_task-parquet.parquet")
+    parquet_file = pq.ParquetFile(final_path)
+    assert parquet_file.schema_arrow.field("郵便番号").type == "string"
+    assert parquet_file.metadata.row_group(0).column(0).compression == "ZSTD"
+    assert pd.read_parquet(final_path)["郵便番号"].tolist() == ["100-0005", "100-0005", None]
+
+def test_run_pipeline_appends_partitioned_dataset(fake_stages):
+    pytest.importorskip("pyarrow")
+    from app.services.columnar import read_dataset
+
+    pdf_processing.run_pipeline("ledger.pdf", "task-a", output_format="parquet")
+    pdf_processing.run_pipeline("ledger.pdf", "task-b", output_format="parquet")
+    # 同じタスクの再実行は自分のファイルを上書きする
+    result = pdf_processing.run_pipeline("ledger.pdf", "task-b", output_format="parquet")
+
+    partitions = list((fake_stages / "dataset").glob("month=*/registry_office=*"))
+    assert len(partitions) == 1
+    assert len(list(partitions[0].glob("*.parquet"))) == 2
+    assert result["output_files"]["dataset"] == str(fake_stages / "dataset")
+
+    month = partitions[0].parent.name.split("=", 1)[1]
+    leads = read_dataset(str(fake_stages), months=[month], registry_offices=["大津地方法務局"], columns=["氏名", "郵便番号"])
+    assert list(leads.columns) == ["氏名", "郵便番号"]
+    assert len(leads) == 6
+    assert read_dataset(str(fake_stages), registry_offices=["京都地方法務局"]).empty
+
+def test_rerun_in_another_month_replaces_dataset_rows(fake_stages):
+    pytest.importorskip("pyarrow")
+    from datetime import datetime
+    from app.services.columnar import append_to_dataset, read_dataset
+
+    append_to_dataset(OWNERS, str(fake_stages), "大津地方法務局", task_id="task-a", processed_at=datetime(2024, 1, 31))
+    append_to_dataset(OWNERS, str(fake_stages), "大津地方法務局", task_id="task-b", processed_at=datetime(2024, 1, 31))
+    # 翌月に別の登記所名で再実行しても、前回の行は残らない
+    append_to_dataset(OWNERS, str(fake_stages), "京都地方法務局", task_id="task-a", processed_at=datetime(2024, 2, 1))
+
+    dataset = read_dataset(str(fake_stages), columns=["task_id", "month", "registry_office"])
+    assert len(dataset) == 6
+    counts = dataset.groupby(["task_id", "month", "registry_office"]).size().to_dict()
+    assert counts == {("task-a", "2024-02", "京都地方法務局"): 3, ("task-b", "2024-01", "大津地方法務局"): 3}
+
+def test_merge_data_reads_and_writes_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    from app.services.columnar import write_parquet
+
+    owner_path = write_parquet(OWNERS, str(tmp_path / "owner.parquet"))
+    zip_path = write_parquet(pd.DataFrame([{"所有者住所": "住所不明", "郵便番号": "0010001"}]), str(tmp_path / "zip.parquet"))
+
+    merge_data(owner_path, zip_path, str(tmp_path / "final.parquet"), output_format="parquet")
+
+    assert pd.read_parquet(tmp_path / "final.parquet")["郵便番号"].tolist()[2] == "0010001"
+
+def test_unknown_output_format_is_rejected(fake_stages):
+    with pytest.raises(ValueError):
+        pdf_processing.run_pipeline("ledger.pdf", "task-x", output_format="xlsx")
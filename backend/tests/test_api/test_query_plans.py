@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+import re
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.sql import CompoundSelect, Select
+
+from app.db.models import Customer, CustomerActivity, Task
+from app.services.dashboard import invalidate_dashboard_cache
+from tests.conftest import engine
+
+# インデックスなしで全件走査されてはいけないテーブル
+HOT_TABLES = ["documents", "tasks", "customers", "customer_activities", "error_reports"]
+
+@contextmanager
+def captured_selects():
+    """
+    エンドポイントが発行した SELECT 文を収集する。
+    """
+    statements = []
+
+    def before_execute(conn, clauseelement, multiparams, params, execution_options):
+        if isinstance(clauseelement, (Select, CompoundSelect)):
+            statements.append(clauseelement)
+
+    event.listen(engine, "before_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_execute", before_execute)
+
+def explain(statements):
+    """
+    収集した SELECT 文の実行計画 (EXPLAIN QUERY PLAN) を返す。
+    本番の psycopg2 と同様にパラメータはリテラルとして埋め込む。
+    """
+    details = []
+    with engine.connect() as conn:
+        for statement in statements:
+            sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            details.extend(row[3] for row in rows)
+    return details
+
+def assert_no_full_scan(details):
+    for detail in details:
+        for table in HOT_TABLES:
+            assert not re.fullmatch(rf"SCAN {table}", detail), f"full table scan: {detail}"
+
+@pytest.mark.parametrize("path, expected_indexes", [
+    ("/api/v1/reports/dashboard", [
+        "ix_documents_upload_date",
+        "ix_tasks_start_time",
+        "ix_tasks_status_start_time",
+        "ix_customers_status",
+        "ix_error_reports_open",
+    ]),
+    ("/api/v1/reports/customers/status", ["ix_customers_status"]),
+    ("/api/v1/reports/tasks/status", ["ix_tasks_status_start_time"]),
+])
+def test_report_queries_use_indexes(client, db, path, expected_indexes):
+    invalidate_dashboard_cache()
+    with captured_selects() as statements:
+        response = client.get(path)
+    assert response.status_code == 200
+
+    details = explain(statements)
+    assert_no_full_scan(details)
+    for index_name in expected_indexes:
+        assert any(index_name in detail for detail in details), f"{index_name} not used by {path}"
+
+def test_task_lookup_uses_unique_index(client, db):
+    db.add(Task(task_id="plan-task", task_type="pdf_processing", status="queued"))
+    db.commit()
+
+    with captured_selects() as statements:
+        response = client.get("/api/v1/tasks/plan-task")
+    assert response.status_code == 200
+
+    details = explain(statements)
+    assert_no_full_scan(details)
+    assert any("USING INDEX" in detail and "task_id=?" in detail for detail in details)
+
+def test_customer_activities_use_composite_index(client, db):
+    customer = Customer(name="Plan Customer", address="東京都千代田区1-1-1", property_address="東京都千代田区1-1-1")
+    db.add(customer)
+    db.commit()
+
+    with captured_selects() as statements:
+        response = client.get(f"/api/v1/customers/{customer.id}/activities")
+    assert response.status_code == 200
+
+    details = explain(statements)
+    assert_no_full_scan(details)
+    assert any("ix_customer_activities_customer_id_activity_date" in detail for detail in details)
@@ -0,0 +1,86 @@
+# tests/test_api/test_registry.py
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from app.api.routes.registry import download_registry_pdfs_task
+from app.db.models import Document, Property
+from app.api.routes import registry
+from tests.conftest import engine, TestingSessionLocal
+
+MANIFEST = {
+    "ledger": "./output/objects/ab/ledger.pdf",
+    "registry_office": "大津地方法務局",
+    "downloads": [
+        {"address": "滋賀県東近江市佐野町801", "pdf_path": "./output/滋賀県東近江市佐野町801.pdf"},
+        {"address": "滋賀県東近江市佐野町802", "pdf_path": "./output/滋賀県東近江市佐野町802.pdf"},
+        {"address": "滋賀県東近江市八日市町1-2", "pdf_path": "./output/滋賀県東近江市八日市町1-2.pdf"},
+    ],
+}
+
+@patch("app.services.auto_mode.download_ledger", return_value=MANIFEST)
+def test_download_task_inserts_properties_from_manifest(mock_download, db, monkeypatch):
+    monkeypatch.setattr(registry, "WorkerSessionLocal", TestingSessionLocal)
+    document = Document(file_name="ledger.pdf", file_path=MANIFEST["ledger"], document_type="registry_ledger", uploaded_by=1)
+    db.add(document)
+    db.commit()
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        download_registry_pdfs_task(MANIFEST["ledger"], document.id)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    # 物件は 1 つの文でまとめて登録する
+    assert len(statements) == 1
+    properties = db.query(Property).order_by(Property.property_address).all()
+    assert [p.property_address for p in properties] == sorted(entry["address"] for entry in MANIFEST["downloads"])
+    assert {p.registry_office for p in properties} == {"大津地方法務局"}
+
+    db.refresh(document)
+    assert document.processing_status == "completed"
+
+    # 同じ台帳を再処理しても物件は増えない
+    download_registry_pdfs_task(MANIFEST["ledger"], document.id)
+    assert db.query(Property).count() == 3
+
+def test_manifest_is_keyed_by_run_not_shared_ledger(monkeypatch, tmp_path):
+    import contextlib
+    import json
+    from app.services import auto_mode
+
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(auto_mode, "ocr_pdf", lambda pdf_path, on_progress=None: ["text"])
+    monkeypatch.setattr(auto_mode, "extract_registry_office", lambda text_data: "大津地方法務局")
+    monkeypatch.setattr(auto_mode, "extract_addresses", lambda text_data: ["滋賀県東近江市佐野町801"])
+    monkeypatch.setattr(auto_mode, "sync_playwright", contextlib.nullcontext)
+    results = iter([
+        [{"address": "滋賀県東近江市佐野町801", "pdf_path": "first.pdf"}],
+        [{"address": "滋賀県東近江市佐野町801", "pdf_path": "second.pdf"}],
+    ])
+    monkeypatch.setattr(auto_mode, "login_and_download_all", lambda playwright, addresses, on_progress=None: next(results))
+
+    # 同じ内容の台帳（同じファイル）を別々のタスクで処理しても、マニフェストは上書きされない
+    auto_mode.download_ledger(MANIFEST["ledger"], run_key="task-a")
+    auto_mode.download_ledger(MANIFEST["ledger"], run_key="task-b")
+
+    with open(auto_mode.manifest_path_for("task-a"), encoding="utf-8") as f:
+        assert json.load(f)["downloads"][0]["pdf_path"] == "first.pdf"
+    with open(auto_mode.manifest_path_for("task-b"), encoding="utf-8") as f:
+        assert json.load(f)["downloads"][0]["pdf_path"] == "second.pdf"
+
+def test_properties_are_stored_with_normalized_address(db):
+    from app.services.persistence import persist_properties
+
+    # 台帳と登記PDFで表記が違っても同じ物件として登録する
+    ids = persist_properties(db, ["滋賀県東近江市佐野町801番地", "滋賀県東近江市佐野町８０１", "滋賀県東近江市大字佐野町801"], "大津地方法務局")
+    db.commit()
+
+    assert list(ids) == ["滋賀県東近江市佐野町801"]
+    assert [p.property_address for p in db.query(Property).all()] == ["滋賀県東近江市佐野町801"]
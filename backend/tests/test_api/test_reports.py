@@ -0,0 +1,167 @@
+from fastapi.testclient import TestClient
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from app.db.models import Customer, Document, ErrorReport, RegistryRequest, Task
+from app.services.dashboard import invalidate_dashboard_cache
+from app.services.rollups import refresh_rollups
+from tests.conftest import engine
+
+@pytest.fixture
+def query_counter():
+    """
+    発行された SQL 文の数を数える。
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def test_dashboard_uses_single_query(client, db, query_counter):
+    db.add(Document(file_name="a.pdf", file_path="./output/a.pdf", document_type="registry_ledger", uploaded_by=1))
+    db.add(Task(task_id="dash-1", task_type="pdf_processing", status="completed"))
+    db.add(Task(task_id="dash-2", task_type="pdf_processing", status="failed"))
+    db.add(Customer(name="Customer", address="東京都千代田区1-1-1", property_address="東京都千代田区1-1-1"))
+    db.add(ErrorReport(error_type="ocr", error_message="failed", status="open", reported_by=1))
+    db.add(ErrorReport(error_type="ocr", error_message="failed", status="resolved", reported_by=1))
+    db.commit()
+    invalidate_dashboard_cache()
+    query_counter.clear()
+
+    response = client.get("/api/v1/reports/dashboard")
+
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+    data = response.json()
+    assert data["counts"] == {"documents": 1, "customers": 1, "tasks": 2, "errors": 1}
+    assert data["customer_status"] == {"new": 1}
+    assert data["task_status"] == {"completed": 1, "failed": 1}
+    assert [doc["file_name"] for doc in data["recent_documents"]] == ["a.pdf"]
+    assert {task["task_id"] for task in data["recent_tasks"]} == {"dash-1", "dash-2"}
+
+def test_dashboard_cache_invalidated_on_write(client, db, query_counter):
+    invalidate_dashboard_cache()
+    assert client.get("/api/v1/reports/dashboard").json()["counts"]["customers"] == 0
+
+    # 変更がなければキャッシュから返す
+    query_counter.clear()
+    client.get("/api/v1/reports/dashboard")
+    assert query_counter == []
+
+    # 顧客を追加するとキャッシュが破棄される
+    client.post("/api/v1/customers/", json={
+        "name": "New Customer",
+        "address": "東京都千代田区1-1-1",
+        "property_address": "東京都千代田区1-1-1"
+    })
+    assert client.get("/api/v1/reports/dashboard").json()["counts"]["customers"] == 1
+
+def test_monthly_reports_from_rollups(client, db):
+    now = datetime.utcnow()
+    last_month = now - timedelta(days=40)
+    this_key, last_key = now.strftime("%Y-%m"), last_month.strftime("%Y-%m")
+
+    db.add(Document(file_name="a.pdf", file_path="./output/a.pdf", document_type="registry_ledger", upload_date=last_month))
+    db.add(Document(file_name="b.pdf", file_path="./output/b.pdf", document_type="registry_ledger", upload_date=now))
+    db.add(Task(task_id="roll-1", task_type="pdf_processing", status="completed", start_time=now))
+    db.add(Task(task_id="roll-2", task_type="pdf_processing", status="failed", start_time=now))
+    db.add(RegistryRequest(request_type="online", request_date=now.date(), cost=331))
+    db.add(RegistryRequest(request_type="online", request_date=now.date(), cost=331))
+    db.commit()
+
+    response = client.get("/api/v1/reports/documents/monthly")
+    assert response.status_code == 200
+    assert response.json() == {last_key: 1, this_key: 1}
+
+    response = client.get("/api/v1/reports/tasks/monthly")
+    assert response.json() == {this_key: {"completed": 1, "failed": 1}}
+
+    response = client.get("/api/v1/reports/registry/monthly")
+    assert response.json() == {this_key: {"requests": 2, "cost": 662}}
+
+    # 差分更新: 変更された日付のみ再集計される
+    db.add(Document(file_name="c.pdf", file_path="./output/c.pdf", document_type="registry_ledger", upload_date=now))
+    db.commit()
+    refresh_rollups(db)
+
+    response = client.get("/api/v1/reports/documents/monthly")
+    assert response.json() == {last_key: 1, this_key: 2}
+
+def test_refresh_rollups_recomputes_scattered_dirty_days(client, db):
+    from datetime import date
+    from app.db.models import DailyRollup
+    from app.services.rollups import _day_ranges
+
+    assert _day_ranges({date(2024, 1, 3), date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 10)}) == [
+        (date(2024, 1, 1), date(2024, 1, 3)),
+        (date(2024, 1, 10), date(2024, 1, 10)),
+    ]
+
+    now = datetime.utcnow()
+    first, middle, last = now - timedelta(days=20), now - timedelta(days=10), now
+    for upload_date in (first, middle, last):
+        db.add(Document(file_name="a.pdf", file_path="./output/a.pdf", document_type="registry_ledger", upload_date=upload_date))
+    db.commit()
+    refresh_rollups(db, full=True)
+
+    # 離れた2日だけを変更し、間の日の集計は変更しない
+    db.add(Document(file_name="b.pdf", file_path="./output/b.pdf", document_type="registry_ledger", upload_date=first))
+    db.add(Document(file_name="c.pdf", file_path="./output/c.pdf", document_type="registry_ledger", upload_date=last))
+    db.commit()
+    refresh_rollups(db)
+
+    counts = {
+        row.day: row.count
+        for row in db.query(DailyRollup).filter(DailyRollup.metric == "documents")
+    }
+    assert counts == {first.date(): 2, middle.date(): 1, last.date(): 2}
+
+def test_db_now_is_naive():
+    from datetime import timezone
+    from app.db.database import db_now
+
+    class AwareSession:
+        def scalar(self, statement):
+            # PostgreSQL の now() と同様にタイムゾーン付きの値を返す
+            return datetime(2024, 1, 1, 9, 0, tzinfo=timezone(timedelta(hours=9)))
+
+    now = db_now(AwareSession())
+    assert now.tzinfo is None
+    assert now == datetime(2024, 1, 1, 9, 0)
+    assert now - datetime(2024, 1, 1, 8, 0) == timedelta(hours=1)
+
+def test_task_status_report_by_priority(client, db):
+    from datetime import datetime, timedelta
+    from app.db.models import Task
+
+    now = datetime.utcnow()
+    db.add_all([
+        Task(task_id="p-urgent-1", task_type="pdf_processing", status="completed", priority=10,
+             start_time=now - timedelta(minutes=10), end_time=now - timedelta(minutes=9)),
+        Task(task_id="p-urgent-2", task_type="pdf_processing", status="queued", priority=10),
+        Task(task_id="p-bulk-1", task_type="pdf_processing", status="completed", priority=0,
+             start_time=now - timedelta(hours=2), end_time=now - timedelta(hours=1)),
+        Task(task_id="p-bulk-2", task_type="pdf_processing", status="processing", priority=0),
+        Task(task_id="p-old", task_type="pdf_processing", status="completed", priority=0,
+             start_time=now - timedelta(days=3), end_time=now - timedelta(days=3)),
+    ])
+    db.commit()
+
+    response = client.get("/api/v1/reports/tasks/status")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["by_status"] == {"completed": 3, "queued": 1, "processing": 1}
+    assert list(data["by_priority"]) == ["10", "0"]
+    assert data["by_priority"]["10"]["queued"] == 1
+    assert data["by_priority"]["10"]["completed"] == 1
+    assert data["by_priority"]["10"]["avg_duration_seconds"] == 60.0
+    assert data["by_priority"]["0"]["processing"] == 1
+    # 集計期間外のタスクは含めない
+    assert data["by_priority"]["0"]["completed"] == 1
+    assert data["by_priority"]["0"]["throughput_per_hour"] == round(1 / 24, 3)
@@ -0,0 +1,66 @@
+# tests/test_api/test_search.py
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.db.models import Customer, Owner, Property
+
+@pytest.fixture
+def records(db):
+    db.add_all([
+        Customer(name="山田太郎", address="東京都千代田区丸の内1-1", property_address="滋賀県東近江市佐野町801"),
+        Customer(name="佐藤花子", address="大阪府大阪市北区梅田1-1", property_address="東京都港区山田町2-2"),
+        Owner(name="山田", address="京都府京都市左京区1-1"),
+        Owner(name="鈴木一郎", address="北海道札幌市中央区1-1"),
+        Property(property_address="東京都山田市本町3-3", registry_office="東京法務局", property_type="land"),
+    ])
+    db.commit()
+
+def test_search_ranks_results_across_entities(client, records):
+    response = client.get("/api/v1/search/", params={"q": "山田"})
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [(result["entity_type"], result["title"]) for result in results] == [
+        # 完全一致 → 前方一致 → 部分一致の順
+        ("owner", "山田"),
+        ("customer", "山田太郎"),
+        ("customer", "佐藤花子"),
+        ("property", "東京都山田市本町3-3"),
+    ]
+    assert results[0]["score"] > results[1]["score"] > results[2]["score"]
+    assert results[1]["subtitle"] == "東京都千代田区丸の内1-1"
+
+def test_search_filters_types_and_limit(client, records):
+    response = client.get("/api/v1/search/", params={"q": "山田", "types": ["customer", "property"], "limit": 2})
+
+    assert response.status_code == 200
+    assert {result["entity_type"] for result in response.json()} <= {"customer", "property"}
+    assert len(response.json()) == 2
+
+    response = client.get("/api/v1/search/", params={"q": "山田", "types": ["user"]})
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/search/", params={"q": "山"})
+    assert response.status_code == 422
+
+    # 空白だけの検索語は全件一致になるため受け付けない
+    for q in ("  ", " 山 "):
+        response = client.get("/api/v1/search/", params={"q": q})
+        assert response.status_code == 422
+
+def test_search_escapes_like_wildcards(client, records):
+    response = client.get("/api/v1/search/", params={"q": "%%"})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_trigram_indexes_are_postgresql_only(db):
+    indexes = {index.name: index for index in Customer.__table__.indexes}
+
+    ddl = str(CreateIndex(indexes["ix_customers_name_trgm"]).compile(dialect=postgresql.dialect()))
+    assert "USING gin (name gin_trgm_ops)" in ddl
+    # テストの SQLite には作成されない
+    names = {row[1] for row in db.execute(text("PRAGMA index_list('customers')"))}
+    assert "ix_customers_name_trgm" not in names
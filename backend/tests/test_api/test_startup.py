@@ -0,0 +1,60 @@
+# tests/test_api/test_startup.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+# API の起動時には読み込まない重い依存（パイプライン・取り込みの実行時にだけ読み込む）
+HEAVY_MODULES = {
+    "pandas", "pyarrow", "openai", "markitdown", "google.cloud.vision",
+    "pdf2image", "playwright", "holidays", "openpyxl",
+}
+
+# app.main の import にかけてよい時間（-X importtime の累積値、マイクロ秒）
+IMPORT_TIME_BUDGET_US = 2_000_000
+
+def _import_times(module: str):
+    """
+    別プロセスで module を import し、-X importtime の {モジュール名: 累積マイクロ秒} を返す。
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        cwd=backend_dir,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def test_app_startup_does_not_import_heavy_modules():
+    times = _import_times("app.main")
+
+    assert not HEAVY_MODULES & set(times)
+
+@pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS=1 で実行する起動時間の計測")
+def test_app_startup_import_time_budget():
+    times = _import_times("app.main")
+
+    assert times["app.main"] < IMPORT_TIME_BUDGET_US
+
+def test_app_import_does_not_create_tables(tmp_path):
+    # スキーマは Alembic のマイグレーションで作成し、import 時には DB に接続しない
+    database = tmp_path / "startup.db"
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", "import app.main"],
+        cwd=backend_dir,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{database}"},
+        check=True,
+    )
+
+    assert not database.exists()
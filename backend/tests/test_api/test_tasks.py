@@ -0,0 +1,236 @@
+from fastapi.testclient import TestClient
+import pytest
+import threading
+import time
+
+from app.db.models import Task
+from app.services.progress import ProgressBroker, ProgressReporter
+
+def create_task(db, task_id, status, result=None):
+    db_task = Task(task_id=task_id, task_type="pdf_processing", status=status, result=result)
+    db.add(db_task)
+    db.commit()
+    return db_task
+
+def test_read_task_includes_progress(client, db):
+    create_task(db, "task-progress", "processing")
+
+    # パイプラインから進捗を通知
+    reporter = ProgressReporter("task-progress")
+    reporter("download", 2, 4)
+
+    try:
+        response = client.get("/api/v1/tasks/task-progress")
+
+        # レスポンスを検証（download は 5 ステージ中 2 番目）
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "processing"
+        assert data["progress"] == pytest.approx(30.0)
+        assert data["message"] == "download: 2/4"
+    finally:
+        reporter.finish("completed")
+
+def test_read_task_returns_json_result(client, db):
+    # アポストロフィを含む値でもそのまま返せること
+    result = {"task_id": "task-json", "pdf_count": 3, "output_files": {"final_output": "./output/O'Brien.csv"}}
+    create_task(db, "task-json", "completed", result)
+
+    response = client.get("/api/v1/tasks/task-json")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["progress"] == 100.0
+    assert data["result"] == result
+
+def test_filter_tasks_by_result_field(client, db):
+    create_task(db, "task-small", "completed", {"pdf_count": 5, "owner_count": 2})
+    create_task(db, "task-large", "completed", {"pdf_count": 150, "owner_count": 120})
+    create_task(db, "task-queued", "queued")
+
+    response = client.get("/api/v1/tasks/", params={"min_pdf_count": 100})
+
+    assert response.status_code == 200
+    assert [task["task_id"] for task in response.json()] == ["task-large"]
+
+def test_stream_events_for_finished_task(client, db):
+    create_task(db, "task-done", "completed")
+
+    response = client.get("/api/v1/tasks/task-done/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert '"status": "completed"' in response.text
+
+class SubscribeReadyBroker(ProgressBroker):
+    """
+    購読が登録されたことを subscribed で通知するブローカー。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.subscribed = threading.Event()
+
+    def _add_subscriber(self, task_id, entry):
+        super()._add_subscriber(task_id, entry)
+        self.subscribed.set()
+
+def test_stream_events_until_completed(client, db, monkeypatch):
+    from app.api.routes import tasks
+
+    create_task(db, "task-live", "processing")
+    broker = SubscribeReadyBroker()
+    monkeypatch.setattr(tasks, "get_progress_broker", lambda: broker)
+    reporter = ProgressReporter("task-live", broker=broker)
+
+    def run_pipeline_stub():
+        # 購読が始まってから進捗を通知
+        assert broker.subscribed.wait(timeout=10)
+        reporter("ocr", 1, 2)
+        reporter.finish("completed")
+
+    worker = threading.Thread(target=run_pipeline_stub)
+    worker.start()
+    try:
+        with client.stream("GET", "/api/v1/tasks/task-live/events") as response:
+            body = "".join(response.iter_text())
+    finally:
+        worker.join()
+
+    assert '"stage": "ocr"' in body
+    assert '"progress": 10.0' in body
+    assert body.rstrip().endswith('"message": "Task is completed"}')
+
+def test_cancel_queued_task(client, db):
+    create_task(db, "task-cancel", "queued")
+
+    response = client.post("/api/v1/tasks/task-cancel/cancel")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+
+    db.expire_all()
+    task = db.query(Task).filter(Task.task_id == "task-cancel").one()
+    assert task.status == "cancelled"
+    assert task.end_time is not None
+
+    # 終了済みのタスクはキャンセルできない
+    response = client.post("/api/v1/tasks/task-cancel/cancel")
+    assert response.status_code == 409
+
+    # SSE は終了イベントを返して閉じる
+    response = client.get("/api/v1/tasks/task-cancel/events")
+    assert '"status": "cancelled"' in response.text
+
+def test_cancel_stops_running_pipeline(client, db, monkeypatch):
+    from app.api.routes import documents
+    from app.services import pdf_processing
+    from app.db.models import Document
+    from tests.conftest import TestingSessionLocal
+
+    document = Document(file_name="big.pdf", file_path="big.pdf", document_type="registry_ledger", uploaded_by=1)
+    db.add(document)
+    db.commit()
+    db.add(Task(task_id="task-running", task_type="pdf_processing", status="queued", document_id=document.id))
+    db.commit()
+    document_id = document.id
+
+    pages_done = []
+
+    def fake_pipeline(ledger_pdf, task_id=None, on_progress=None, **kwargs):
+        for page in range(1, 301):
+            on_progress("ocr", page, 300)
+            pages_done.append(page)
+            if page == 3:
+                # 処理中にキャンセル API が呼ばれる
+                assert client.post(f"/api/v1/tasks/{task_id}/cancel").status_code == 200
+        return {"task_id": task_id}
+
+    monkeypatch.setattr(documents, "WorkerSessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(pdf_processing, "run_pipeline", fake_pipeline)
+    documents.process_document_task(document_id, "task-running")
+
+    # 次のページの区切りで停止する
+    assert pages_done == [1, 2, 3]
+    db.expire_all()
+    assert db.query(Task).filter(Task.task_id == "task-running").one().status == "cancelled"
+    assert db.query(Document).filter(Document.id == document_id).one().processing_status == "cancelled"
+
+def test_scheduler_runs_higher_priority_first():
+    from app.services.scheduling import PriorityScheduler
+
+    scheduler = PriorityScheduler(slots=1)
+    scheduler.acquire()
+    order = []
+
+    def run(name, priority):
+        with scheduler.slot(priority):
+            order.append(name)
+
+    threads = []
+    for name, priority in [("bulk-1", 0), ("bulk-2", 0), ("urgent", 10)]:
+        thread = threading.Thread(target=run, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+    while scheduler.waiting() < 3:
+        time.sleep(0.01)
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert order == ["urgent", "bulk-1", "bulk-2"]
+
+def test_scheduler_cancels_waiting_task(monkeypatch):
+    from app.services import scheduling
+    from app.services.progress import TaskCancelled
+
+    monkeypatch.setattr(scheduling, "CANCEL_POLL_SECONDS", 0.01)
+    scheduler = scheduling.PriorityScheduler(slots=1)
+    scheduler.acquire()
+
+    with pytest.raises(TaskCancelled):
+        scheduler.acquire(priority=5, is_cancelled=lambda: True)
+    assert scheduler.waiting() == 0
+    scheduler.release()
+
+def test_progress_reporter_heartbeat_is_throttled():
+    beats = []
+    reporter = ProgressReporter("task-heartbeat", heartbeat=lambda: beats.append(1), heartbeat_interval=60)
+
+    for i in range(5):
+        reporter("ocr", i + 1, 5)
+    assert len(beats) == 1
+
+    reporter.heartbeat_interval = 0
+    reporter("ocr", 5, 5)
+    assert not reporter.is_cancel_requested()
+    assert len(beats) == 3
+
+def test_get_tasks_with_cursor_on_same_start_time(client, db):
+    from datetime import datetime
+
+    # 同じ開始日時のタスクを5件作成
+    start_time = datetime(2024, 1, 1, 12, 0, 0)
+    tasks = [
+        Task(task_id=f"same-start-{i}", task_type="pdf_processing", status="completed", start_time=start_time)
+        for i in range(5)
+    ]
+    db.add_all(tasks)
+    db.commit()
+    expected = [task.task_id for task in sorted(tasks, key=lambda task: task.id, reverse=True)]
+
+    # limit=2 で最後のページまでたどる
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/api/v1/tasks/", params=params)
+        assert response.status_code == 200
+        seen.extend(task["task_id"] for task in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    # 同じ日時でも id で順序が決まり、重複も抜けもない
+    assert seen == expected
+
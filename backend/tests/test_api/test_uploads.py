@@ -0,0 +1,80 @@
+# tests/test_api/test_uploads.py
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.api.uploads import save_upload
+from app.core.security import get_current_active_user
+from app.db.models import Document
+from app.main import app
+from app.schemas.auth import UserPrincipal
+
+def make_upload(content, filename="ledger.pdf"):
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+def test_save_upload_streams_in_chunks(tmp_path):
+    content = os.urandom(10_000)
+    upload = asyncio.run(save_upload(make_upload(content), str(tmp_path), chunk_size=1024))
+
+    assert upload.size == len(content)
+    assert upload.sha256 == hashlib.sha256(content).hexdigest()
+    assert upload.path.endswith("_ledger.pdf")
+    with open(upload.path, "rb") as f:
+        assert f.read() == content
+    # 一時ファイルは残らない
+    assert os.listdir(tmp_path) == [os.path.basename(upload.path)]
+
+def test_save_upload_rejects_oversized_file(tmp_path):
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(save_upload(make_upload(b"x" * 5000), str(tmp_path), max_bytes=4096, chunk_size=1024))
+
+    assert exc_info.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+def test_save_upload_ignores_client_path(tmp_path):
+    upload = asyncio.run(save_upload(make_upload(b"data", filename="../../etc/ledger.pdf"), str(tmp_path)))
+
+    assert os.path.dirname(upload.path) == str(tmp_path)
+    assert upload.path.endswith("_ledger.pdf")
+
+def test_concurrent_uploads_with_same_name_do_not_overwrite(tmp_path):
+    async def upload_both():
+        return await asyncio.gather(
+            save_upload(make_upload(b"first"), str(tmp_path), chunk_size=2),
+            save_upload(make_upload(b"second"), str(tmp_path), chunk_size=2),
+        )
+
+    first, second = asyncio.run(upload_both())
+
+    assert first.path != second.path
+    with open(first.path, "rb") as f:
+        assert f.read() == b"first"
+    with open(second.path, "rb") as f:
+        assert f.read() == b"second"
+
+def test_upload_document_stores_unique_path(client, db, tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    # conftest の test_user は最初のテスト以外では DB に存在しないため、プリンシパルを直接渡す
+    app.dependency_overrides[get_current_active_user] = lambda: UserPrincipal(
+        id=1, email="test@example.com", role="admin", status="active"
+    )
+
+    paths = []
+    for content in (b"ledger one", b"ledger two"):
+        response = client.post(
+            "/api/v1/documents/upload",
+            data={"document_type": "registry_ledger"},
+            files={"file": ("ledger.pdf", io.BytesIO(content), "application/pdf")},
+        )
+        assert response.status_code == 200
+        assert response.json()["file_name"] == "ledger.pdf"
+        document = db.query(Document).filter(Document.id == response.json()["id"]).first()
+        with open(document.file_path, "rb") as f:
+            assert f.read() == content
+        paths.append(document.file_path)
+
+    assert paths[0] != paths[1]
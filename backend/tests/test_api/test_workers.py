@@ -0,0 +1,86 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("RUN_BENCHMARKS"), reason="RUN_BENCHMARKS=1 で実行する負荷テスト（gunicorn を起動する）"
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WORKERS = 2
+REQUESTS = 2000
+CONCURRENCY = 16
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_until_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health/ready").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("gunicorn did not become ready")
+
+@pytest.fixture
+def server(tmp_path):
+    port = _free_port()
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(WORKERS),
+        "BIND": f"127.0.0.1:{port}",
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'load.db'}",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_ready(base_url)
+        yield process, base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=60)
+
+def test_multi_worker_load_survives_graceful_reload(server):
+    process, base_url = server
+    retries = []
+
+    def request(i: int) -> int:
+        # 途中でマスターに HUP を送り、ワーカーを入れ替えている間もリクエストが落ちないことを確かめる
+        if i == REQUESTS // 2:
+            process.send_signal(signal.SIGHUP)
+        try:
+            return client.get(f"{base_url}/health/live").status_code
+        except httpx.TransportError:
+            # 停止する古いワーカーが受け付けたばかりで読み始めていない接続は切られるため、
+            # ロードバランサーと同じく GET を 1 回だけ再送する
+            retries.append(i)
+            return client.get(f"{base_url}/health/live").status_code
+
+    with httpx.Client() as client, ThreadPoolExecutor(CONCURRENCY) as pool:
+        started = time.perf_counter()
+        statuses = list(pool.map(request, range(REQUESTS)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{REQUESTS / elapsed:.0f} req/s with {WORKERS} workers, {len(retries)} retried")
+    assert statuses.count(200) == REQUESTS
+    # 再送は古いワーカーにつながっていた接続（スレッドごとの keep-alive 接続）の分程度に収まる
+    assert len(retries) <= 2 * CONCURRENCY
+    _wait_until_ready(base_url)
@@ -358,6 +358,15 @@ export default function UploadPage() {
                 variant: "destructive",
               })
               break
+            case "cancelled":
+              clearInterval(checkStatusInterval)
+              clearInterval(timerInterval)
+              setIsProcessing(false)
+              toast({
+                title: "処理がキャンセルされました",
+                description: task.message || "ドキュメント処理はキャンセルされました",
+              })
+              break
           }
         } catch (error) {
           console.error("Error monitoring task status:", error)